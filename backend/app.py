@@ -75,6 +75,33 @@ CORS(app, resources={
     }
 })
 
+# Warm the in-memory blacklist index used by the auth checks
+from services.blacklist_index import blacklist_index
+blacklist_index.ensure_loaded()
+
+# Replay inserts spooled to disk while Supabase was unavailable
+from services.spool import spool
+from services.response_cache import admin_cache, TICKET_NAMESPACES
+spool.on_replay('support_tickets', lambda rows: admin_cache.invalidate(*TICKET_NAMESPACES))
+spool.start()
+
+# Register every background job handler, then start the workers (which
+# resume jobs left unfinished by a crash, so handlers must exist first)
+from services.job_runner import job_runner
+from services.user_service import UserService
+from services.blast_service import BlastService
+from routes.payment_webhook import process_stripe_event, STRIPE_EVENT_MAX_ATTEMPTS, STRIPE_EVENT_RETRY_DELAY
+job_runner.register('user_deletion', UserService.run_deletion_job)
+job_runner.register('bulk_user_deletion', UserService.run_bulk_deletion_job)
+job_runner.register('blast', BlastService.run_blast_job)
+job_runner.register(
+    'stripe_event',
+    process_stripe_event,
+    max_attempts=STRIPE_EVENT_MAX_ATTEMPTS,
+    retry_delay=STRIPE_EVENT_RETRY_DELAY
+)
+job_runner.start()
+
 # Register Blueprints
 app.register_blueprint(payment_bp)
 app.register_blueprint(blast_bp)
@@ -0,0 +1,122 @@
+# backend/benchmarks/bench_revenue.py
+"""
+Microbenchmark: legacy multi-scan revenue aggregation vs RevenueAggregator
+
+Run from the backend folder:
+    python -m benchmarks.bench_revenue
+    python -m benchmarks.bench_revenue --sizes 100000 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from services.revenue_aggregator import RevenueAggregator
+
+
+def make_payments(count, now, seed=42):
+    """Synthetic payments spread over the last year, newest first"""
+    rng = random.Random(seed)
+    statuses = ['completed'] * 8 + ['failed', 'refunded']
+    payments = []
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        payments.append({
+            'id': i,
+            'status': rng.choice(statuses),
+            'amount': 14900,
+            'refund_amount': 14900,
+            'created_at': created_at.isoformat().replace('+00:00', 'Z')
+        })
+    payments.sort(key=lambda p: p['created_at'], reverse=True)
+    return payments
+
+
+def legacy_summary(all_payments, now, start_dt, end_dt):
+    """The pre-aggregator get_revenue() logic: one scan per bucket"""
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    seven_days_ago = now - timedelta(days=7)
+
+    filtered_payments = all_payments
+    if start_dt and end_dt:
+        filtered_payments = [
+            p for p in all_payments
+            if start_dt <= datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) < end_dt
+        ]
+
+    completed = [p for p in filtered_payments if p.get('status') == 'completed']
+    failed = [p for p in filtered_payments if p.get('status') == 'failed']
+    refunded = [p for p in filtered_payments if p.get('status') == 'refunded']
+
+    today_payments = [
+        p for p in all_payments
+        if p.get('status') == 'completed' and
+        datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) >= today_start
+    ]
+    last_7_payments = [
+        p for p in all_payments
+        if p.get('status') == 'completed' and
+        datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) >= seven_days_ago
+    ]
+
+    daily = []
+    for i in range(7):
+        day_start = today_start - timedelta(days=i)
+        day_end = day_start + timedelta(days=1)
+        day_payments = [
+            p for p in all_payments
+            if p.get('status') == 'completed' and
+            day_start <= datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) < day_end
+        ]
+        daily.append({
+            'day': day_start.strftime('%Y-%m-%d'),
+            'count': len(day_payments),
+            'amount': sum(p.get('amount', 0) for p in day_payments)
+        })
+
+    return {
+        'completed_count': len(completed),
+        'completed_amount': sum(p.get('amount', 0) for p in completed),
+        'failed_count': len(failed),
+        'failed_amount': sum(p.get('amount', 0) for p in failed),
+        'refunded_count': len(refunded),
+        'refunded_amount': sum(p.get('refund_amount', 0) for p in refunded),
+        'today_count': len(today_payments),
+        'today_amount': sum(p.get('amount', 0) for p in today_payments),
+        'last_7_days_amount': sum(p.get('amount', 0) for p in last_7_payments),
+        'daily': daily,
+        'failed_payments': failed[:20],
+        'refunded_payments': refunded[:20]
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    start_dt = (now - timedelta(days=90)).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_dt = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    print(f"{'payments':>10} {'legacy (s)':>12} {'single-pass (s)':>16} {'speedup':>9}")
+    for size in args.sizes:
+        payments = make_payments(size, now)
+
+        legacy, legacy_time = timed(lambda: legacy_summary(payments, now, start_dt, end_dt))
+        single, single_time = timed(
+            lambda: RevenueAggregator(now, start_dt, end_dt).add_all(iter(payments)).summary()
+        )
+
+        assert legacy == single, 'single-pass aggregation disagrees with legacy logic'
+        print(f"{size:>10} {legacy_time:>12.3f} {single_time:>16.3f} {legacy_time / single_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,105 @@
 from flask import Blueprint, request, jsonify
 import os
-import requests
 from datetime import datetime, timedelta, timezone
 import time
+from concurrent.futures import ThreadPoolExecutor
+from services.supabase_client import SupabaseClient
+from services.revenue_aggregator import RevenueAggregator
+from services.revenue_rollup_service import RevenueRollupService
+from services.response_cache import admin_cache, TICKET_NAMESPACES
+from services.job_runner import job_runner
+from services.logger import get_logger, dropped_records
+
+log = get_logger(__name__)
 
 admin_bp = Blueprint('admin', __name__)
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+def iter_rows(table, query=''):
+    """
+    Helper to stream every matching row from Supabase (newest first)
+    Pages with keyset cursors; raises SupabaseError instead of returning partial data
+    """
+    return SupabaseClient.iter_rows(table, query)
 
-def _get_headers():
-    return {
-        'apikey': SUPABASE_KEY,
-        'Authorization': f'Bearer {SUPABASE_KEY}',
-        'Content-Type': 'application/json',
-        'Prefer': 'count=exact'
-    }
+def _cache_key(namespace):
+    """Cache key for an admin read: namespace plus the request's query args"""
+    return (namespace, tuple(sorted(request.args.items())))
 
-def get_all_rows(table, query=''):
-    """Helper to fetch data from Supabase"""
+def _parse_date_range(start_date_str, end_date_str):
+    """Parse the custom YYYY-MM-DD range; returns (None, None) if absent or invalid"""
+    if not (start_date_str and end_date_str):
+        return None, None
     try:
-        url = f"{SUPABASE_URL}/rest/v1/{table}?{query}"
-        resp = requests.get(url, headers=_get_headers())
-        return resp.json() if resp.status_code == 200 else []
-    except:
-        return []
+        start_dt = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        end_dt = datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1) # Include end date
+        return start_dt, end_dt
+    except ValueError:
+        return None, None # Ignore invalid date formats
+
+def _revenue_summary_from_db(now, start_dt, end_dt):
+    """
+    Ask Postgres for the revenue aggregates (see sql/admin_revenue_summary.sql)
+    Returns None if the function is not deployed or the call fails
+    """
+    resp = SupabaseClient.rpc('admin_revenue_summary', {
+        'p_start': start_dt.isoformat() if start_dt else None,
+        'p_end': end_dt.isoformat() if end_dt else None,
+        'p_now': now.isoformat()
+    })
+    if resp.status_code != 200:
+        log.warning(f"⚠️ admin_revenue_summary RPC unavailable ({resp.status_code}), aggregating in Python")
+        return None
+    return resp.json()
+
+def _revenue_summary_from_rows(now, start_dt, end_dt):
+    """Fallback: fetch payments and aggregate them in a single Python pass"""
+    payments = iter_rows('payments', 'select=*')
+    return RevenueAggregator(now, start_dt, end_dt).add_all(payments).summary()
+
+def _build_revenue(start_dt, end_dt):
+    """Compute the /api/admin/revenue payload"""
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Prefer the daily rollups (O(days) rows), then the database
+    # aggregate, and only scan payments if neither is deployed
+    summary = RevenueRollupService.get_summary(now, start_dt, end_dt)
+    if summary is None:
+        summary = _revenue_summary_from_db(now, start_dt, end_dt)
+    if summary is None:
+        summary = _revenue_summary_from_rows(now, start_dt, end_dt)
+
+    # --- Daily Breakdown (Last 7 Days) ---
+    daily_by_day = {d['day']: d for d in summary.get('daily') or []}
+    daily_breakdown = []
+    for i in range(7):
+        day_start = today_start - timedelta(days=i)
+        day = daily_by_day.get(day_start.strftime('%Y-%m-%d'), {})
+        daily_breakdown.append({
+            'date': day_start.isoformat(),
+            'revenue': (day.get('amount') or 0) / 100,
+            'transactions': day.get('count') or 0
+        })
+
+    # Return consolidated response
+    return {
+        'total_revenue': round((summary['completed_amount'] or 0) / 100, 2),
+        'transactions': summary['completed_count'],
+        'today_revenue': round((summary['today_amount'] or 0) / 100, 2),
+        'today_transactions': summary['today_count'],
+        'last_7_days_revenue': round((summary['last_7_days_amount'] or 0) / 100, 2),
+        'daily_breakdown': daily_breakdown,
+        'failed_payments': {
+            'count': summary['failed_count'],
+            'amount': round((summary['failed_amount'] or 0) / 100, 2),
+            'payments': summary['failed_payments'] or []
+        },
+        'refunded_payments': {
+            'count': summary['refunded_count'],
+            'amount': round((summary['refunded_amount'] or 0) / 100, 2),
+            'payments': summary['refunded_payments'] or []
+        }
+    }
 
 # =========================================================
 # 1. REVENUE ANALYTICS (Fixed: Today, 7 Days, Filters)
@@ -33,101 +108,19 @@ def get_all_rows(table, query=''):
 def get_revenue():
     try:
         # Get query parameters for custom date range
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-
-        # Fetch ALL payments (ordered by newest first)
-        all_payments = get_all_rows('payments', 'select=*&order=created_at.desc')
-
-        # --- Helper: Parse Dates ---
-        now = datetime.now(timezone.utc)
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        seven_days_ago = now - timedelta(days=7)
-
-        # --- Filter Logic ---
-        filtered_payments = all_payments
-        if start_date_str and end_date_str:
-            # If custom range is provided
-            try:
-                start_dt = datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-                end_dt = datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc) + timedelta(days=1) # Include end date
-                
-                filtered_payments = [
-                    p for p in all_payments 
-                    if start_dt <= datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) < end_dt
-                ]
-            except ValueError:
-                pass # Ignore invalid date formats
-
-        # --- Categorize Payments (Filtered List) ---
-        completed = [p for p in filtered_payments if p.get('status') == 'completed']
-        failed = [p for p in filtered_payments if p.get('status') == 'failed']
-        refunded = [p for p in filtered_payments if p.get('status') == 'refunded']
-
-        # --- Calculate Metrics (Filtered List) ---
-        total_revenue = sum(p.get('amount', 0) for p in completed) / 100
-        failed_amount = sum(p.get('amount', 0) for p in failed) / 100
-        refunded_amount = sum(p.get('refund_amount', 0) for p in refunded) / 100
-
-        # --- Calculate Time-Based Metrics (From ALL payments) ---
-        # Today's Revenue
-        today_payments = [
-            p for p in all_payments 
-            if p.get('status') == 'completed' and 
-            datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) >= today_start
-        ]
-        today_revenue = sum(p.get('amount', 0) for p in today_payments) / 100
-        today_transactions = len(today_payments)
-
-        # Last 7 Days Revenue
-        last_7_payments = [
-            p for p in all_payments 
-            if p.get('status') == 'completed' and 
-            datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) >= seven_days_ago
-        ]
-        last_7_revenue = sum(p.get('amount', 0) for p in last_7_payments) / 100
-
-        # --- Daily Breakdown (Last 7 Days) ---
-        daily_breakdown = []
-        for i in range(7):
-            day_date = now - timedelta(days=i)
-            day_start = day_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-            
-            day_payments = [
-                p for p in all_payments 
-                if p.get('status') == 'completed' and 
-                day_start <= datetime.fromisoformat(p['created_at'].replace('Z', '+00:00')) < day_end
-            ]
-            
-            daily_breakdown.append({
-                'date': day_start.isoformat(),
-                'revenue': sum(p.get('amount', 0) for p in day_payments) / 100,
-                'transactions': len(day_payments)
-            })
-        
-        # Return consolidated response
-        return jsonify({
-            'total_revenue': round(total_revenue, 2),
-            'transactions': len(completed),
-            'today_revenue': round(today_revenue, 2),
-            'today_transactions': today_transactions,
-            'last_7_days_revenue': round(last_7_revenue, 2),
-            'daily_breakdown': daily_breakdown,
-            'failed_payments': {
-                'count': len(failed),
-                'amount': round(failed_amount, 2),
-                'payments': failed[:20]
-            },
-            'refunded_payments': {
-                'count': len(refunded),
-                'amount': round(refunded_amount, 2),
-                'payments': refunded[:20]
-            }
-        }), 200
+        start_dt, end_dt = _parse_date_range(
+            request.args.get('start_date'),
+            request.args.get('end_date')
+        )
+
+        revenue = admin_cache.get_or_load(
+            _cache_key('revenue'),
+            lambda: _build_revenue(start_dt, end_dt)
+        )
+        return jsonify(revenue), 200
 
     except Exception as e:
-        print(f"Admin Revenue Error: {e}")
+        log.error(f"Admin Revenue Error: {e}")
         return jsonify({'error': str(e)}), 500
 
 # =========================================================
@@ -138,29 +131,52 @@ def get_users():
     try:
         # Fetch users from the public 'users' table
         # We assume 'users' table is synced or updated via activityTrackingService
-        users = get_all_rows('users', 'select=*&order=created_at.desc')
+        users = admin_cache.get_or_load(
+            _cache_key('users'),
+            lambda: list(iter_rows('users', 'select=*'))
+        )
         
         return jsonify({
             'count': len(users),
             'users': users
         }), 200
     except Exception as e:
-        print(f"Admin Users Error: {e}")
+        log.error(f"Admin Users Error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/admin/users/delete', methods=['POST'])
 def delete_user_proxy():
     # This acts as a proxy to the user_management logic if needed
     # Ideally, user_management_bp handles this, but for completeness:
-    from services.user_service import UserService
     try:
         data = request.json
         email = data.get('email')
         user_id = data.get('user_id')
         reason = data.get('reason', 'Admin Dashboard Deletion')
         
-        result = UserService.delete_user_data(email, user_id, reason)
-        return jsonify({'success': True, 'details': result}), 200
+        # Deletion runs on the job runner; poll the status URL for progress
+        job = job_runner.submit('user_deletion', {
+            'email': email,
+            'user_id': user_id,
+            'reason': reason
+        })
+        return jsonify({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': f"/api/admin/jobs/{job['id']}"
+        }), 202
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Progress (steps_completed) and final summary of a background job"""
+    try:
+        job = job_runner.get(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -173,7 +189,7 @@ def get_health():
         # Check Supabase
         supabase_status = "Healthy"
         try:
-            requests.get(f"{SUPABASE_URL}/rest/v1/users?limit=1", headers=_get_headers(), timeout=5)
+            SupabaseClient.select('users', 'limit=1', timeout=5)
         except:
             supabase_status = "Unreachable"
 
@@ -198,7 +214,7 @@ def get_server_status():
     start_time = time.time()
     try:
         # Quick DB ping to measure latency
-        requests.get(f"{SUPABASE_URL}/rest/v1/", headers=_get_headers(), timeout=2)
+        SupabaseClient.request('GET', 'rest/v1/', timeout=2)
         latency = round((time.time() - start_time) * 1000, 2)
         
         return jsonify({
@@ -224,7 +240,7 @@ def get_contact_submissions():
     try:
         filter_status = request.args.get('filter', 'all')
         
-        query = 'select=*&order=created_at.desc'
+        query = 'select=*'
         if filter_status == 'unread':
             query += '&status=eq.unread'
         elif filter_status == 'open':
@@ -232,49 +248,56 @@ def get_contact_submissions():
         elif filter_status == 'resolved':
             query += '&status=eq.resolved'
             
-        submissions = get_all_rows('support_tickets', query)
-        
-        # Map fields if necessary to match frontend expectations
-        mapped_submissions = []
-        for sub in submissions:
-            mapped_submissions.append({
-                'id': sub.get('id'),
-                'name': sub.get('user_name'),
-                'email': sub.get('user_email'),
-                'subject': sub.get('subject'),
-                'message': sub.get('message'),
-                'status': sub.get('status', 'open'),  # Can be: unread, open, resolved
-                'submitted_at': sub.get('created_at'),
-                'ticket_id': sub.get('ticket_id'),
-                'admin_notes': sub.get('admin_notes', '')
-            })
+        mapped_submissions = admin_cache.get_or_load(
+            _cache_key('contact_submissions'),
+            lambda: _load_contact_submissions(query)
+        )
             
         return jsonify({'submissions': mapped_submissions}), 200
     except Exception as e:
-        print(f"Admin Contact Error: {e}")
+        log.error(f"Admin Contact Error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def _load_contact_submissions(query):
+    # Map fields if necessary to match frontend expectations
+    mapped_submissions = []
+    for sub in iter_rows('support_tickets', query):
+        mapped_submissions.append({
+            'id': sub.get('id'),
+            'name': sub.get('user_name'),
+            'email': sub.get('user_email'),
+            'subject': sub.get('subject'),
+            'message': sub.get('message'),
+            'status': sub.get('status', 'open'),  # Can be: unread, open, resolved
+            'submitted_at': sub.get('created_at'),
+            'ticket_id': sub.get('ticket_id'),
+            'admin_notes': sub.get('admin_notes', '')
+        })
+    return mapped_submissions
+
 # NEW: Get unread ticket count
 @admin_bp.route('/api/admin/contact-submissions/unread-count', methods=['GET'])
 def get_unread_count():
     try:
         # Count tickets with status 'unread'
-        query = 'select=id&status=eq.unread'
-        unread_tickets = get_all_rows('support_tickets', query)
+        unread_count = admin_cache.get_or_load(
+            _cache_key('unread_count'),
+            lambda: SupabaseClient.count('support_tickets', 'status=eq.unread')
+        )
         
         return jsonify({
-            'unread_count': len(unread_tickets)
+            'unread_count': unread_count or 0
         }), 200
     except Exception as e:
-        print(f"Admin Unread Count Error: {e}")
+        log.error(f"Admin Unread Count Error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/admin/contact-submissions/<ticket_id>/mark-read', methods=['PATCH'])
 def mark_contact_read(ticket_id):
     try:
         # Mark as 'open' (not 'closed') to indicate it's been read but not resolved
-        url = f"{SUPABASE_URL}/rest/v1/support_tickets?id=eq.{ticket_id}"
-        requests.patch(url, json={'status': 'open'}, headers=_get_headers())
+        SupabaseClient.patch('support_tickets', f'id=eq.{ticket_id}', {'status': 'open'})
+        admin_cache.invalidate(*TICKET_NAMESPACES)
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -290,8 +313,8 @@ def toggle_resolve_status(ticket_id):
         if new_status not in ['open', 'resolved']:
             return jsonify({'error': 'Invalid status. Must be "open" or "resolved"'}), 400
         
-        url = f"{SUPABASE_URL}/rest/v1/support_tickets?id=eq.{ticket_id}"
-        response = requests.patch(url, json={'status': new_status}, headers=_get_headers())
+        response = SupabaseClient.patch('support_tickets', f'id=eq.{ticket_id}', {'status': new_status})
+        admin_cache.invalidate(*TICKET_NAMESPACES)
         
         if response.status_code in [200, 204]:
             return jsonify({'success': True, 'status': new_status}), 200
@@ -299,39 +322,54 @@ def toggle_resolve_status(ticket_id):
             return jsonify({'error': 'Failed to update status'}), 500
             
     except Exception as e:
-        print(f"Admin Resolve Error: {e}")
+        log.error(f"Admin Resolve Error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @admin_bp.route('/api/admin/contact-submissions/<ticket_id>/notes', methods=['PATCH'])
 def update_contact_notes(ticket_id):
     try:
         notes = request.json.get('admin_notes')
-        url = f"{SUPABASE_URL}/rest/v1/support_tickets?id=eq.{ticket_id}"
-        requests.patch(url, json={'admin_notes': notes}, headers=_get_headers())
+        SupabaseClient.patch('support_tickets', f'id=eq.{ticket_id}', {'admin_notes': notes})
+        admin_cache.invalidate(*TICKET_NAMESPACES)
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _completed_revenue_cents():
+    """Completed revenue from the daily rollups, streaming amounts only as a fallback"""
+    total = RevenueRollupService.get_completed_total()
+    if total is None:
+        payments = iter_rows('payments', 'select=id,created_at,amount&status=eq.completed')
+        total = sum(p.get('amount', 0) for p in payments)
+    return total
+
+def _load_stats():
+    # Count-only requests (HEAD + Content-Range), run concurrently
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        total_users = executor.submit(SupabaseClient.count, 'users')
+        active_users = executor.submit(SupabaseClient.count, 'users', 'account_status=eq.active')
+        total_blasts = executor.submit(SupabaseClient.count, 'blast_campaigns')
+        total_resumes = executor.submit(SupabaseClient.count, 'resumes')
+        revenue_cents = executor.submit(_completed_revenue_cents)
+
+    revenue = revenue_cents.result() / 100
+
+    return {
+        'total_users': total_users.result() or 0,
+        'active_users': active_users.result() or 0,
+        'total_blasts': total_blasts.result() or 0,
+        'total_resume_uploads': total_resumes.result() or 0,
+        'total_revenue': round(revenue, 2)
+    }
+
 # =========================================================
 # 5. GENERAL STATS (Monitoring Tab)
 # =========================================================
 @admin_bp.route('/api/admin/stats', methods=['GET'])
 def get_stats():
     try:
-        users = get_all_rows('users', 'select=id')
-        active_users = get_all_rows('users', 'select=id&account_status=eq.active')
-        blasts = get_all_rows('blast_campaigns', 'select=id')
-        resumes = get_all_rows('resumes', 'select=id')
-        payments = get_all_rows('payments', 'select=amount&status=eq.completed')
-        
-        revenue = sum(p.get('amount', 0) for p in payments) / 100
-        
-        return jsonify({
-            'total_users': len(users),
-            'active_users': len(active_users),
-            'total_blasts': len(blasts),
-            'total_resume_uploads': len(resumes),
-            'total_revenue': round(revenue, 2)
-        }), 200
+        stats = admin_cache.get_or_load(_cache_key('stats'), _load_stats)
+        # Live, not cached: log records this worker dropped because its queue was full
+        return jsonify(dict(stats, dropped_log_records=dropped_records())), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
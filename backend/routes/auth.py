@@ -2,6 +2,9 @@
 from flask import Blueprint, request, jsonify
 from services.user_service import UserService
 import os
+from services.logger import get_logger
+
+log = get_logger(__name__)
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -36,7 +39,7 @@ def check_blacklist():
         is_blacklisted, reason = UserService.is_user_blacklisted(email)
         
         if is_blacklisted:
-            print(f"🚫 Blacklisted user attempted access: {email}")
+            log.info(f"🚫 Blacklisted user attempted access: {email}")
             
             return jsonify({
                 'success': False,
@@ -56,7 +59,7 @@ def check_blacklist():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error checking blacklist: {e}")
+        log.error(f"❌ Error checking blacklist: {e}")
         return jsonify({
             'success': False,
             'error': 'Error checking account status'
@@ -85,18 +88,15 @@ def check_auth_status():
                 'error': 'Email is required'
             }), 400
         
-        # Check blacklist
-        is_blacklisted, reason = UserService.is_user_blacklisted(email)
+        # Check blacklist (single lookup returns the full record)
+        blacklist_info = UserService.get_blacklist_entry(email)
         
-        if is_blacklisted:
-            # Get detailed blacklist info
-            blacklist_info = UserService.get_blacklist_info(email)
-            
+        if blacklist_info:
             return jsonify({
                 'success': False,
                 'is_blacklisted': True,
                 'is_banned': True,
-                'reason': reason,
+                'reason': blacklist_info.get('reason', 'Account suspended'),
                 'blacklist_details': {
                     'deleted_at': blacklist_info.get('deleted_at'),
                     'deleted_by': blacklist_info.get('deleted_by'),
@@ -117,7 +117,7 @@ def check_auth_status():
         }), 200
         
     except Exception as e:
-        print(f"❌ Error checking auth status: {e}")
+        log.error(f"❌ Error checking auth status: {e}")
         return jsonify({
             'success': False,
             'error': 'Error checking account status'
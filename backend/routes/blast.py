@@ -1,26 +1,27 @@
 # backend/routes/blast.py
 from flask import Blueprint, request, jsonify
-import requests
-import os
 from datetime import datetime
+from services.blast_service import BlastService, IdempotencyKeyReused, MAKE_WEBHOOK_URL, make_breaker
+from services.circuit_breaker import CircuitOpenError
+from services.job_runner import job_runner
+from services.logger import get_logger
 
-blast_bp = Blueprint('blast', __name__)
+log = get_logger(__name__)
 
-# Get webhook URL from environment
-MAKE_WEBHOOK_URL = os.getenv('MAKE_WEBHOOK_URL')
+blast_bp = Blueprint('blast', __name__)
 
 @blast_bp.route('/api/blast/send', methods=['POST'])
 def send_blast():
     """
     Send resume blast via Make.com webhook
     This endpoint acts as a proxy to avoid CORS issues
+    
+    Returns 202 with a blast_id right away; poll /api/blast/status/<blast_id>
     """
     try:
-        print("\n=== 🚀 BLAST REQUEST RECEIVED ===")
-        
         # Get data from frontend
         blast_data = request.json
-        print(f"📦 Blast data: {blast_data}")
+        log.debug("📦 Blast request", payload=blast_data)
         
         # Validate required fields
         if not blast_data:
@@ -48,52 +49,105 @@ def send_blast():
                 'error': 'Make.com webhook URL not configured in backend .env'
             }), 500
         
-        print(f"📡 Sending to Make.com: {MAKE_WEBHOOK_URL}")
+        # Shed load while Make.com is failing instead of queueing more work
+        make_breaker.check()
         
-        # Forward request to Make.com
-        response = requests.post(
-            MAKE_WEBHOOK_URL,
-            json=blast_data,
-            headers={'Content-Type': 'application/json'},
-            timeout=30
+        # Queue the blast (once per Idempotency-Key / identical payload);
+        # a background worker forwards it to Make.com
+        job, replayed = BlastService.dispatch_once(
+            blast_data,
+            idempotency_key=request.headers.get('Idempotency-Key')
         )
+        if not replayed:
+            log.info("📬 Blast queued", blast_id=job['id'],
+                     recipients=len(blast_data.get('recipients', [])))
         
-        print(f"📥 Make.com response: {response.status_code}")
-        print(f"📄 Response text: {response.text}")
+        return jsonify({
+            'success': True,
+            'message': 'Blast already submitted' if replayed else 'Blast queued',
+            'blast_id': job['id'],
+            'status': job['status'],
+            'replayed': replayed,
+            'details': job['result'] or job['progress'] or {},
+            'error': job['error'],
+            'status_url': f"/api/blast/status/{job['id']}",
+            'recipients_count': len(blast_data.get('recipients', []))
+        }), 200 if replayed else 202
         
-        # Check if request was successful
-        if response.status_code >= 400:
+    except IdempotencyKeyReused as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 422
+        
+    except CircuitOpenError as e:
+        response = jsonify({
+            'success': False,
+            'error': 'Make.com is unavailable, please retry later',
+            'retry_after': e.retry_after
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+        
+    except Exception as e:
+        log.error(f"❌ Unexpected error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@blast_bp.route('/api/blast/status/<blast_id>', methods=['GET'])
+def get_blast_status(blast_id):
+    """
+    Blast progress: queued / running / completed / failed, plus the Make.com
+    status code, timing and recipient count once the webhook has answered
+    """
+    try:
+        job = job_runner.get(blast_id)
+        if job is None or job['job_type'] != 'blast':
             return jsonify({
                 'success': False,
-                'error': f'Make.com returned error: {response.status_code}',
-                'details': response.text
-            }), 502
+                'error': 'Blast not found'
+            }), 404
         
-        # Return success response
         return jsonify({
             'success': True,
-            'message': 'Blast sent successfully',
-            'status': response.status_code,
-            'response': response.text,
-            'recipients_count': len(blast_data.get('recipients', []))
+            'blast_id': blast_id,
+            'status': job['status'],
+            'details': job['result'] or job['progress'] or {},
+            'error': job['error'],
+            'attempts': job['attempts'],
+            'created_at': job['created_at'],
+            'updated_at': job['updated_at']
         }), 200
         
-    except requests.exceptions.Timeout:
-        print("❌ Timeout error")
+    except Exception as e:
         return jsonify({
             'success': False,
-            'error': 'Request to Make.com timed out'
-        }), 504
+            'error': str(e)
+        }), 500
+
+
+@blast_bp.route('/api/blast/retry/<blast_id>', methods=['POST'])
+def retry_blast(blast_id):
+    """Re-send the chunks of a failed blast that did not go through"""
+    try:
+        job = BlastService.retry(blast_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'No failed blast with this id'
+            }), 404
         
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Request error: {str(e)}")
         return jsonify({
-            'success': False,
-            'error': f'Failed to connect to Make.com: {str(e)}'
-        }), 502
+            'success': True,
+            'blast_id': blast_id,
+            'status': job['status'],
+            'status_url': f"/api/blast/status/{blast_id}"
+        }), 202
         
     except Exception as e:
-        print(f"❌ Unexpected error: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -107,5 +161,6 @@ def test_blast():
         'success': True,
         'message': 'Blast API is working',
         'webhook_configured': bool(MAKE_WEBHOOK_URL),
+        'circuit_breaker': make_breaker.snapshot(),
         'timestamp': datetime.utcnow().isoformat()
     }), 200
\ No newline at end of file
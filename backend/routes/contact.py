@@ -4,14 +4,16 @@ import os
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
+from services.spool import spool
+from services.response_cache import admin_cache, TICKET_NAMESPACES
+from services.logger import get_logger
+
+log = get_logger(__name__)
 
 load_dotenv()
 
 contact_bp = Blueprint('contact', __name__)
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
 # Brevo Configuration
 BREVO_API_KEY = os.getenv('BREVO_API_KEY')
 SUPPORT_EMAIL = 'support@shirotechnologies.com'
@@ -23,9 +25,7 @@ def submit_contact():
     try:
         data = request.get_json()
         
-        print("📧 Received contact form submission:")
-        print(f"   Name: {data.get('name')}")
-        print(f"   Email: {data.get('email')}")
+        log.info("📧 Received contact form submission", email=data.get('email'))
         
         # 1. Validate required fields
         required_fields = ['name', 'email', 'subject', 'message']
@@ -49,22 +49,23 @@ def submit_contact():
         }
         
         # 4. Insert into 'support_tickets' table (instead of contact_submissions)
-        url = f"{SUPABASE_URL}/rest/v1/support_tickets"
-        headers = {
-            'apikey': SUPABASE_SERVICE_KEY,
-            'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        }
+        # Falls back to the on-disk spool if Supabase is slow or down
+        response, spooled = spool.insert(
+            'support_tickets',
+            submission_data,
+            prefer='return=representation'
+        )
         
-        response = requests.post(url, json=submission_data, headers=headers, verify=False)
-        
-        if response.status_code in [200, 201]:
-            print(f"✅ Ticket saved to DB. ID: {ticket_id}")
+        if spooled or response.status_code in [200, 201]:
+            if spooled:
+                log.info(f"💾 DB unavailable, ticket {ticket_id} spooled for replay")
+            else:
+                admin_cache.invalidate(*TICKET_NAMESPACES)
+                log.info(f"✅ Ticket saved to DB. ID: {ticket_id}")
             
             # 5. Send Email via Brevo
             if BREVO_API_KEY:
-                print(f"📨 Sending email to {SUPPORT_EMAIL}...")
+                log.info(f"📨 Sending email to {SUPPORT_EMAIL}...")
                 
                 email_payload = {
                     "sender": {"name": BREVO_SENDER_NAME, "email": BREVO_SENDER_EMAIL},
@@ -102,13 +103,13 @@ def submit_contact():
                         timeout=10
                     )
                     if brevo_response.status_code in [200, 201]:
-                        print(f"✅ Support email sent successfully!")
+                        log.info(f"✅ Support email sent successfully!")
                     else:
-                        print(f"⚠️ Failed to send support email: {brevo_response.text}")
+                        log.warning(f"⚠️ Failed to send support email: {brevo_response.text}")
                 except Exception as e:
-                    print(f"❌ Error sending email: {str(e)}")
+                    log.error(f"❌ Error sending email: {str(e)}")
             else:
-                print("⚠️ BREVO_API_KEY not configured, skipping email notification.")
+                log.warning("⚠️ BREVO_API_KEY not configured, skipping email notification.")
 
             return jsonify({
                 'success': True,
@@ -116,12 +117,9 @@ def submit_contact():
                 'ticket_id': ticket_id
             }), 200
         else:
-            print(f"❌ Supabase error: {response.status_code}")
-            print(f"   Response: {response.text}")
+            log.error(f"❌ Supabase error: {response.status_code}", response=response.text)
             return jsonify({'error': f'Database error: {response.text}'}), 500
         
     except Exception as e:
-        print(f"❌ Contact submission error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Contact submission error: {str(e)}")
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
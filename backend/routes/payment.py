@@ -2,28 +2,24 @@ from flask import Blueprint, request, jsonify
 import os
 import stripe
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
+from services.supabase_client import SupabaseClient
+from services.payment_service import PaymentService
+from services.processed_events import processed_events
+from services.stripe_objects import StripeObjectService, STRIPE_ENRICH_BUDGET
+from services.logger import get_logger
+
+log = get_logger(__name__)
 
 load_dotenv()
 
 payment_bp = Blueprint('payment', __name__)
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
 
 
-def _get_headers():
-    return {
-        'apikey': SUPABASE_KEY,
-        'Authorization': f'Bearer {SUPABASE_KEY}',
-        'Content-Type': 'application/json',
-        'Prefer': 'resolution=merge-duplicates'
-    }
-
-
 # =========================================================
 # CREATE CHECKOUT SESSION (UNCHANGED)
 # =========================================================
@@ -65,10 +61,10 @@ def create_checkout_session():
             "initiated_at": datetime.utcnow().isoformat()
         }
 
-        requests.post(
-            f"{SUPABASE_URL}/rest/v1/payments",
-            json=payment_record,
-            headers=_get_headers()
+        SupabaseClient.insert(
+            'payments',
+            payment_record,
+            prefer='resolution=merge-duplicates'
         )
 
         return jsonify({
@@ -78,7 +74,7 @@ def create_checkout_session():
         })
 
     except Exception as e:
-        print("❌ Checkout Error:", str(e))
+        log.error("❌ Checkout Error", error=str(e))
         return jsonify({"success": False, "error": str(e)}), 500
 
 
@@ -88,81 +84,67 @@ def create_checkout_session():
 @payment_bp.route('/api/payment/verify', methods=['POST'])
 def verify_payment():
     try:
-        print("\n================ PAYMENT VERIFY =================")
-        print("SUPABASE_KEY LOADED:", bool(SUPABASE_KEY))
-
         data = request.get_json()
         session_id = data.get('session_id')
+        log.debug("Payment verify", session_id=session_id, supabase_key_loaded=bool(SUPABASE_KEY))
 
         if not session_id:
             return jsonify({"error": "session_id required"}), 400
 
+        # Already completed here or by the webhook: no Stripe or Supabase calls
+        session_key = processed_events.session_key(session_id)
+        if processed_events.is_processed(session_key):
+            log.debug("Payment already verified", session_id=session_id)
+            return jsonify({"success": True})
+
         # 1️⃣ Fetch Checkout Session
-        session = stripe.checkout.Session.retrieve(
-            session_id,
-            expand=['payment_intent', 'payment_intent.payment_method']
-        )
+        session = StripeObjectService.checkout_session(session_id)
 
-        print("Stripe payment_status:", session.payment_status)
 
         if session.payment_status != 'paid':
             return jsonify({"success": False})
 
         payment_intent = session.payment_intent
-        print("PaymentIntent:", payment_intent.id)
-
-        # 2️⃣ Card details
-        card_brand = None
-        card_last4 = None
-        receipt_url = None
-
-        if payment_intent.payment_method:
-            pm = payment_intent.payment_method
-            if isinstance(pm, str):
-                pm = stripe.PaymentMethod.retrieve(pm)
-            if pm.card:
-                card_brand = pm.card.brand
-                card_last4 = pm.card.last4
-
-        # 3️⃣ Retrieve charge SAFELY (NEW STRIPE WAY)
-        if payment_intent.latest_charge:
-            charge = stripe.Charge.retrieve(payment_intent.latest_charge)
-            receipt_url = charge.receipt_url
+
+        # 2️⃣ Card details and receipt (expanded with the session; any
+        # missing ones are fetched concurrently within STRIPE_ENRICH_BUDGET)
+        details = StripeObjectService.payment_details(payment_intent, budget=STRIPE_ENRICH_BUDGET)
 
         update_data = {
             "status": "completed",
             "payment_intent_id": payment_intent.id,
             "completed_at": datetime.utcnow().isoformat(),
             "payment_method": "card",
-            "card_brand": card_brand,
-            "card_last4": card_last4,
-            "receipt_url": receipt_url,
+            "card_brand": details['card_brand'],
+            "card_last4": details['card_last4'],
+            "receipt_url": details['receipt_url'],
             "amount": session.amount_total,
             "currency": session.currency
         }
 
         update_data = {k: v for k, v in update_data.items() if v is not None}
 
-        print("Updating DB for session:", session_id)
-        print("Update payload:", update_data)
+        log.debug("Updating payment", session_id=session_id, update=update_data)
 
-        resp = requests.patch(
-            f"{SUPABASE_URL}/rest/v1/payments?stripe_session_id=eq.{session_id}",
-            json=update_data,
-            headers=_get_headers()
-        )
+        # Guarded update: rows already completed by the webhook are left alone
+        resp, completed_rows = PaymentService.mark_completed(session_id, update_data)
 
-        print("SUPABASE PATCH STATUS:", resp.status_code)
-        print("SUPABASE PATCH RESPONSE:", resp.text)
-
-        if resp.status_code != 204:
+        if resp.status_code not in [200, 204]:
+            log.error("❌ Payment update failed", session_id=session_id,
+                      status=resp.status_code, response=resp.text)
             return jsonify({"error": "Supabase update failed"}), 500
 
-        print("✅ PAYMENT VERIFIED & STORED")
-        print("=================================================\n")
+        # Card/receipt lookups skipped for the budget stay unrecorded, so the
+        # session is left unprocessed and the webhook fills them in
+        if completed_rows and not details['skipped']:
+            processed_events.mark_processed(session_key)
+
+        log.info("✅ Payment verified", session_id=session_id,
+                 payment_intent=payment_intent.id, rows_updated=len(completed_rows),
+                 skipped=details['skipped'])
 
         return jsonify({"success": True})
 
     except Exception as e:
-        print("❌ VERIFY PAYMENT CRASH:", str(e))
+        log.exception("❌ Verify payment failed", error=str(e))
         return jsonify({"error": str(e)}), 500
@@ -1,10 +1,16 @@
 from flask import Blueprint, request, jsonify
 import stripe
 import os
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
-import traceback
+from services.supabase_client import SupabaseError
+from services.job_runner import job_runner, JobNotPersisted
+from services.payment_service import PaymentService
+from services.processed_events import processed_events
+from services.stripe_objects import StripeObjectService
+from services.logger import get_logger
+
+log = get_logger(__name__)
 
 # Load environment variables
 load_dotenv(override=True)
@@ -13,18 +19,12 @@ payment_webhook_bp = Blueprint('payment_webhook', __name__)
 
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
+# Processing attempts per event before it is dead-lettered, and the base backoff
+STRIPE_EVENT_MAX_ATTEMPTS = int(os.getenv('STRIPE_EVENT_MAX_ATTEMPTS', '5'))
+STRIPE_EVENT_RETRY_DELAY = int(os.getenv('STRIPE_EVENT_RETRY_DELAY', '30'))
 
-def _get_headers():
-    return {
-        'apikey': SUPABASE_KEY,
-        'Authorization': f'Bearer {SUPABASE_KEY}',
-        'Content-Type': 'application/json',
-        # IMPORTANT: Do NOT expect return body on PATCH
-        'Prefer': 'resolution=merge-duplicates'
-    }
+HANDLED_EVENTS = ('checkout.session.completed',)
 
 
 @payment_webhook_bp.route('/api/webhooks/stripe', methods=['POST'])
@@ -33,7 +33,7 @@ def stripe_webhook():
     sig_header = request.headers.get('Stripe-Signature')
 
     if not STRIPE_WEBHOOK_SECRET:
-        print("❌ Webhook secret not configured")
+        log.error("❌ Webhook secret not configured")
         return jsonify({'error': 'Webhook secret missing'}), 500
 
     try:
@@ -41,55 +41,109 @@ def stripe_webhook():
             payload, sig_header, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
-        print(f"❌ Invalid payload: {e}")
+        log.error(f"❌ Invalid payload: {e}")
         return jsonify({'error': 'Invalid payload'}), 400
     except stripe.error.SignatureVerificationError as e:
-        print(f"❌ Invalid signature: {e}")
+        log.error(f"❌ Invalid signature: {e}")
         return jsonify({'error': 'Invalid signature'}), 400
 
-    print("\n" + "=" * 70)
-    print(f"📥 Stripe Webhook Event: {event['type']}")
-    print("=" * 70)
+    log.info("📥 Stripe webhook event", event_type=event['type'], event_id=event.get('id'))
 
-    if event['type'] == 'checkout.session.completed':
+    if event['type'] in HANDLED_EVENTS:
+        # Redeliveries this worker already processed are acked without a job
+        session_key = None
+        if event['type'] == 'checkout.session.completed':
+            session_key = processed_events.session_key(event['data']['object'].get('id'))
+        processed_key = processed_events.is_processed(
+            processed_events.event_key(event.get('id')), session_key, local_only=True
+        )
+        if processed_key:
+            log.info("♻️ Stripe event already processed, not queued",
+                     event_id=event.get('id'), key=processed_key)
+            return jsonify({'status': 'ok'}), 200
+
+        # Ack first: processing (Stripe retrievals, Supabase writes) runs on
+        # the job runner with its own retries, so Stripe never waits on it.
+        # Only ack once the job row is saved; otherwise a 5xx makes Stripe
+        # redeliver instead of the event living in this worker's memory only
         try:
-            handle_checkout_completed(event['data']['object'])
-        except Exception as e:
-            print("❌ Error processing webhook:")
-            traceback.print_exc()
-            # Always return 200 so Stripe does NOT retry endlessly
+            job = job_runner.submit('stripe_event', {
+                'event_id': event.get('id'),
+                'type': event['type'],
+                'object_id': event['data']['object'].get('id'),
+                'received_at': datetime.utcnow().isoformat()
+            }, require_persisted=True)
+        except JobNotPersisted:
+            return jsonify({'error': 'Could not queue event, retry later'}), 503
+        log.info("📬 Stripe event queued", event_id=event.get('id'), job_id=job['id'])
 
     return jsonify({'status': 'ok'}), 200
 
 
+@payment_webhook_bp.route('/api/webhooks/stripe/queue', methods=['GET'])
+def stripe_event_queue():
+    """Depth, lag and dead letters of the Stripe event queue"""
+    try:
+        return jsonify({'success': True, 'queue': job_runner.stats('stripe_event')}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def process_stripe_event(job):
+    """
+    Job handler for 'stripe_event'
+
+    Events (and checkout sessions) already in the processed-event store are
+    skipped before any Stripe or Supabase call. Raises on failure so the job
+    runner retries it (and dead-letters it after STRIPE_EVENT_MAX_ATTEMPTS).
+    """
+    event = job.payload
+    event_key = processed_events.event_key(event['event_id'])
+    session_key = None
+    if event['type'] == 'checkout.session.completed':
+        session_key = processed_events.session_key(event['object_id'])
+
+    processed_key = processed_events.is_processed(event_key, session_key)
+    if processed_key:
+        log.info("♻️ Stripe event already processed, skipping",
+                 event_id=event['event_id'], key=processed_key)
+        return {'event_id': event['event_id'], 'type': event['type'], 'skipped': True}
+
+    completed = False
+    if event['type'] == 'checkout.session.completed':
+        completed = handle_checkout_completed({'id': event['object_id']})
+
+    processed_events.mark_processed(event_key, session_key if completed else None)
+    return {'event_id': event['event_id'], 'type': event['type']}
+
+
 def handle_checkout_completed(session_payload):
+    """
+    Mark the payment for a completed checkout session
+
+    When verify_payment completed it first but had to skip card/receipt
+    lookups (STRIPE_ENRICH_BUDGET), the missing fields are written here.
+
+    Returns:
+        bool: True if the payment record is complete (completed by this call,
+              or its card/receipt fields filled in); False if no record matched
+    """
     session_id = session_payload.get('id')
 
-    print("\n" + "=" * 70)
-    print(f"✅ Processing checkout.session.completed")
-    print(f"Session ID: {session_id}")
-    print("=" * 70)
+    log.debug("Processing checkout.session.completed", session_id=session_id)
 
     try:
         # ==========================================================
-        # 1️⃣ Retrieve full session with expansions
+        # 1️⃣ Retrieve full session with expansions (shared with verify_payment)
         # ==========================================================
-        session = stripe.checkout.Session.retrieve(
-            session_id,
-            expand=[
-                'payment_intent',
-                'payment_intent.payment_method',
-                'payment_intent.charges'
-            ]
-        )
+        session = StripeObjectService.checkout_session(session_id)
 
         payment_intent = session.payment_intent
         if not payment_intent:
-            print("❌ No payment_intent found")
-            return
+            log.error("❌ No payment_intent found")
+            return False
 
         payment_intent_id = payment_intent.id
-        print(f"✅ PaymentIntent: {payment_intent_id}")
 
         # ==========================================================
         # 2️⃣ Extract payment method (card)
@@ -98,46 +152,24 @@ def handle_checkout_completed(session_payload):
         card_last4 = None
         payment_method_type = 'card'
 
-        payment_method = payment_intent.payment_method
-
-        if isinstance(payment_method, str):
-            payment_method = stripe.PaymentMethod.retrieve(payment_method)
+        payment_method = StripeObjectService.payment_method(payment_intent.payment_method)
 
         if payment_method and hasattr(payment_method, 'card'):
             card_brand = payment_method.card.brand
             card_last4 = payment_method.card.last4
 
-        print(f"💳 Card: {card_brand} **** {card_last4}")
 
         # ==========================================================
         # 3️⃣ Extract receipt URL
         # ==========================================================
         receipt_url = None
 
-        if payment_intent.charges and payment_intent.charges.data:
-            receipt_url = payment_intent.charges.data[0].receipt_url
-
-        print(f"🧾 Receipt URL: {receipt_url}")
-
-        # ==========================================================
-        # 4️⃣ Verify payment record exists in Supabase
-        # ==========================================================
-        check_url = (
-            f"{SUPABASE_URL}/rest/v1/payments"
-            f"?stripe_session_id=eq.{session_id}&select=id"
-        )
-
-        check_resp = requests.get(check_url, headers=_get_headers())
+        if payment_intent.latest_charge:
+            receipt_url = StripeObjectService.charge(payment_intent.latest_charge).receipt_url
 
-        if check_resp.status_code != 200 or not check_resp.json():
-            print("❌ Payment record not found in database")
-            print("⚠️ Webhook will not update anything")
-            return
-
-        print("✅ Payment record found in database")
 
         # ==========================================================
-        # 5️⃣ Prepare update payload
+        # 4️⃣ Prepare update payload
         # ==========================================================
         update_data = {
             "status": "completed",
@@ -155,31 +187,42 @@ def handle_checkout_completed(session_payload):
         update_data = {k: v for k, v in update_data.items() if v is not None}
 
         # ==========================================================
-        # 6️⃣ Update payment record (PATCH)
+        # 5️⃣ Update payment record (single guarded PATCH; the returned
+        #    rows show whether a not-yet-completed payment matched)
         # ==========================================================
-        update_url = (
-            f"{SUPABASE_URL}/rest/v1/payments"
-            f"?stripe_session_id=eq.{session_id}"
-        )
-
-        resp = requests.patch(
-            update_url,
-            json=update_data,
-            headers=_get_headers()
-        )
-
-        if resp.status_code == 204:
-            print("✅ Payment record updated successfully")
-        else:
-            print(f"❌ Failed to update payment record")
-            print(f"Status: {resp.status_code}")
-            print(resp.text)
-
-        print("\n" + "=" * 70)
-        print("✅ WEBHOOK PROCESSING COMPLETE")
-        print("=" * 70)
-
-    except Exception as e:
-        print("❌ Fatal error in webhook handler")
-        traceback.print_exc()
+        resp, completed_rows = PaymentService.mark_completed(session_id, update_data)
+
+        if resp.status_code not in [200, 204]:
+            log.error("❌ Failed to update payment record", session_id=session_id,
+                      status=resp.status_code, response=resp.text)
+            raise SupabaseError(resp)
+
+        if not completed_rows:
+            details = {k: update_data[k] for k in ('card_brand', 'card_last4', 'receipt_url')
+                       if k in update_data}
+            if not details:
+                log.info("ℹ️ No pending payment record for session, nothing to update",
+                         session_id=session_id)
+                return False
+
+            resp, filled_rows = PaymentService.fill_details(session_id, details)
+            if resp.status_code not in [200, 204]:
+                log.error("❌ Failed to fill payment details", session_id=session_id,
+                          status=resp.status_code, response=resp.text)
+                raise SupabaseError(resp)
+            if not filled_rows:
+                log.info("ℹ️ No payment record for session, nothing to update",
+                         session_id=session_id)
+                return False
+
+            log.info("✅ Payment details filled in", session_id=session_id,
+                     fields=list(details))
+            return True
+
+        log.info("✅ Payment record updated", session_id=session_id,
+                 payment_intent=payment_intent_id, card_brand=card_brand)
+        return True
+
+    except Exception:
+        log.exception("❌ Fatal error in webhook handler")
         raise
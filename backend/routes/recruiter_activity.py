@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
 from services.recruiter_activity_service import RecruiterActivityService
+from services.activity_rollup_service import ActivityRollupService
+from services.response_cache import admin_cache
+from services.revenue_aggregator import parse_timestamp
 
 recruiter_activity_bp = Blueprint('recruiter_activity', __name__, url_prefix='/api/recruiter-activity')
 
@@ -24,7 +27,8 @@ def log_activity():
             activity_details=activity_details
         )
         
-        return jsonify(result), 200 if result['success'] else 500
+        # 202: the row is buffered and written in the next batch
+        return jsonify(result), 202 if result['success'] else 500
         
     except Exception as e:
         return jsonify({
@@ -32,9 +36,20 @@ def log_activity():
             'error': str(e)
         }), 500
 
+def _page_args():
+    """cursor / fields / since / until query parameters shared by the read endpoints"""
+    fields = request.args.get('fields')
+    return {
+        'cursor': request.args.get('cursor'),
+        'fields': [f.strip() for f in fields.split(',') if f.strip()] if fields else None,
+        # An unencoded '+' in a timestamp offset arrives as a space
+        'since': (request.args.get('since') or '').replace(' ', '+') or None,
+        'until': (request.args.get('until') or '').replace(' ', '+') or None
+    }
+
 @recruiter_activity_bp.route('/<recruiter_id>', methods=['GET'])
 def get_activities(recruiter_id):
-    """Get activities for a specific recruiter"""
+    """Get activities for a specific recruiter (cursor-paginated)"""
     try:
         limit = request.args.get('limit', 50, type=int)
         activity_type = request.args.get('activity_type')
@@ -42,11 +57,17 @@ def get_activities(recruiter_id):
         result = RecruiterActivityService.get_recruiter_activities(
             recruiter_id=recruiter_id,
             limit=limit,
-            activity_type=activity_type
+            activity_type=activity_type,
+            **_page_args()
         )
         
         return jsonify(result), 200 if result['success'] else 500
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -55,16 +76,52 @@ def get_activities(recruiter_id):
 
 @recruiter_activity_bp.route('/admin/all', methods=['GET'])
 def get_all_activities():
-    """Get all recruiter activities (admin only)"""
+    """Get all recruiter activities (admin only, cursor-paginated)"""
     try:
         limit = request.args.get('limit', 100, type=int)
         
-        result = RecruiterActivityService.get_all_recruiter_activities(limit=limit)
+        result = RecruiterActivityService.get_all_recruiter_activities(
+            limit=limit,
+            **_page_args()
+        )
         
         return jsonify(result), 200 if result['success'] else 500
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@recruiter_activity_bp.route('/admin/summary', methods=['GET'])
+def get_activity_summary():
+    """Activity counts per hour/day and activity type (admin only, from rollups)"""
+    try:
+        granularity = request.args.get('granularity', 'day')
+        recruiter_id = request.args.get('recruiter_id')
+        page = _page_args()
+        since = parse_timestamp(page['since']) if page['since'] else None
+        until = parse_timestamp(page['until']) if page['until'] else None
+        
+        summary = admin_cache.get_or_load(
+            ('activity_summary', tuple(sorted(request.args.items()))),
+            lambda: ActivityRollupService.get_summary(granularity, since, until, recruiter_id)
+        )
+        
+        return jsonify({'success': True, 'data': summary}), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -4,14 +4,17 @@ import os
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
+from services.spool import spool
+from services.response_cache import admin_cache, TICKET_NAMESPACES
+from services.logger import get_logger
+
+log = get_logger(__name__)
 
 load_dotenv()
 
 support_ticket_bp = Blueprint('support_ticket', __name__)
 
 # Configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 BREVO_API_KEY = os.getenv('BREVO_API_KEY')
 
 # ✅ TARGET EMAIL (Based on your requirements)
@@ -28,9 +31,6 @@ def submit_support_ticket():
     try:
         data = request.get_json()
         
-        print("\n" + "=" * 60)
-        print("🎫 SUPPORT TICKET RECEIVED")
-        
         # 1. Validate inputs
         required_fields = ['name', 'email', 'subject', 'message']
         for field in required_fields:
@@ -44,8 +44,7 @@ def submit_support_ticket():
         
         # 2. Generate ID
         ticket_id = f"TKT-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
-        print(f"   User: {user_name} ({user_email})")
-        print(f"   Ticket ID: {ticket_id}")
+        log.info("🎫 Support ticket", ticket_id=ticket_id, email=user_email)
 
         # 3. Store in DB with 'unread' status
         db_payload = {
@@ -58,33 +57,27 @@ def submit_support_ticket():
             'created_at': datetime.utcnow().isoformat()
         }
         
-        supabase_url = f"{SUPABASE_URL}/rest/v1/support_tickets"
-        supabase_headers = {
-            'apikey': SUPABASE_SERVICE_KEY,
-            'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        }
-        
-        db_response = requests.post(
-            supabase_url, 
-            json=db_payload, 
-            headers=supabase_headers, 
-            verify=False,
-            timeout=10
+        # Falls back to the on-disk spool if Supabase is slow or down
+        db_response, spooled = spool.insert(
+            'support_tickets',
+            db_payload,
+            prefer='return=representation'
         )
         
-        if db_response.status_code in [200, 201]:
-            print(f"✅ DB Save Success (Status: unread)")
+        if spooled:
+            log.info(f"💾 DB unavailable, ticket spooled for replay")
+        elif db_response.status_code in [200, 201]:
+            admin_cache.invalidate(*TICKET_NAMESPACES)
+            log.info(f"✅ DB Save Success (Status: unread)")
         else:
-            print(f"⚠️ DB Save Failed: {db_response.text}")
+            log.warning(f"⚠️ DB Save Failed: {db_response.text}")
 
         # 4. Send Email
         if not BREVO_API_KEY:
-            print("❌ BREVO_API_KEY is missing in .env")
+            log.error("❌ BREVO_API_KEY is missing in .env")
             return jsonify({'success': True, 'message': 'Ticket saved, but email config missing'}), 200
 
-        print(f"📤 Sending email to: {SUPPORT_EMAIL}")
+        log.info(f"📤 Sending email to: {SUPPORT_EMAIL}")
         
         email_payload = {
             "sender": {
@@ -137,15 +130,13 @@ def submit_support_ticket():
         )
         
         # 📝 DETAILED LOGGING FOR DEBUGGING
-        print(f"   Brevo Status: {brevo_resp.status_code}")
-        print(f"   Brevo Response: {brevo_resp.text}")
+        log.debug("Brevo response", status=brevo_resp.status_code, response=brevo_resp.text)
 
         if brevo_resp.status_code in [200, 201]:
-            print("✅ Email Sent Successfully")
+            log.info("✅ Email Sent Successfully")
         else:
-            print("❌ Email Failed to Send")
+            log.error("❌ Email Failed to Send")
 
-        print("=" * 60 + "\n")
 
         return jsonify({
             'success': True,
@@ -154,5 +145,5 @@ def submit_support_ticket():
         }), 200
 
     except Exception as e:
-        print(f"❌ Exception: {str(e)}")
+        log.error(f"❌ Exception: {str(e)}")
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
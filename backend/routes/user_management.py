@@ -1,9 +1,12 @@
 # backend/routes/user_management.py
 from flask import Blueprint, request, jsonify
-from services.user_service import UserService
+import os
+from services.job_runner import job_runner
 
 user_management_bp = Blueprint('user_management', __name__)
 
+BULK_DELETE_MAX_USERS = int(os.getenv('BULK_DELETE_MAX_USERS', '1000'))
+
 @user_management_bp.route('/api/admin/users/delete', methods=['POST'])
 def delete_user():
     try:
@@ -15,13 +18,64 @@ def delete_user():
         if not email:
             return jsonify({'success': False, 'error': 'Email required'}), 400
             
-        # Use the centralized Service
-        success = UserService.delete_user_data(email, user_id, reason)
+        # Use the centralized Service, run in the background job runner
+        job = job_runner.submit('user_deletion', {
+            'email': email,
+            'user_id': user_id,
+            'reason': reason
+        })
+        
+        return jsonify({
+            'success': True,
+            'message': 'User deletion started',
+            'job_id': job['id'],
+            'status_url': f"/api/admin/jobs/{job['id']}"
+        }), 202
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@user_management_bp.route('/api/admin/users/bulk-delete', methods=['POST'])
+def bulk_delete_users():
+    """
+    Delete and blacklist many users at once, as a background job
+    
+    Request body:
+    {
+        "emails": ["a@example.com", ...],
+        "user_ids": ["uuid", ...],
+        "reason": "Refund wave"
+    }
+
+    Returns 202 with the job id; poll status_url for the per-user summary.
+    """
+    try:
+        data = request.json or {}
+        emails = data.get('emails') or []
+        user_ids = data.get('user_ids') or []
+        reason = data.get('reason', 'Admin bulk deletion')
+        
+        if not emails and not user_ids:
+            return jsonify({'success': False, 'error': 'emails or user_ids required'}), 400
+        
+        if len(emails) + len(user_ids) > BULK_DELETE_MAX_USERS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {BULK_DELETE_MAX_USERS} users per request'
+            }), 400
+        
+        job = job_runner.submit('bulk_user_deletion', {
+            'emails': emails,
+            'user_ids': user_ids,
+            'reason': reason
+        })
         
         return jsonify({
-            'success': success, 
-            'message': 'User deleted and blacklisted'
-        }), 200
+            'success': True,
+            'message': 'Bulk deletion started',
+            'job_id': job['id'],
+            'status_url': f"/api/admin/jobs/{job['id']}"
+        }), 202
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,220 @@
+# backend/services/activity_rollup_service.py
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from services.supabase_client import SupabaseClient, SupabaseError
+from services.revenue_aggregator import parse_timestamp
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+# Raw recruiter_activity rows older than this are deleted by purge()
+ACTIVITY_RETENTION_DAYS = int(os.getenv('ACTIVITY_RETENTION_DAYS', '90'))
+# How far back each rollup run recomputes buckets (covers late or spooled events)
+ACTIVITY_ROLLUP_LOOKBACK_HOURS = int(os.getenv('ACTIVITY_ROLLUP_LOOKBACK_HOURS', '48'))
+# Raw rows deleted per purge statement
+ACTIVITY_PURGE_BATCH = int(os.getenv('ACTIVITY_PURGE_BATCH', '5000'))
+
+GRANULARITIES = ('hour', 'day')
+
+ROLLUP_STATE_TABLE = 'recruiter_activity_rollup_state'
+
+
+def _iso(dt):
+    return dt.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class ActivityRollupService:
+    """
+    Hourly/daily recruiter activity counts (see sql/recruiter_activity_rollups.sql)
+
+    rollup() overwrites every bucket in a trailing window, so it can run as
+    often as wanted (e.g. hourly from cron), and records a high-water mark
+    in recruiter_activity_rollup_state. A run starts at the mark when that
+    is older than the window, so missed cron runs are caught up. purge()
+    deletes raw events past the retention age in batches, but never past
+    the mark or inside the rollup window, so events are always counted
+    before they are removed. Admin summaries read only the rollup table.
+    """
+
+    @staticmethod
+    def rolled_up_until():
+        """
+        High-water mark: every event created before it has been rolled up
+
+        Returns:
+            datetime or None: The mark, or None if no rollup has run yet
+
+        Raises:
+            SupabaseError: If the state table can't be read
+        """
+        response = SupabaseClient.select(ROLLUP_STATE_TABLE, 'select=rolled_up_until')
+        if response.status_code != 200:
+            raise SupabaseError(response)
+        rows = response.json()
+        if not rows or not rows[0].get('rolled_up_until'):
+            return None
+        return parse_timestamp(rows[0]['rolled_up_until'])
+
+    @staticmethod
+    def rollup(since=None, until=None):
+        """
+        Recompute hour and day buckets between since and until
+
+        Args:
+            since: Start datetime (defaults to ACTIVITY_ROLLUP_LOOKBACK_HOURS
+                   ago, or the high-water mark if that is older)
+            until: End datetime (defaults to the start of the current hour,
+                   so the open hour is never stored)
+
+        Returns:
+            int: Rollup rows written
+
+        Raises:
+            SupabaseError: If the state or the rollup function fails
+        """
+        now = datetime.now(timezone.utc)
+        until = until or now.replace(minute=0, second=0, microsecond=0)
+        if since is None:
+            since = until - timedelta(hours=ACTIVITY_ROLLUP_LOOKBACK_HOURS)
+            mark = ActivityRollupService.rolled_up_until()
+            if mark is not None and mark < since:
+                log.warning(f"⚠️ Rollups stopped at {_iso(mark)}, catching up")
+                since = mark
+
+        log.info(f"🔄 Rolling up recruiter activity {_iso(since)} → {_iso(until)}")
+        response = SupabaseClient.rpc('rollup_recruiter_activity', {
+            'p_start': _iso(since),
+            'p_end': _iso(until)
+        }, timeout=300)
+        if response.status_code != 200:
+            raise SupabaseError(response)
+
+        log.info(f"✅ Recruiter activity rollups written: {response.json()} rows")
+        return response.json()
+
+    @staticmethod
+    def purge(retention_days=ACTIVITY_RETENTION_DAYS, batch_size=ACTIVITY_PURGE_BATCH):
+        """
+        Delete raw activity older than retention_days, batch_size rows at a time
+
+        The cutoff is clamped to the rollup high-water mark and the start of
+        the rollup window, so nothing is deleted before a rollup run has
+        counted it (and nothing at all before the first rollup).
+
+        Returns:
+            int: Raw rows deleted
+
+        Raises:
+            SupabaseError: If the state or a delete batch fails
+        """
+        mark = ActivityRollupService.rolled_up_until()
+        if mark is None:
+            log.warning("⚠️ Recruiter activity never rolled up, nothing purged")
+            return 0
+
+        now = datetime.now(timezone.utc)
+        rollup_start = now - timedelta(hours=ACTIVITY_ROLLUP_LOOKBACK_HOURS)
+        rollup_start = rollup_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff = min(now - timedelta(days=retention_days), rollup_start, mark)
+
+        log.info(f"🧹 Purging recruiter activity before {_iso(cutoff)}")
+        total = 0
+        while True:
+            response = SupabaseClient.rpc('purge_recruiter_activity', {
+                'p_before': _iso(cutoff),
+                'p_batch': batch_size
+            }, timeout=120)
+            if response.status_code != 200:
+                raise SupabaseError(response)
+
+            deleted = response.json() or 0
+            total += deleted
+            if deleted < batch_size:
+                break
+
+        log.info(f"✅ Purged {total} recruiter activity rows")
+        return total
+
+    @staticmethod
+    def get_summary(granularity='day', since=None, until=None, recruiter_id=None):
+        """
+        Activity counts per bucket and activity type, from the rollup table
+
+        Args:
+            granularity: 'hour' or 'day'
+            since: Start datetime (defaults to 30 days, or 48 hours for 'hour', ago)
+            until: End datetime (defaults to now)
+            recruiter_id: Limit to one recruiter (optional)
+
+        Returns:
+            dict: {'granularity', 'since', 'until', 'series': [{bucket, activity_type,
+                  count, recruiters}], 'totals': {activity_type: count}}
+
+        Raises:
+            ValueError: For an unknown granularity or an empty range
+            SupabaseError: If the summary function fails
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+        # Naive datetimes (e.g. a bare YYYY-MM-DD) are taken as UTC
+        if until:
+            until = until.replace(tzinfo=until.tzinfo or timezone.utc)
+        else:
+            until = datetime.now(timezone.utc)
+        if since:
+            since = since.replace(tzinfo=since.tzinfo or timezone.utc)
+        else:
+            since = until - (timedelta(hours=48) if granularity == 'hour' else timedelta(days=30))
+        if since >= until:
+            raise ValueError('since must be before until')
+
+        response = SupabaseClient.rpc('recruiter_activity_summary', {
+            'p_granularity': granularity,
+            'p_start': _iso(since),
+            'p_end': _iso(until),
+            'p_recruiter_id': recruiter_id
+        })
+        if response.status_code != 200:
+            raise SupabaseError(response)
+
+        series = response.json() or []
+        totals = {}
+        for row in series:
+            totals[row['activity_type']] = totals.get(row['activity_type'], 0) + row['count']
+
+        return {
+            'granularity': granularity,
+            'since': _iso(since),
+            'until': _iso(until),
+            'series': series,
+            'totals': totals
+        }
+
+
+if __name__ == '__main__':
+    # Usage (from the backend folder, e.g. hourly from cron):
+    #   python -m services.activity_rollup_service rollup [--since YYYY-MM-DD]
+    #   python -m services.activity_rollup_service purge
+    #   python -m services.activity_rollup_service run      (rollup, then purge)
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    args = sys.argv[1:]
+    command = args[0] if args else None
+    if command not in ('rollup', 'purge', 'run'):
+        print("Usage: python -m services.activity_rollup_service rollup [--since YYYY-MM-DD] | purge | run")
+        sys.exit(2)
+
+    try:
+        if command in ('rollup', 'run'):
+            since = None
+            if '--since' in args:
+                since = datetime.strptime(args[args.index('--since') + 1], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            ActivityRollupService.rollup(since=since)
+        if command in ('purge', 'run'):
+            ActivityRollupService.purge()
+    except SupabaseError as e:
+        print(f"❌ {command} failed: {e}")
+        sys.exit(1)
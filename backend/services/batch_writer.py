@@ -0,0 +1,136 @@
+# backend/services/batch_writer.py
+import atexit
+import os
+import threading
+import time
+from services.spool import spool
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+# Rows per array insert; reaching it wakes the flusher early
+ACTIVITY_BATCH_SIZE = int(os.getenv('ACTIVITY_BATCH_SIZE', '100'))
+# Longest a buffered row waits before it is written
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '2'))
+# Rows kept in memory if even the spool fails; the oldest are dropped beyond this
+ACTIVITY_MAX_BUFFER = int(os.getenv('ACTIVITY_MAX_BUFFER', '10000'))
+
+
+class BatchWriter:
+    """
+    Buffers rows for one table and writes them as array inserts
+
+    add() only appends to an in-memory list. A background thread flushes when
+    the buffer reaches batch_size or flush_interval seconds have passed, and
+    once more at interpreter exit. Batches Supabase cannot take right now go
+    to the on-disk spool (services/spool.py) and are replayed from there; a
+    batch is only kept in memory if spooling fails too. Rows must share the
+    same keys (PostgREST bulk insert requirement).
+    """
+
+    def __init__(self, table, batch_size=ACTIVITY_BATCH_SIZE,
+                 flush_interval=ACTIVITY_FLUSH_INTERVAL, max_buffer=ACTIVITY_MAX_BUFFER):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        atexit.register(self.flush)
+
+    def _ensure_thread(self):
+        """Start the flusher thread for this process (again after a fork)"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._pid = pid
+                    threading.Thread(target=self._run, daemon=True).start()
+
+    def add(self, row):
+        """Queue a row; returns immediately"""
+        self._ensure_thread()
+        with self._lock:
+            self._buffer.append(row)
+            size = len(self._buffer)
+        if size >= self.batch_size:
+            self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _take(self):
+        with self._lock:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+            return batch
+
+    def _requeue(self, batch):
+        with self._lock:
+            self._buffer[:0] = batch
+            overflow = len(self._buffer) - self.max_buffer
+            if overflow > 0:
+                del self._buffer[:overflow]
+                log.warning(f"⚠️ {self.table} buffer full, dropped {overflow} oldest rows")
+
+    def write_batch(self, batch):
+        """
+        Insert one batch
+
+        Rows Supabase rejects as invalid are isolated by bisecting the batch
+        and set aside in the spool's rejected.jsonl; the rest are written.
+        Temporary errors (401/403/429, ...) leave rows to be retried.
+
+        Returns:
+            list: Rows not written yet (empty once every row was inserted,
+                  spooled or set aside as invalid)
+        """
+        def insert(rows):
+            response, spooled = spool.insert(self.table, rows, prefer='return=minimal')
+            return None if spooled else response
+
+        try:
+            return spool.insert_valid(self.table, batch, insert)
+        except Exception as e:
+            log.error(f"❌ {self.table} batch write failed: {e}")
+        return batch
+
+    def flush(self):
+        """
+        Write everything buffered so far
+
+        Returns:
+            int: Rows written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                remaining = self.write_batch(batch)
+                written += len(batch) - len(remaining)
+                if remaining:
+                    self._requeue(remaining)
+                    break
+        if written:
+            log.debug(f"✅ Flushed {written} rows to {self.table}")
+        return written
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                if self.flush() == 0 and self.pending():
+                    time.sleep(self.flush_interval)  # insert failing; back off
+            except Exception as e:
+                log.warning(f"⚠️ {self.table} flush failed: {e}")
+
+
+# Shared writer for recruiter activity events (per worker process)
+activity_writer = BatchWriter('recruiter_activity')
@@ -0,0 +1,156 @@
+# backend/services/blacklist_index.py
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+from services.supabase_client import SupabaseClient
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+# Seconds between incremental refreshes (rows with a newer updated_at)
+BLACKLIST_REFRESH_SECONDS = float(os.getenv('BLACKLIST_REFRESH_SECONDS', '30'))
+# Each refresh re-reads this far behind the watermark, for rows whose
+# transaction committed after a later-stamped row was already seen
+BLACKLIST_REFRESH_OVERLAP_SECONDS = float(os.getenv('BLACKLIST_REFRESH_OVERLAP_SECONDS', '5'))
+# Seconds between full reloads (picks up rows removed from deleted_users)
+BLACKLIST_FULL_RELOAD_SECONDS = float(os.getenv('BLACKLIST_FULL_RELOAD_SECONDS', '600'))
+
+BLACKLIST_COLUMNS = 'email,reason,deleted_at,deleted_by,original_user_id,updated_at'
+
+
+class BlacklistIndex:
+    """
+    Process-local index of the deleted_users blacklist
+
+    Lookups are a dict access keyed by lower-cased email, so auth checks
+    answer without a network hop. The index is loaded once, then refreshed
+    incrementally in the background using a watermark on updated_at, which
+    the database stamps on every insert/update (sql/deleted_users_updated_at.sql),
+    and fully reloaded now and then so removed rows drop out. Until the first load has
+    succeeded, callers should fall back to a live query (loaded is False).
+    """
+
+    def __init__(self, refresh_seconds=BLACKLIST_REFRESH_SECONDS,
+                 full_reload_seconds=BLACKLIST_FULL_RELOAD_SECONDS,
+                 overlap_seconds=BLACKLIST_REFRESH_OVERLAP_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self.overlap_seconds = overlap_seconds
+        self._records = {}
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._last_full_load > 0
+
+    def _fetch(self, query=''):
+        return SupabaseClient.iter_rows(
+            'deleted_users',
+            '&'.join(part for part in [f'select={BLACKLIST_COLUMNS}', query] if part),
+            descending=False,
+            cursor=('updated_at', 'email')
+        )
+
+    def load(self):
+        """Replace the index with a full copy of deleted_users"""
+        records = {}
+        watermark = None
+        for row in self._fetch():
+            records[row['email'].lower()] = row
+            watermark = row.get('updated_at') or watermark
+
+        now = time.monotonic()
+        with self._lock:
+            self._records = records
+            self._watermark = watermark
+            self._last_refresh = now
+            self._last_full_load = now
+        log.info(f"✅ Blacklist index loaded: {len(records)} emails")
+
+    def refresh(self):
+        """
+        Pull rows updated since the watermark (new or re-blacklisted emails)
+
+        The query starts overlap_seconds before the watermark and includes
+        rows stamped exactly at it (gte), so rows sharing a timestamp or
+        committed slightly late are not missed; rows already applied with
+        the same updated_at are skipped.
+        """
+        if self._watermark is None:
+            return self.load()
+
+        since = datetime.fromisoformat(self._watermark.replace('Z', '+00:00'))
+        since -= timedelta(seconds=self.overlap_seconds)
+        rows = list(self._fetch(f"updated_at=gte.{quote(since.isoformat())}"))
+
+        applied = 0
+        with self._lock:
+            for row in rows:
+                key = row['email'].lower()
+                current = self._records.get(key)
+                if current is not None and current.get('updated_at') == row.get('updated_at'):
+                    continue
+                self._records[key] = row
+                applied += 1
+            if rows:
+                # Rows arrive in updated_at order, so the last one is the newest
+                self._watermark = max(self._watermark, rows[-1].get('updated_at') or self._watermark,
+                                      key=lambda ts: datetime.fromisoformat(ts.replace('Z', '+00:00')))
+            self._last_refresh = time.monotonic()
+        if applied:
+            log.info(f"🔄 Blacklist index refreshed: {applied} emails")
+
+    def _refresh_in_background(self):
+        try:
+            if time.monotonic() - self._last_full_load >= self.full_reload_seconds:
+                self.load()
+            else:
+                self.refresh()
+        except Exception as e:
+            log.warning(f"⚠️ Blacklist index refresh failed: {e}")
+            self._last_refresh = time.monotonic()  # back off until the next interval
+        finally:
+            self._refreshing = False
+
+    def schedule_refresh(self):
+        """Start one background refresh if the index is stale"""
+        if time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def ensure_loaded(self):
+        """Load synchronously if never loaded; returns True when the index is usable"""
+        if not self.loaded:
+            try:
+                self.load()
+            except Exception as e:
+                log.warning(f"⚠️ Blacklist index load failed: {e}")
+                return False
+        return True
+
+    def lookup(self, email):
+        """
+        Returns:
+            dict or None: The deleted_users record for email, if blacklisted
+        """
+        self.schedule_refresh()
+        return self._records.get(email.lower())
+
+    def add(self, record):
+        """Insert or replace a record immediately (used by add_to_blacklist)"""
+        with self._lock:
+            self._records[record['email'].lower()] = record
+
+
+# Shared index (per worker process)
+blacklist_index = BlacklistIndex()
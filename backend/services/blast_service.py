@@ -0,0 +1,292 @@
+# backend/services/blast_service.py
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.job_runner import job_runner, JobDeferred
+from services.response_cache import TTLCache
+from services.logger import get_logger, LOG_HOT_PATH_SAMPLE
+
+log = get_logger(__name__)
+
+# Get webhook URL from environment
+MAKE_WEBHOOK_URL = os.getenv('MAKE_WEBHOOK_URL')
+MAKE_WEBHOOK_TIMEOUT = int(os.getenv('MAKE_WEBHOOK_TIMEOUT', '30'))
+
+# Recipients per Make.com request
+BLAST_CHUNK_SIZE = int(os.getenv('BLAST_CHUNK_SIZE', '50'))
+# Chunks of one blast in flight at once
+BLAST_CHUNK_CONCURRENCY = int(os.getenv('BLAST_CHUNK_CONCURRENCY', '4'))
+# Extra attempts per chunk after the first, with exponential backoff
+BLAST_CHUNK_RETRIES = int(os.getenv('BLAST_CHUNK_RETRIES', '2'))
+BLAST_RETRY_BACKOFF = float(os.getenv('BLAST_RETRY_BACKOFF', '1'))
+# Times a blast waits out an open Make.com circuit before its held-back chunks fail
+BLAST_MAX_DEFERRALS = int(os.getenv('BLAST_MAX_DEFERRALS', '20'))
+
+# Make.com circuit breaker: opens when at least MAKE_BREAKER_FAILURE_RATE of the
+# calls in the last MAKE_BREAKER_WINDOW seconds failed or took MAKE_BREAKER_SLOW_SECONDS+
+MAKE_BREAKER_WINDOW = float(os.getenv('MAKE_BREAKER_WINDOW', '60'))
+MAKE_BREAKER_MIN_CALLS = int(os.getenv('MAKE_BREAKER_MIN_CALLS', '5'))
+MAKE_BREAKER_FAILURE_RATE = float(os.getenv('MAKE_BREAKER_FAILURE_RATE', '0.5'))
+MAKE_BREAKER_SLOW_SECONDS = float(os.getenv('MAKE_BREAKER_SLOW_SECONDS', '10'))
+MAKE_BREAKER_OPEN_SECONDS = float(os.getenv('MAKE_BREAKER_OPEN_SECONDS', '30'))
+
+# How long a blast's idempotency key (or payload hash) maps to its job
+BLAST_DEDUP_TTL = float(os.getenv('BLAST_DEDUP_TTL', '600'))
+BLAST_DEDUP_MAX_ENTRIES = int(os.getenv('BLAST_DEDUP_MAX_ENTRIES', '1024'))
+
+
+class BlastError(Exception):
+    """Raised when Make.com rejects or cannot be reached for a blast"""
+    pass
+
+
+class IdempotencyKeyReused(BlastError):
+    """Raised when an Idempotency-Key is sent again with a different payload"""
+    pass
+
+
+# Shared breaker for MAKE_WEBHOOK_URL (per worker process)
+make_breaker = CircuitBreaker(
+    'Make.com',
+    window_seconds=MAKE_BREAKER_WINDOW,
+    min_calls=MAKE_BREAKER_MIN_CALLS,
+    failure_rate=MAKE_BREAKER_FAILURE_RATE,
+    slow_call_seconds=MAKE_BREAKER_SLOW_SECONDS,
+    slow_call_rate=MAKE_BREAKER_FAILURE_RATE,
+    open_seconds=MAKE_BREAKER_OPEN_SECONDS
+)
+
+# Recent blasts by idempotency key (per worker process)
+blast_dedup = TTLCache(ttl=BLAST_DEDUP_TTL, max_entries=BLAST_DEDUP_MAX_ENTRIES)
+
+
+class BlastService:
+    """
+    Sends resume blasts to the Make.com webhook from background jobs
+
+    /api/blast/send only queues a 'blast' job and returns its id; the
+    Make.com calls run on the job runner (services/job_runner.py), so web
+    workers are never held for the webhook's latency. Large recipient lists
+    are split into chunks that succeed or fail independently.
+    """
+
+    @staticmethod
+    def dispatch(blast_data):
+        """
+        Queue a blast
+
+        Returns:
+            dict: Public job view (id, status, ...)
+        """
+        return job_runner.submit('blast', blast_data)
+
+    @staticmethod
+    def fingerprint(blast_data):
+        """SHA-256 of the payload with keys sorted, used when no Idempotency-Key is sent"""
+        canonical = json.dumps(blast_data, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @staticmethod
+    def dispatch_once(blast_data, idempotency_key=None):
+        """
+        Queue a blast unless the same one was queued within BLAST_DEDUP_TTL
+
+        Concurrent duplicates share one dispatch (single-flight); later
+        duplicates get the original blast's current state.
+
+        Args:
+            blast_data: Blast payload
+            idempotency_key: Client Idempotency-Key header (optional; the
+                             payload hash is used when absent)
+
+        Returns:
+            tuple: (public job view, replayed bool)
+
+        Raises:
+            IdempotencyKeyReused: If the key was used for a different payload
+        """
+        fingerprint = BlastService.fingerprint(blast_data)
+        key = ('blast', idempotency_key or fingerprint)
+        created = []
+
+        def load():
+            job = BlastService.dispatch(blast_data)
+            created.append(True)
+            return {'job': job, 'fingerprint': fingerprint}
+
+        entry = blast_dedup.get_or_load(key, load)
+        if entry['fingerprint'] != fingerprint:
+            raise IdempotencyKeyReused('Idempotency-Key was already used with a different payload')
+        if created:
+            return entry['job'], False
+
+        log.info(f"♻️ Duplicate blast request, returning blast {entry['job']['id']}")
+        return job_runner.get(entry['job']['id']) or entry['job'], True
+
+    @staticmethod
+    def retry(blast_id):
+        """
+        Re-queue a failed blast; chunks that already succeeded are not resent
+
+        Returns:
+            dict or None: Public job view, or None if the blast is not a failed blast
+        """
+        job = job_runner.get(blast_id)
+        if job is None or job['job_type'] != 'blast':
+            return None
+        return job_runner.retry(blast_id)
+
+    @staticmethod
+    def _chunks(recipients):
+        return [recipients[i:i + BLAST_CHUNK_SIZE] for i in range(0, len(recipients), BLAST_CHUNK_SIZE)]
+
+    @staticmethod
+    def send_chunk(blast_data, recipients, index, count):
+        """
+        POST one chunk of recipients to Make.com, retrying with backoff
+
+        Every attempt goes through make_breaker; while it is open (or its
+        half-open probe is taken) the chunk is not sent and comes back with
+        deferred and retry_after instead of waiting on the webhook.
+
+        Returns:
+            dict: ok, status_code, response/error, attempts, duration_ms,
+                  recipients (plus deferred, retry_after when held back)
+        """
+        payload = dict(blast_data, recipients=recipients, chunk_index=index, chunk_count=count)
+        started = time.monotonic()
+        outcome = {'ok': False, 'recipients': len(recipients)}
+
+        for attempt in range(1, BLAST_CHUNK_RETRIES + 2):
+            try:
+                make_breaker.acquire()
+            except CircuitOpenError as e:
+                outcome['error'] = str(e)
+                outcome['deferred'] = True
+                outcome['retry_after'] = e.retry_after
+                break
+            outcome['attempts'] = attempt
+            call_started = time.monotonic()
+            try:
+                response = requests.post(
+                    MAKE_WEBHOOK_URL,
+                    json=payload,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=MAKE_WEBHOOK_TIMEOUT
+                )
+                make_breaker.record(
+                    response.status_code < 500 and response.status_code != 429,
+                    time.monotonic() - call_started
+                )
+                outcome['status_code'] = response.status_code
+                outcome['response'] = response.text[:500]
+                outcome.pop('error', None)
+                if response.status_code < 400:
+                    outcome['ok'] = True
+                    break
+                outcome['error'] = f'Make.com returned error: {response.status_code}'
+                if response.status_code < 500 and response.status_code != 429:
+                    break  # the payload itself was rejected; retrying won't help
+            except requests.exceptions.Timeout:
+                make_breaker.record(False, time.monotonic() - call_started)
+                outcome['error'] = 'Request to Make.com timed out'
+            except requests.exceptions.RequestException as e:
+                make_breaker.record(False, time.monotonic() - call_started)
+                outcome['error'] = f'Failed to connect to Make.com: {str(e)}'
+
+            if attempt <= BLAST_CHUNK_RETRIES:
+                time.sleep(BLAST_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        outcome['duration_ms'] = int((time.monotonic() - started) * 1000)
+        return outcome
+
+    @staticmethod
+    def run_blast_job(job):
+        """
+        Job handler for 'blast': forward the recipients to Make.com in chunks
+
+        Chunks of BLAST_CHUNK_SIZE recipients are sent BLAST_CHUNK_CONCURRENCY
+        at a time, each with its own retries. Every finished chunk is saved as
+        job progress, so a resumed or retried blast only sends the chunks that
+        have not succeeded yet. Chunks held back by the Make.com circuit
+        breaker are not failures: the job is deferred until the breaker
+        admits calls again and then sends only those (and unsent) chunks, at
+        most BLAST_MAX_DEFERRALS times.
+
+        Returns:
+            dict: recipients_count, sent_count, failed_count, chunk_count,
+                  started_at, duration_ms and per-chunk results
+
+        Raises:
+            JobDeferred: While chunks are held back by the open circuit
+            BlastError: If any chunk still failed after its retries
+        """
+        blast_data = job.payload
+        recipients = blast_data.get('recipients', [])
+        chunks = BlastService._chunks(recipients)
+        started = time.monotonic()
+
+        progress = dict(job.progress or {})
+        progress.setdefault('started_at', datetime.utcnow().isoformat())
+        progress['recipients_count'] = len(recipients)
+        progress['chunk_count'] = len(chunks)
+        results = dict(progress.get('chunks') or {})
+        progress['chunks'] = results
+        lock = threading.Lock()
+
+        if progress.get('deferred_chunks'):
+            # Resuming after a deferral: chunks that already failed for good stay failed
+            pending = sorted(set(progress['deferred_chunks']) |
+                             {i for i in range(len(chunks)) if str(i) not in results})
+        else:
+            pending = [i for i in range(len(chunks)) if not (results.get(str(i)) or {}).get('ok')]
+            progress['deferrals'] = 0
+        progress['deferred_chunks'] = []
+        log.info("📡 Sending blast to Make.com", blast_id=job.id, recipients=len(recipients),
+                 chunks=len(chunks), pending_chunks=len(pending))
+
+        def send(index):
+            outcome = BlastService.send_chunk(blast_data, chunks[index], index, len(chunks))
+            with lock:
+                results[str(index)] = outcome
+                job.save_progress(progress)
+            fields = dict(blast_id=job.id, chunk=index + 1, chunks=len(chunks),
+                          status=outcome.get('status_code'), duration_ms=outcome['duration_ms'])
+            if outcome['ok']:
+                log.info("📥 Blast chunk sent", sample=LOG_HOT_PATH_SAMPLE, **fields)
+            elif outcome.get('deferred'):
+                log.info("⏸️ Blast chunk held back by open circuit", retry_after=outcome['retry_after'], **fields)
+            else:
+                log.warning("⚠️ Blast chunk failed", error=outcome.get('error'), **fields)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(BLAST_CHUNK_CONCURRENCY, len(pending))) as executor:
+                list(executor.map(send, pending))
+
+        deferred = [i for i in pending if results[str(i)].get('deferred')]
+        if deferred:
+            progress['deferrals'] = progress.get('deferrals', 0) + 1
+            if progress['deferrals'] <= BLAST_MAX_DEFERRALS:
+                progress['deferred_chunks'] = deferred
+                job.save_progress(progress)
+                retry_after = max(results[str(i)]['retry_after'] for i in deferred)
+                raise JobDeferred(retry_after, f'{len(deferred)} of {len(chunks)} chunks waiting '
+                                               f'for the Make.com circuit to close')
+
+        sent = sum(results[str(i)]['recipients'] for i in range(len(chunks)) if results[str(i)]['ok'])
+        failed_chunks = [i for i in range(len(chunks)) if not results[str(i)]['ok']]
+        progress['sent_count'] = sent
+        progress['failed_count'] = len(recipients) - sent
+        progress['duration_ms'] = int((time.monotonic() - started) * 1000)
+
+        if failed_chunks:
+            job.save_progress(progress)
+            raise BlastError(f'{len(failed_chunks)} of {len(chunks)} chunks failed')
+
+        return progress
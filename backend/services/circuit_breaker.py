@@ -0,0 +1,153 @@
+# backend/services/circuit_breaker.py
+import math
+import threading
+import time
+from collections import deque
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised by check()/acquire() instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"{name} circuit is open; retry after {retry_after}s")
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker over a rolling window of calls
+
+    Each call is recorded with its outcome and duration. Once the window holds
+    at least min_calls, the circuit opens when the failure rate or the slow
+    call rate reaches its threshold. While open, allow() is False (callers
+    fail fast with retry_after()) until open_seconds pass; then half_open_calls
+    probe calls are let through. A successful, fast probe closes the circuit;
+    any failed or slow probe opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window_seconds=60, min_calls=5, failure_rate=0.5,
+                 slow_call_seconds=10, slow_call_rate=0.5, open_seconds=30, half_open_calls=1):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._calls = deque()  # (timestamp, failed, slow)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._calls.clear()
+        log.warning(f"🔴 {self.name} circuit opened for {self.open_seconds}s")
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a call may go through now"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.open_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probes = 0
+                log.info(f"🟡 {self.name} circuit half-open, probing")
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    return False
+                self._probes += 1
+            return True
+
+    def acquire(self):
+        """
+        Like allow(), but raise instead of returning False
+
+        Raises:
+            CircuitOpenError: If the call may not go through now
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, max(1, self.retry_after()))
+
+    def check(self):
+        """
+        Fail fast while the circuit is open, without taking a half-open probe
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.state == self.OPEN:
+            raise CircuitOpenError(self.name, max(1, self.retry_after()))
+
+    def record(self, success, duration):
+        """Record the outcome and duration (seconds) of a call that allow() let through"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.HALF_OPEN:
+                if success and not slow:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                    log.info(f"🟢 {self.name} circuit closed")
+                else:
+                    self._open(now)
+                return
+            if self._state == self.OPEN:
+                return
+
+            self._calls.append((now, not success, slow))
+            self._prune(now)
+            total = len(self._calls)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            slow_calls = sum(1 for _, _, is_slow in self._calls if is_slow)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._open(now)
+
+    def retry_after(self):
+        """Whole seconds until the circuit will admit a probe (0 if not open)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0
+            return max(0, math.ceil(self.open_seconds - (time.monotonic() - self._opened_at)))
+
+    def snapshot(self):
+        """State and window statistics, for health/metrics endpoints"""
+        state = self.state
+        with self._lock:
+            self._prune(time.monotonic())
+            total = len(self._calls)
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            slow_calls = sum(1 for _, _, is_slow in self._calls if is_slow)
+        return {
+            'name': self.name,
+            'state': state,
+            'window_calls': total,
+            'window_failures': failures,
+            'window_slow_calls': slow_calls,
+            'retry_after': self.retry_after()
+        }
@@ -0,0 +1,483 @@
+# backend/services/job_runner.py
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+from services.supabase_client import SupabaseClient
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+# A running job must save progress (or finish) within this many seconds,
+# otherwise another worker treats it as crashed and resumes it
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '300'))
+JOB_RECOVERY_INTERVAL = int(os.getenv('JOB_RECOVERY_INTERVAL', '60'))
+# Finished jobs kept in memory for status reads when the jobs table was not
+# written (persisted ones are dropped from memory once their final state is saved)
+JOB_MEMORY_MAX_ENTRIES = int(os.getenv('JOB_MEMORY_MAX_ENTRIES', '1000'))
+
+JOBS_TABLE = 'background_jobs'
+TERMINAL_STATUSES = ('completed', 'failed', 'dead_letter')
+PUBLIC_FIELDS = ('id', 'job_type', 'status', 'progress', 'result', 'error',
+                 'attempts', 'created_at', 'updated_at')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class JobNotPersisted(Exception):
+    """Raised by submit(require_persisted=True) when the jobs table write failed"""
+
+    def __init__(self, job_id, reason):
+        self.job_id = job_id
+        super().__init__(f"Job {job_id} not persisted ({reason})")
+
+
+class JobDeferred(Exception):
+    """
+    Raised by a handler to run the job again after retry_after seconds
+
+    Unlike a failure it does not use up an attempt, e.g. for work held back
+    by an open circuit breaker.
+    """
+
+    def __init__(self, retry_after, reason=''):
+        self.retry_after = retry_after
+        super().__init__(reason or f"deferred for {retry_after}s")
+
+
+class Job:
+    """Handle given to a job handler: its payload, saved progress and a way to save more"""
+
+    def __init__(self, runner, row):
+        self._runner = runner
+        self.id = row['id']
+        self.job_type = row['job_type']
+        self.payload = row.get('payload') or {}
+        self.progress = row.get('progress') or {}
+        self.attempts = row.get('attempts', 0)
+
+    def save_progress(self, progress):
+        """Persist progress and renew the lease; a resumed job starts from here"""
+        self.progress = progress
+        self._runner._update(self.id, {'progress': progress}, renew_lease=True)
+
+
+class JobRunner:
+    """
+    Background job runner backed by the background_jobs table (sql/background_jobs.sql)
+
+    submit() records the job and hands it to a per-process thread pool, so
+    HTTP handlers can return 202 right away. Handlers receive a Job and call
+    job.save_progress() after each step. Each claim holds a lease; jobs whose
+    lease expired (worker crash, deploy) are picked up again by the recovery
+    loop on any worker and resume from their saved progress. Job types
+    registered with max_attempts > 1 are retried with backoff and end up in
+    'dead_letter' when every attempt failed. Handlers raising JobDeferred
+    are re-queued after its retry_after without using up an attempt.
+
+    If the table is unavailable, jobs still run but are only tracked in memory.
+    A job is only ever queued or running once per process: recovery skips
+    jobs this process still holds, even when a slow step outlasted the lease.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, lease_seconds=JOB_LEASE_SECONDS,
+                 recovery_interval=JOB_RECOVERY_INTERVAL, max_remembered=JOB_MEMORY_MAX_ENTRIES):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.recovery_interval = recovery_interval
+        self.max_remembered = max_remembered
+        self._handlers = {}
+        self._policies = {}  # job type -> (max_attempts, retry_delay)
+        self._pending = 0    # queued on this process's pool, not started yet
+        self._active = set() # job ids queued or running on this process's pool
+        self._jobs = OrderedDict()  # job id -> latest row seen by this process (unfinished
+                                    # jobs, plus finished ones not yet saved to the table)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    @property
+    def worker_id(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _lease_end(self):
+        return (_utcnow() + timedelta(seconds=self.lease_seconds)).isoformat()
+
+    def _get_executor(self):
+        """Return this process's pool, starting it (and the recovery loop) after a fork"""
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='job'
+                    )
+                    self._pid = pid
+                    threading.Thread(target=self._recovery_loop, daemon=True).start()
+        return self._executor
+
+    def start(self):
+        """Start the worker pool and recovery loop for this process"""
+        self._get_executor()
+
+    def register(self, job_type, handler, max_attempts=1, retry_delay=30):
+        """
+        Register handler(job) -> result dict for a job type
+
+        Args:
+            max_attempts: Runs before giving up; with more than one, a failed
+                          run is re-queued after retry_delay * 2^(attempt-1)
+                          seconds and the last failure moves the job to
+                          'dead_letter' (kept in the jobs table, see retry())
+            retry_delay: Base backoff in seconds
+        """
+        self._handlers[job_type] = handler
+        self._policies[job_type] = (max_attempts, retry_delay)
+
+    def _enqueue(self, row, delay=0):
+        """
+        Hand a job to this process's pool, optionally after delay seconds
+
+        Returns:
+            bool: False if this process already has the job queued or running
+        """
+        if delay > 0:
+            timer = threading.Timer(delay, self._enqueue, args=(row,))
+            timer.daemon = True
+            timer.start()
+            return True
+        with self._lock:
+            if row['id'] in self._active:
+                return False
+            self._active.add(row['id'])
+            self._pending += 1
+        self._get_executor().submit(self._run, row)
+        return True
+
+    def _remember(self, row):
+        """Track a row in memory, evicting the oldest finished rows past max_remembered (lock held)"""
+        self._jobs[row['id']] = row
+        self._jobs.move_to_end(row['id'])
+        excess = len(self._jobs) - self.max_remembered
+        if excess > 0:
+            finished = [job_id for job_id, job in self._jobs.items() if job['status'] in TERMINAL_STATUSES]
+            for job_id in finished[:excess]:
+                del self._jobs[job_id]
+
+    def submit(self, job_type, payload, require_persisted=False):
+        """
+        Record a job and queue it on the worker pool
+
+        Args:
+            job_type: Registered handler name
+            payload: JSON-serializable job input
+            require_persisted: Refuse to run the job from memory only, for
+                callers whose sender retries (e.g. Stripe webhooks)
+
+        Returns:
+            dict: Public job view (id, status, ...)
+
+        Raises:
+            JobNotPersisted: require_persisted and the jobs table write failed;
+                the job is not queued
+        """
+        now = _utcnow().isoformat()
+        row = {
+            'id': str(uuid.uuid4()),
+            'job_type': job_type,
+            'payload': payload,
+            'status': 'queued',
+            'progress': {},
+            'attempts': 0,
+            'worker': self.worker_id,
+            'locked_until': self._lease_end(),
+            'created_at': now,
+            'updated_at': now
+        }
+
+        persisted = False
+        try:
+            response = SupabaseClient.insert(JOBS_TABLE, row)
+            persisted = response.status_code in [200, 201]
+            reason = response.status_code
+        except Exception as e:
+            reason = e
+
+        if not persisted:
+            if require_persisted:
+                log.error(f"❌ Job {row['id']} not persisted ({reason}); not queued")
+                raise JobNotPersisted(row['id'], reason)
+            log.warning(f"⚠️ Job {row['id']} not persisted ({reason}); tracking in memory only")
+
+        row['persisted'] = persisted
+        with self._lock:
+            self._remember(row)
+        self._enqueue(row)
+        return self._public(row)
+
+    def get(self, job_id):
+        """
+        Returns:
+            dict or None: Public job view, from memory or the jobs table
+        """
+        with self._lock:
+            row = self._jobs.get(job_id)
+        if row is not None and (not row['persisted'] or row['status'] in TERMINAL_STATUSES):
+            return self._public(row)
+
+        try:
+            response = SupabaseClient.select(JOBS_TABLE, f"id=eq.{quote(job_id)}&select=*")
+            rows = response.json() if response.status_code == 200 else []
+        except Exception as e:
+            log.warning(f"⚠️ Could not read job {job_id}: {e}")
+            rows = []
+
+        if rows:
+            return self._public(rows[0])
+        return self._public(row) if row is not None else None
+
+    def retry(self, job_id):
+        """
+        Re-queue a failed or dead-lettered job; the handler resumes from its saved progress
+
+        Returns:
+            dict or None: Public job view, or None if the job is not in 'failed'/'dead_letter'
+        """
+        fields = {
+            'status': 'queued',
+            'error': None,
+            'locked_until': None,
+            'updated_at': _utcnow().isoformat()
+        }
+
+        with self._lock:
+            row = self._jobs.get(job_id)
+            if row is not None and not row['persisted']:
+                if row['status'] not in ('failed', 'dead_letter'):
+                    return None
+                row.update(fields)
+
+        if row is None or row['persisted']:
+            # Conditional on status so concurrent retries queue the job once
+            response = SupabaseClient.patch(
+                JOBS_TABLE,
+                f"id=eq.{quote(job_id)}&status=in.(failed,dead_letter)",
+                fields,
+                prefer='return=representation'
+            )
+            rows = response.json() if response.status_code == 200 else []
+            if not rows:
+                return None
+            row = dict(rows[0], persisted=True)
+            with self._lock:
+                self._remember(row)
+
+        log.info(f"🔁 Retrying job {job_id} ({row['job_type']})")
+        self._enqueue(row)
+        return self._public(row)
+
+    @staticmethod
+    def _public(row):
+        return {field: row.get(field) for field in PUBLIC_FIELDS}
+
+    def _update(self, job_id, fields, renew_lease=False):
+        fields = dict(fields, updated_at=_utcnow().isoformat())
+        if renew_lease:
+            fields['locked_until'] = self._lease_end()
+
+        with self._lock:
+            row = self._jobs.get(job_id)
+            if row is not None:
+                row.update(fields)
+        if row is not None and not row['persisted']:
+            return
+
+        try:
+            response = SupabaseClient.patch(JOBS_TABLE, f"id=eq.{job_id}", fields)
+            if response.status_code not in [200, 204]:
+                log.warning(f"⚠️ Job {job_id} update failed: {response.status_code} - {response.text}")
+                return
+        except Exception as e:
+            log.warning(f"⚠️ Job {job_id} update failed: {e}")
+            return
+
+        # The table now holds the final state; get() reads it from there
+        if fields.get('status') in TERMINAL_STATUSES:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+
+    def _claim(self, row):
+        """
+        Take the lease on a job before running it
+
+        Returns:
+            dict or None: The claimed row, or None if another worker holds it
+        """
+        fields = {
+            'status': 'running',
+            'worker': self.worker_id,
+            'attempts': (row.get('attempts') or 0) + 1,
+            'locked_until': self._lease_end(),
+            'updated_at': _utcnow().isoformat()
+        }
+
+        if not row.get('persisted', True):
+            row.update(fields)
+            return row
+
+        # A job this worker just queued (submit/retry) can be claimed before
+        # its lease runs out; anything else only once the lease has expired
+        now = quote(f'"{_utcnow().isoformat()}"')
+        me = quote(f'"{self.worker_id}"')
+        response = SupabaseClient.patch(
+            JOBS_TABLE,
+            f"id=eq.{row['id']}&status=in.(queued,running)"
+            f"&or=(and(status.eq.queued,worker.eq.{me}),locked_until.is.null,locked_until.lt.{now})",
+            fields,
+            prefer='return=representation'
+        )
+        rows = response.json() if response.status_code == 200 else []
+        if not rows:
+            return None
+
+        claimed = dict(rows[0], persisted=True)
+        with self._lock:
+            self._remember(claimed)
+        return claimed
+
+    def _run(self, row):
+        with self._lock:
+            self._pending -= 1
+        try:
+            retry_in = self._execute(row)
+        finally:
+            with self._lock:
+                self._active.discard(row['id'])
+        if retry_in is not None:
+            self._enqueue(row, retry_in)
+
+    def _execute(self, row):
+        """Claim and run one job; returns a delay when an in-memory job should run again"""
+        try:
+            claimed = self._claim(row)
+        except Exception as e:
+            log.warning(f"⚠️ Could not claim job {row['id']}: {e}")
+            return
+        if claimed is None:
+            return
+
+        job = Job(self, claimed)
+        handler = self._handlers.get(job.job_type)
+        if handler is None:
+            self._update(job.id, {'status': 'failed', 'error': f'No handler for {job.job_type}', 'locked_until': None})
+            return
+
+        log.info(f"⚙️ Job {job.id} ({job.job_type}) started, attempt {job.attempts}")
+        try:
+            result = handler(job)
+            self._update(job.id, {'status': 'completed', 'result': result, 'error': None, 'locked_until': None})
+            log.info(f"✅ Job {job.id} completed")
+        except JobDeferred as e:
+            log.info(f"⏸️ Job {job.id} deferred for {e.retry_after}s: {e}")
+            retry_at = (_utcnow() + timedelta(seconds=e.retry_after)).isoformat()
+            self._update(job.id, {'status': 'queued', 'error': str(e), 'attempts': job.attempts - 1,
+                                  'worker': self.worker_id, 'locked_until': retry_at})
+            # Queued by this worker, so it can claim it again right at retry_at
+            # (the recovery loop on any worker picks it up otherwise)
+            return e.retry_after
+        except Exception as e:
+            max_attempts, retry_delay = self._policies.get(job.job_type, (1, 0))
+            if job.attempts < max_attempts:
+                delay = retry_delay * 2 ** (job.attempts - 1)
+                log.warning(f"⚠️ Job {job.id} failed (attempt {job.attempts}/{max_attempts}), "
+                            f"retrying in {delay}s: {e}")
+                retry_at = (_utcnow() + timedelta(seconds=delay)).isoformat()
+                self._update(job.id, {'status': 'queued', 'error': str(e), 'locked_until': retry_at})
+                if not claimed.get('persisted', True):
+                    return delay
+                # Persisted jobs are picked up by the recovery loop once retry_at passes
+                return None
+
+            status = 'dead_letter' if max_attempts > 1 else 'failed'
+            log.exception(f"❌ Job {job.id} {status}: {e}")
+            self._update(job.id, {'status': status, 'error': str(e), 'locked_until': None})
+
+    def stats(self, job_type):
+        """
+        Queue depth and lag for one job type
+
+        Returns:
+            dict: queued, running, dead_letter, oldest_queued_at, lag_seconds
+                  (age of the oldest unfinished job) and pending_local
+                  (waiting on this process's pool)
+        """
+        stats = {'queued': 0, 'running': 0, 'dead_letter': 0,
+                 'oldest_queued_at': None, 'lag_seconds': 0, 'pending_local': self._pending}
+        try:
+            for status in ('queued', 'running', 'dead_letter'):
+                stats[status] = SupabaseClient.count(
+                    JOBS_TABLE, f"job_type=eq.{job_type}&status=eq.{status}"
+                ) or 0
+            response = SupabaseClient.select(
+                JOBS_TABLE,
+                f"select=created_at&job_type=eq.{job_type}&status=in.(queued,running)"
+                f"&order=created_at.asc&limit=1"
+            )
+            oldest = response.json() if response.status_code == 200 else []
+            if oldest:
+                stats['oldest_queued_at'] = oldest[0]['created_at']
+        except Exception as e:
+            log.warning(f"⚠️ Job stats unavailable from the jobs table ({e}); using this process only")
+            with self._lock:
+                rows = [row for row in self._jobs.values() if row['job_type'] == job_type]
+            for status in ('queued', 'running', 'dead_letter'):
+                stats[status] = sum(1 for row in rows if row['status'] == status)
+            unfinished = sorted(row['created_at'] for row in rows if row['status'] in ('queued', 'running'))
+            stats['oldest_queued_at'] = unfinished[0] if unfinished else None
+
+        if stats['oldest_queued_at']:
+            oldest_at = datetime.fromisoformat(stats['oldest_queued_at'].replace('Z', '+00:00'))
+            stats['lag_seconds'] = round((_utcnow() - oldest_at).total_seconds(), 1)
+        return stats
+
+    def recover(self):
+        """Queue unfinished jobs whose lease has expired; returns how many were found"""
+        if not self._handlers:
+            return 0
+
+        now = quote(f'"{_utcnow().isoformat()}"')
+        job_types = ','.join(self._handlers)
+        response = SupabaseClient.select(
+            JOBS_TABLE,
+            f"select=*&status=in.(queued,running)&job_type=in.({job_types})"
+            f"&or=(locked_until.is.null,locked_until.lt.{now})&order=created_at.asc&limit=50"
+        )
+        if response.status_code != 200:
+            return 0
+
+        rows = response.json()
+        for row in rows:
+            # Skips jobs still queued or running here (a step outlasting its lease)
+            if self._enqueue(dict(row, persisted=True)):
+                log.info(f"🔁 Resuming job {row['id']} ({row['job_type']})")
+        return len(rows)
+
+    def _recovery_loop(self):
+        while True:
+            try:
+                self.recover()
+            except Exception as e:
+                log.warning(f"⚠️ Job recovery failed: {e}")
+            time.sleep(self.recovery_interval)
+
+
+# Shared runner (per worker process)
+job_runner = JobRunner()
@@ -0,0 +1,213 @@
+# backend/services/logger.py
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# 'text' (human readable) or 'json' (one object per line)
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+# Records waiting for the writer thread; beyond this new records are dropped
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Limits applied when large field values are summarized
+LOG_MAX_STRING = int(os.getenv('LOG_MAX_STRING', '300'))
+LOG_MAX_ITEMS = int(os.getenv('LOG_MAX_ITEMS', '5'))
+# Fraction of per-event hot-path logs kept (recruiter activity, blast chunks)
+LOG_HOT_PATH_SAMPLE = float(os.getenv('LOG_HOT_PATH_SAMPLE', '0.05'))
+
+ROOT_LOGGER = 'resumeblast'
+
+
+def summarize(value, depth=0):
+    """
+    Shrink a log field so large payloads are described rather than dumped
+
+    Long strings are truncated, lists keep their length and first few items,
+    dicts keep their first keys. The result shares nothing mutable with the
+    input, and the work is bounded by the limits, not the input's size.
+    """
+    if isinstance(value, str):
+        if len(value) <= LOG_MAX_STRING:
+            return value
+        return f"{value[:LOG_MAX_STRING]}... ({len(value)} chars)"
+    if isinstance(value, (list, tuple, set)):
+        count = len(value)
+        if depth >= 2:
+            return f"<{count} items>"
+        head = value[:LOG_MAX_ITEMS] if isinstance(value, (list, tuple)) else list(value)[:LOG_MAX_ITEMS]
+        summary = [summarize(item, depth + 1) for item in head]
+        if count > LOG_MAX_ITEMS:
+            summary.append(f"... {count - LOG_MAX_ITEMS} more ({count} total)")
+        return summary
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"<{len(value)} keys>"
+        limit = LOG_MAX_ITEMS * 4
+        summary = {}
+        for k, v in value.items():
+            if len(summary) >= limit:
+                break
+            summary[str(k)] = summarize(v, depth + 1)
+        if len(value) > limit:
+            summary['...'] = f"{len(value) - limit} more keys"
+        return summary
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return summarize(str(value), depth)
+
+
+class _StructuredFormatter(logging.Formatter):
+    """Formats message plus (already summarized) fields as text or JSON (on the writer thread)"""
+
+    def __init__(self, fmt):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record):
+        fields = getattr(record, 'fields', {})
+        message = record.getMessage()
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+
+        if self.fmt == 'json':
+            entry = {
+                'ts': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': message,
+                **fields
+            }
+            if record.exc_info:
+                entry['exc'] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str, ensure_ascii=False)
+
+        line = f"{timestamp} {record.levelname:<7} {record.name} {message}"
+        if fields:
+            line += ' ' + ' '.join(
+                f"{k}={json.dumps(v, default=str, ensure_ascii=False)}" for k, v in fields.items()
+            )
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without formatting or blocking
+
+    The queue is bounded; when it is full the record is dropped and counted.
+    The writer thread is (re)started lazily so it survives worker forks.
+    """
+
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_listener(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+                    self._listener.start()
+                    self._pid = pid
+
+    def prepare(self, record):
+        # Snapshot the fields now (bounded by the summarize limits) so callers
+        # can keep mutating their objects; the message, field serialization
+        # and traceback are still formatted by the writer thread
+        record.fields = {k: summarize(v) for k, v in getattr(record, 'fields', {}).items()}
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Drain the queue and stop the writer thread (called at exit)"""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                self._listener = None
+                self._pid = None
+
+
+class StructuredLogger:
+    """
+    Thin wrapper over logging.Logger with keyword fields and sampling
+
+    Usage:
+        log = get_logger(__name__)
+        log.info("📬 Blast queued", blast_id=job_id, recipients=len(recipients))
+        log.debug("📦 Payload", payload=blast_data, sample=0.01)
+
+    Keyword arguments become structured fields, summarized when the record
+    is queued and serialized by the writer thread. sample (0-1) keeps that
+    fraction of the calls, e.g. sample=LOG_HOT_PATH_SAMPLE for per-event
+    logs. Disabled levels return before doing any work.
+    """
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def _log(self, level, msg, fields, exc_info=False, sample=None):
+        if not self._logger.isEnabledFor(level):
+            return
+        if sample is not None and random.random() >= sample:
+            return
+        self._logger.log(level, msg, exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, msg, sample=None, **fields):
+        self._log(logging.DEBUG, msg, fields, sample=sample)
+
+    def info(self, msg, sample=None, **fields):
+        self._log(logging.INFO, msg, fields, sample=sample)
+
+    def warning(self, msg, sample=None, **fields):
+        self._log(logging.WARNING, msg, fields, sample=sample)
+
+    def error(self, msg, exc_info=False, **fields):
+        self._log(logging.ERROR, msg, fields, exc_info=exc_info)
+
+    def exception(self, msg, **fields):
+        """Log at ERROR with the current exception's traceback"""
+        self._log(logging.ERROR, msg, fields, exc_info=True)
+
+
+def _configure():
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(_StructuredFormatter(LOG_FORMAT))
+
+    handler = _NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE), writer)
+    root.addHandler(handler)
+    atexit.register(handler.stop)
+    return handler
+
+
+_handler = _configure()
+
+
+def get_logger(name):
+    """Logger for a module, e.g. get_logger(__name__) -> 'resumeblast.routes.blast'"""
+    return StructuredLogger(logging.getLogger(f"{ROOT_LOGGER}.{name}"))
+
+
+def dropped_records():
+    """Records dropped because the log queue was full (per process)"""
+    return _handler.dropped
@@ -0,0 +1,73 @@
+# backend/services/payment_service.py
+from services.supabase_client import SupabaseClient
+from services.response_cache import admin_cache, PAYMENT_NAMESPACES
+
+# Statuses a checkout can still move to 'completed' from; failed and
+# refunded payments are never completed again by a late verify or webhook
+COMPLETABLE_STATUSES = ('initiated', 'pending')
+
+
+class PaymentService:
+    """Shared payment-table writes used by the checkout redirect and the Stripe webhook"""
+
+    @staticmethod
+    def mark_completed(session_id, update_data):
+        """
+        Mark the payment for a checkout session as completed
+
+        The PATCH only matches rows still in COMPLETABLE_STATUSES and returns the
+        rows it changed, so when verify_payment and the Stripe webhook both
+        handle the same session only the first one completes it (the revenue
+        rollups follow through the payments trigger).
+        An empty row list means no pending payment matched (missing, already
+        completed, failed or refunded), so callers need no separate existence check.
+        Backed by payments_stripe_session_id_idx (sql/payments_indexes.sql).
+
+        Args:
+            session_id: Stripe checkout session id
+            update_data: Columns to write (status, card details, amount, ...)
+
+        Returns:
+            tuple: (requests.Response, list of rows that became completed)
+        """
+        response = SupabaseClient.patch(
+            'payments',
+            f"stripe_session_id=eq.{session_id}&{SupabaseClient.in_filter('status', COMPLETABLE_STATUSES)}",
+            update_data,
+            prefer='return=representation'
+        )
+
+        completed_rows = response.json() if response.status_code == 200 else []
+        if completed_rows:
+            admin_cache.invalidate(*PAYMENT_NAMESPACES)
+
+        return response, completed_rows
+
+    @staticmethod
+    def fill_details(session_id, details):
+        """
+        Write card/receipt fields onto an already completed payment
+
+        Used when the completing call had to leave some of them out (see
+        StripeObjectService.payment_details); status and the revenue rollups
+        are not touched.
+
+        Args:
+            session_id: Stripe checkout session id
+            details: Columns to write (card_brand, card_last4, receipt_url)
+
+        Returns:
+            tuple: (requests.Response, list of rows updated)
+        """
+        response = SupabaseClient.patch(
+            'payments',
+            f"stripe_session_id=eq.{session_id}&status=eq.completed",
+            details,
+            prefer='return=representation'
+        )
+
+        updated_rows = response.json() if response.status_code == 200 else []
+        if updated_rows:
+            admin_cache.invalidate(*PAYMENT_NAMESPACES)
+
+        return response, updated_rows
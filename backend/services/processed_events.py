@@ -0,0 +1,107 @@
+# backend/services/processed_events.py
+import os
+from services.supabase_client import SupabaseClient
+from services.response_cache import TTLCache
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+# Processed keys remembered in memory (LRU bound and lifetime per worker process)
+PROCESSED_EVENTS_MAX_ENTRIES = int(os.getenv('PROCESSED_EVENTS_MAX_ENTRIES', '10000'))
+PROCESSED_EVENTS_TTL = float(os.getenv('PROCESSED_EVENTS_TTL', str(24 * 3600)))
+
+PROCESSED_EVENTS_TABLE = 'processed_stripe_events'
+
+
+class ProcessedEventStore:
+    """
+    Remembers Stripe events and checkout sessions that were fully processed
+
+    Keys are namespaced strings, e.g. 'event:evt_123' or 'session:cs_123'.
+    Lookups hit a bounded in-memory LRU first and fall back to the
+    processed_stripe_events table (sql/processed_stripe_events.sql), so a
+    redelivered event or a second verify call is skipped before any Stripe
+    or payments-table request. The store is an optimization only: when the
+    table cannot be read the key counts as unprocessed and the guarded
+    payments PATCH keeps the write idempotent.
+    """
+
+    def __init__(self, table=PROCESSED_EVENTS_TABLE, ttl=PROCESSED_EVENTS_TTL,
+                 max_entries=PROCESSED_EVENTS_MAX_ENTRIES):
+        self.table = table
+        self._recent = TTLCache(ttl=ttl, max_entries=max_entries)
+
+    @staticmethod
+    def event_key(event_id):
+        return f"event:{event_id}"
+
+    @staticmethod
+    def session_key(session_id):
+        return f"session:{session_id}"
+
+    def is_processed(self, *keys, local_only=False):
+        """
+        Return the first of keys that was already processed, or None
+
+        Args:
+            *keys: Store keys (None values are ignored)
+            local_only: Check this process's LRU only, without a table read
+                (for request paths that must not wait on Supabase)
+
+        Returns:
+            str or None: A processed key
+        """
+        keys = [key for key in keys if key]
+        for key in keys:
+            if self._recent.get(('processed', key)):
+                return key
+        if not keys or local_only:
+            return None
+
+        try:
+            response = SupabaseClient.select(
+                self.table,
+                f"{SupabaseClient.in_filter('key', keys)}&select=key"
+            )
+        except Exception as e:
+            log.warning("⚠️ Processed-event lookup failed", error=str(e))
+            return None
+        if response.status_code != 200:
+            log.warning("⚠️ Processed-event lookup failed", status=response.status_code)
+            return None
+
+        found = [row['key'] for row in response.json()]
+        for key in found:
+            self._recent.set(('processed', key), True)
+        return found[0] if found else None
+
+    def mark_processed(self, *keys):
+        """
+        Record keys as processed, in memory and in the table
+
+        Failures to persist are logged, not raised: the work itself is done.
+        """
+        rows = []
+        for key in keys:
+            if not key:
+                continue
+            self._recent.set(('processed', key), True)
+            rows.append({'key': key, 'kind': key.split(':', 1)[0]})
+        if not rows:
+            return
+
+        try:
+            response = SupabaseClient.insert(
+                self.table,
+                rows,
+                prefer='resolution=ignore-duplicates,return=minimal'
+            )
+            if response.status_code not in [200, 201, 204]:
+                log.warning("⚠️ Could not persist processed keys", keys=keys,
+                            status=response.status_code, response=response.text)
+        except Exception as e:
+            log.warning("⚠️ Could not persist processed keys", keys=keys, error=str(e))
+
+
+# Shared store for the Stripe webhook and payment verification (per worker process)
+processed_events = ProcessedEventStore()
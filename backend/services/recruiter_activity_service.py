@@ -1,7 +1,20 @@
-import os
-import requests
 from datetime import datetime
+import base64
 import json
+import os
+from urllib.parse import quote
+from services.supabase_client import SupabaseClient, SupabaseError
+from services.batch_writer import activity_writer
+from services.revenue_aggregator import parse_timestamp
+from services.logger import get_logger, LOG_HOT_PATH_SAMPLE
+
+log = get_logger(__name__)
+
+ACTIVITY_MAX_PAGE_SIZE = int(os.getenv('ACTIVITY_MAX_PAGE_SIZE', '500'))
+
+# Columns a caller may request with fields=; 'recruiters' is the embedded recruiter
+ACTIVITY_FIELDS = ('id', 'recruiter_id', 'activity_type', 'activity_details', 'created_at', 'recruiters')
+RECRUITER_EMBED = 'recruiters(email,name,company)'
 
 class RecruiterActivityService:
     """
@@ -9,26 +22,13 @@ class RecruiterActivityService:
     This approach avoids websocket dependency issues with the Supabase Python client
     """
     
-    @staticmethod
-    def _get_headers():
-        """Get headers for Supabase REST API requests"""
-        api_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        return {
-            'apikey': api_key,
-            'Authorization': f"Bearer {api_key}",
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        }
-    
-    @staticmethod
-    def _get_base_url():
-        """Get base URL for Supabase REST API"""
-        return f"{os.getenv('SUPABASE_URL')}/rest/v1"
-    
     @staticmethod
     def log_activity(recruiter_id, activity_type, activity_details=None):
         """
-        Log recruiter activity to recruiter_activity table
+        Queue recruiter activity for the recruiter_activity table
+        
+        Rows are buffered in-process and written in batches by activity_writer
+        (services/batch_writer.py), so this returns without a database round trip.
         
         Args:
             recruiter_id: UUID of the recruiter
@@ -36,11 +36,9 @@ class RecruiterActivityService:
             activity_details: Additional details as dictionary
         
         Returns:
-            dict: {'success': bool, 'data': dict/None, 'error': str/None}
+            dict: {'success': bool, 'queued': bool, 'data': dict/None, 'error': str/None}
         """
         try:
-            url = f"{RecruiterActivityService._get_base_url()}/recruiter_activity"
-            
             activity_data = {
                 'recruiter_id': recruiter_id,
                 'activity_type': activity_type,
@@ -48,119 +46,183 @@ class RecruiterActivityService:
                 'created_at': datetime.utcnow().isoformat()
             }
             
-            print(f"📝 Logging recruiter activity: {activity_type} for recruiter {recruiter_id}")
-            
-            response = requests.post(
-                url,
-                headers=RecruiterActivityService._get_headers(),
-                json=activity_data,
-                timeout=10
-            )
-            
-            if response.status_code in [200, 201]:
-                print(f"✅ Recruiter activity logged successfully: {activity_type}")
-                return {'success': True, 'data': response.json()}
-            else:
-                error_msg = f"Status {response.status_code}: {response.text}"
-                print(f"❌ Failed to log activity: {error_msg}")
-                return {'success': False, 'error': error_msg}
+            activity_writer.add(activity_data)
+            log.info("📝 Queued recruiter activity", activity_type=activity_type,
+                     recruiter_id=recruiter_id, sample=LOG_HOT_PATH_SAMPLE)
+            return {'success': True, 'queued': True, 'data': activity_data}
             
         except Exception as e:
-            print(f"❌ Error logging recruiter activity: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"❌ Error logging recruiter activity: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     @staticmethod
-    def get_recruiter_activities(recruiter_id, limit=50, activity_type=None):
+    def encode_cursor(row):
+        """Opaque page cursor for the (created_at, id) of the last row returned"""
+        raw = json.dumps([row['created_at'], row['id']]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(token):
+        """
+        Returns:
+            tuple: (created_at, id)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            created_at, row_id = json.loads(raw)
+            return str(created_at), str(row_id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def _build_select(fields, include_recruiter):
+        """
+        Build the select clause from a fields= projection
+        
+        id and created_at are always selected because the cursor needs them.
+        
+        Raises:
+            ValueError: If a field is not in ACTIVITY_FIELDS
+        """
+        if not fields:
+            columns = ['*']
+        else:
+            unknown = [field for field in fields if field not in ACTIVITY_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+            include_recruiter = 'recruiters' in fields
+            columns = ['id', 'created_at'] + [
+                field for field in fields if field not in ('id', 'created_at', 'recruiters')
+            ]
+        
+        if include_recruiter:
+            columns.append(RECRUITER_EMBED)
+        return ','.join(columns)
+    
+    @staticmethod
+    def _fetch_page(filters, limit, cursor=None, fields=None, since=None, until=None,
+                    include_recruiter=False):
+        """
+        Fetch one page of recruiter_activity, newest first
+        
+        Args:
+            filters: List of PostgREST filter fragments
+            limit: Page size (capped at ACTIVITY_MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+            fields: Optional list of ACTIVITY_FIELDS to return
+            since: Optional ISO timestamp, inclusive lower bound on created_at
+            until: Optional ISO timestamp, exclusive upper bound on created_at
+            include_recruiter: Embed recruiters(email,name,company) when fields is not given
+        
+        Returns:
+            dict: {'success': True, 'data': list, 'next_cursor': str/None}
+        
+        Raises:
+            ValueError: For an invalid cursor, field or timestamp
+        """
+        limit = max(1, min(int(limit), ACTIVITY_MAX_PAGE_SIZE))
+        query = [f"select={RecruiterActivityService._build_select(fields, include_recruiter)}"]
+        query += filters
+        
+        for op, value in (('gte', since), ('lt', until)):
+            if value:
+                try:
+                    parse_timestamp(value)
+                except ValueError:
+                    raise ValueError(f'Invalid timestamp: {value}')
+                query.append(f"created_at={op}.{quote(value)}")
+        
+        if cursor:
+            created_at, row_id = RecruiterActivityService.decode_cursor(cursor)
+            query.append(SupabaseClient.keyset_filter(created_at, row_id))
+        
+        # One extra row tells us whether another page exists
+        query.append('order=created_at.desc,id.desc')
+        query.append(f'limit={limit + 1}')
+        
+        response = SupabaseClient.select('recruiter_activity', '&'.join(query), timeout=10)
+        if response.status_code != 200:
+            raise SupabaseError(response)
+        
+        rows = response.json()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = RecruiterActivityService.encode_cursor(rows[-1])
+        return {'success': True, 'data': rows, 'next_cursor': next_cursor}
+    
+    @staticmethod
+    def get_recruiter_activities(recruiter_id, limit=50, activity_type=None, cursor=None,
+                                 fields=None, since=None, until=None):
         """
-        Get activity log for a specific recruiter
+        Get activity log for a specific recruiter, one page at a time
         
         Args:
             recruiter_id: UUID of the recruiter
-            limit: Number of records to return
+            limit: Number of records per page
             activity_type: Filter by specific activity type (optional)
+            cursor: next_cursor from the previous page (optional)
+            fields: List of columns to return (optional, see ACTIVITY_FIELDS)
+            since: ISO timestamp, only activity at or after it (optional)
+            until: ISO timestamp, only activity before it (optional)
         
         Returns:
-            dict: {'success': bool, 'data': list/None, 'error': str/None}
+            dict: {'success': bool, 'data': list/None, 'next_cursor': str/None, 'error': str/None}
+        
+        Raises:
+            ValueError: For an invalid cursor, field or timestamp
         """
         try:
-            url = f"{RecruiterActivityService._get_base_url()}/recruiter_activity"
-            
-            # Build query parameters
-            params = {
-                'recruiter_id': f'eq.{recruiter_id}',
-                'order': 'created_at.desc',
-                'limit': limit
-            }
-            
+            filters = [f'recruiter_id=eq.{quote(recruiter_id)}']
             if activity_type:
-                params['activity_type'] = f'eq.{activity_type}'
+                filters.append(f'activity_type=eq.{quote(activity_type)}')
             
-            print(f"🔍 Fetching activities for recruiter: {recruiter_id}")
-            
-            response = requests.get(
-                url,
-                headers=RecruiterActivityService._get_headers(),
-                params=params,
-                timeout=10
+            result = RecruiterActivityService._fetch_page(
+                filters, limit, cursor=cursor, fields=fields, since=since, until=until
             )
+            log.debug("✅ Fetched recruiter activities", recruiter_id=recruiter_id, count=len(result['data']))
+            return result
             
-            if response.status_code == 200:
-                print(f"✅ Successfully fetched {len(response.json())} activities")
-                return {'success': True, 'data': response.json()}
-            else:
-                error_msg = f"Status {response.status_code}: {response.text}"
-                print(f"❌ Failed to fetch activities: {error_msg}")
-                return {'success': False, 'error': error_msg}
-            
+        except ValueError:
+            raise
         except Exception as e:
-            print(f"❌ Error fetching recruiter activities: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"❌ Error fetching recruiter activities: {str(e)}")
             return {'success': False, 'error': str(e)}
     
     @staticmethod
-    def get_all_recruiter_activities(limit=100):
+    def get_all_recruiter_activities(limit=100, cursor=None, fields=None, since=None, until=None):
         """
-        Get all recruiter activities (admin only)
+        Get all recruiter activities (admin only), one page at a time
+        
+        Rows embed recruiters(email,name,company) unless a fields= projection
+        is given without 'recruiters'.
         
         Args:
-            limit: Number of records to return
+            limit: Number of records per page
+            cursor: next_cursor from the previous page (optional)
+            fields: List of columns to return (optional, see ACTIVITY_FIELDS)
+            since: ISO timestamp, only activity at or after it (optional)
+            until: ISO timestamp, only activity before it (optional)
         
         Returns:
-            dict: {'success': bool, 'data': list/None, 'error': str/None}
+            dict: {'success': bool, 'data': list/None, 'next_cursor': str/None, 'error': str/None}
+        
+        Raises:
+            ValueError: For an invalid cursor, field or timestamp
         """
         try:
-            url = f"{RecruiterActivityService._get_base_url()}/recruiter_activity"
-            
-            # Build query parameters with embedded recruiter data
-            params = {
-                'select': '*,recruiters(email,name,company)',
-                'order': 'created_at.desc',
-                'limit': limit
-            }
-            
-            print(f"🔍 Fetching all recruiter activities (limit: {limit})")
-            
-            response = requests.get(
-                url,
-                headers=RecruiterActivityService._get_headers(),
-                params=params,
-                timeout=10
+            result = RecruiterActivityService._fetch_page(
+                [], limit, cursor=cursor, fields=fields, since=since, until=until,
+                include_recruiter=True
             )
+            log.debug("✅ Fetched all recruiter activities", limit=limit, count=len(result['data']))
+            return result
             
-            if response.status_code == 200:
-                activities = response.json()
-                print(f"✅ Successfully fetched {len(activities)} activities")
-                return {'success': True, 'data': activities}
-            else:
-                error_msg = f"Status {response.status_code}: {response.text}"
-                print(f"❌ Failed to fetch all activities: {error_msg}")
-                return {'success': False, 'error': error_msg}
-            
+        except ValueError:
+            raise
         except Exception as e:
-            print(f"❌ Error fetching all recruiter activities: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            log.exception(f"❌ Error fetching all recruiter activities: {str(e)}")
+            return {'success': False, 'error': str(e)}
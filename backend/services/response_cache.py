@@ -0,0 +1,237 @@
+# backend/services/response_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from services.supabase_client import SupabaseClient
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+ADMIN_CACHE_TTL = float(os.getenv('ADMIN_CACHE_TTL', '30'))
+ADMIN_CACHE_MAX_ENTRIES = int(os.getenv('ADMIN_CACHE_MAX_ENTRIES', '256'))
+
+CACHE_VERSIONS_TABLE = 'cache_versions'
+# Max age of a process's copy of the shared versions (refreshed in the
+# background, never on the read path), and the wait after a failed read
+CACHE_VERSIONS_REFRESH_SECONDS = float(os.getenv('CACHE_VERSIONS_REFRESH_SECONDS', '1'))
+CACHE_VERSIONS_RETRY_SECONDS = float(os.getenv('CACHE_VERSIONS_RETRY_SECONDS', '30'))
+
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False
+
+
+class CacheVersions:
+    """
+    Per-namespace version counters shared by every worker (sql/cache_versions.sql)
+
+    bump() increments a namespace's version in the database; caches built
+    with these versions drop entries stored under an older version, so an
+    invalidation in one worker process reaches all of them. Readers use
+    current(), a local copy refreshed by a background thread at most every
+    refresh seconds, so cache hits never wait on Supabase.
+    """
+
+    def __init__(self, table=CACHE_VERSIONS_TABLE, refresh=CACHE_VERSIONS_REFRESH_SECONDS,
+                 retry=CACHE_VERSIONS_RETRY_SECONDS):
+        self.table = table
+        self.refresh = refresh
+        self.retry = retry
+        self._current = None
+        self._next_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def current(self):
+        """
+        Local copy of the versions, starting a background refresh when it is due
+
+        Returns:
+            dict or None: namespace -> version, or None until the table was read
+        """
+        with self._lock:
+            current = self._current
+            due = not self._refreshing and time.monotonic() >= self._next_refresh
+            if due:
+                self._refreshing = True
+        if due:
+            threading.Thread(target=self._refresh, name='cache-versions', daemon=True).start()
+        return current
+
+    def _refresh(self):
+        snapshot = self.snapshot()
+        with self._lock:
+            self._refreshing = False
+            if snapshot is None:
+                # Entries keep living for their TTL; try again later
+                self._current = None
+                self._next_refresh = time.monotonic() + self.retry
+            else:
+                self._current = snapshot
+                self._next_refresh = time.monotonic() + self.refresh
+
+    def snapshot(self):
+        """
+        Returns:
+            dict or None: namespace -> version, or None if the table can't be read
+        """
+        try:
+            response = SupabaseClient.select(self.table, 'select=namespace,version')
+        except Exception as e:
+            log.warning("⚠️ Cache versions unavailable, using this process's cache only", error=str(e))
+            return None
+        if response.status_code != 200:
+            log.warning("⚠️ Cache versions unavailable, using this process's cache only",
+                        status=response.status_code)
+            return None
+        return {row['namespace']: row['version'] for row in response.json()}
+
+    def bump(self, *namespaces):
+        """Increment the versions of namespaces (failures are logged, not raised)"""
+        with self._lock:
+            self._next_refresh = 0.0
+        try:
+            response = SupabaseClient.rpc('bump_cache_versions', {'p_namespaces': list(namespaces)})
+            if response.status_code not in [200, 204]:
+                log.warning("⚠️ Cache version bump failed", namespaces=namespaces,
+                            status=response.status_code, response=response.text)
+        except Exception as e:
+            log.warning("⚠️ Cache version bump failed", namespaces=namespaces, error=str(e))
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with TTL expiry, LRU size bound and single-flight
+
+    Keys are tuples whose first element is a namespace, e.g.
+    ('revenue', (('start_date', '2024-01-01'),)). invalidate(namespace) drops
+    every key in that namespace. Concurrent misses for the same key share one
+    loader call; a load that was in flight during an invalidation is returned
+    to its waiters but not stored.
+
+    With versions (a CacheVersions), get_or_load() compares entries with the
+    process's copy of the shared namespace versions and treats entries
+    stored under an older version as misses, and invalidate() also bumps the
+    shared versions, so writes made through any worker are seen by all of
+    them within about CACHE_VERSIONS_REFRESH_SECONDS. If the versions table
+    can't be read, entries live for the TTL as usual.
+    """
+
+    def __init__(self, ttl=ADMIN_CACHE_TTL, max_entries=ADMIN_CACHE_MAX_ENTRIES, versions=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.versions = versions
+        self._entries = OrderedDict()  # key -> (expires_at, value, version)
+        self._inflight = {}            # key -> _Flight
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl, version=None):
+        self._entries[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value, version)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Return the cached value for key, calling loader() once on a miss
+
+        Exceptions raised by loader are re-raised to every waiting caller and
+        nothing is cached.
+        """
+        version = None
+        if self.versions is not None:
+            current = self.versions.current()
+            if current is not None:
+                version = current.get(key[0], 0)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic() and (version is None or entry[2] == version):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                if flight.error is None and not flight.stale:
+                    self._store(key, flight.value, ttl, version)
+            flight.event.set()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def discard(self, key):
+        """Drop one cached key (an in-flight load for it is still returned to its waiters)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            flight = self._inflight.pop(key, None)
+            if flight is not None:
+                flight.stale = True
+
+    def invalidate(self, *namespaces):
+        """Drop every cached key (and in-flight load) in the given namespaces, in every worker"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[key]
+            for key in [k for k in self._inflight if k[0] in namespaces]:
+                self._inflight.pop(key).stale = True
+        if self.versions is not None:
+            self.versions.bump(*namespaces)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for flight in self._inflight.values():
+                flight.stale = True
+            self._inflight.clear()
+
+
+# Shared cache for admin dashboard reads (per worker process, invalidated
+# across workers through cache_versions)
+admin_cache = TTLCache(versions=CacheVersions())
+
+# Cached read namespaces that write paths invalidate
+TICKET_NAMESPACES = ('contact_submissions', 'unread_count')
+USER_NAMESPACES = ('users', 'stats', 'revenue')
+PAYMENT_NAMESPACES = ('stats', 'revenue')
@@ -0,0 +1,142 @@
+# backend/services/revenue_aggregator.py
+import heapq
+from datetime import datetime, timedelta
+
+ONE_DAY = timedelta(days=1)
+
+
+def parse_timestamp(value):
+    """Parse a Supabase ISO timestamp ('...Z' or '...+00:00') into an aware datetime"""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+class RevenueAggregator:
+    """
+    Single-pass revenue aggregation for the admin dashboard
+
+    Each payment's created_at is parsed once and every bucket (status totals,
+    custom range, today, rolling 7 days, per-day histogram and the newest
+    failed/refunded rows) is updated in the same pass. Rows can come from any
+    iterable, including a generator over paginated results.
+
+    Usage:
+        aggregator = RevenueAggregator(now, start_dt, end_dt)
+        aggregator.add_all(rows)
+        summary = aggregator.summary()
+    """
+
+    STATUSES = ('completed', 'failed', 'refunded')
+
+    def __init__(self, now, start_dt=None, end_dt=None, days=7, top_n=20):
+        """
+        Args:
+            now: Aware datetime used as "now" for today / rolling window
+            start_dt: Inclusive start of the custom range (optional)
+            end_dt: Exclusive end of the custom range (optional)
+            days: Number of days in the rolling window and daily histogram
+            top_n: Number of newest failed/refunded rows to keep
+        """
+        self.start_dt = start_dt
+        self.end_dt = end_dt
+        self.days = days
+        self.top_n = top_n
+
+        self.today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.window_start = now - timedelta(days=days)
+        self.histogram_start = self.today_start - timedelta(days=days - 1)
+
+        self.counts = {status: 0 for status in self.STATUSES}
+        self.amounts = {status: 0 for status in self.STATUSES}
+        self.today_count = 0
+        self.today_amount = 0
+        self.window_amount = 0
+        self.daily_counts = [0] * days
+        self.daily_amounts = [0] * days
+
+        self._newest = {'failed': [], 'refunded': []}
+        self._seq = 0
+
+    def add(self, payment):
+        """Fold one payment row into every bucket"""
+        status = payment.get('status')
+        if status not in self.counts:
+            return
+
+        created_at = parse_timestamp(payment['created_at'])
+        in_range = self.start_dt is None or self.end_dt is None or (
+            self.start_dt <= created_at < self.end_dt
+        )
+
+        if status == 'completed':
+            amount = payment.get('amount', 0)
+            if in_range:
+                self.counts['completed'] += 1
+                self.amounts['completed'] += amount
+
+            if created_at >= self.today_start:
+                self.today_count += 1
+                self.today_amount += amount
+            if created_at >= self.window_start:
+                self.window_amount += amount
+            if created_at >= self.histogram_start:
+                offset = -((created_at - self.today_start) // ONE_DAY)
+                if 0 <= offset < self.days:
+                    self.daily_counts[offset] += 1
+                    self.daily_amounts[offset] += amount
+            return
+
+        if not in_range:
+            return
+
+        self.counts[status] += 1
+        self.amounts[status] += payment.get(
+            'refund_amount' if status == 'refunded' else 'amount', 0
+        )
+
+        # Keep the newest top_n rows regardless of input order
+        # (ties keep input order, which is newest-first for our queries)
+        self._seq += 1
+        heap = self._newest[status]
+        entry = (created_at, -self._seq, payment)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    def add_all(self, payments):
+        """Fold an iterable of payment rows; returns self for chaining"""
+        for payment in payments:
+            self.add(payment)
+        return self
+
+    def _newest_rows(self, status):
+        return [entry[2] for entry in sorted(self._newest[status], key=lambda e: e[:2], reverse=True)]
+
+    def summary(self):
+        """
+        Returns:
+            dict: Amounts in cents, same shape as the admin_revenue_summary() RPC
+        """
+        return {
+            'completed_count': self.counts['completed'],
+            'completed_amount': self.amounts['completed'],
+            'failed_count': self.counts['failed'],
+            'failed_amount': self.amounts['failed'],
+            'refunded_count': self.counts['refunded'],
+            'refunded_amount': self.amounts['refunded'],
+            'today_count': self.today_count,
+            'today_amount': self.today_amount,
+            'last_7_days_amount': self.window_amount,
+            'daily': [
+                {
+                    'day': (self.today_start - timedelta(days=i)).strftime('%Y-%m-%d'),
+                    'count': self.daily_counts[i],
+                    'amount': self.daily_amounts[i]
+                }
+                for i in range(self.days)
+            ],
+            'failed_payments': self._newest_rows('failed'),
+            'refunded_payments': self._newest_rows('refunded')
+        }
@@ -0,0 +1,180 @@
+# backend/services/revenue_rollup_service.py
+import sys
+from datetime import timedelta
+from services.supabase_client import SupabaseClient, SupabaseError
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+ROLLUP_TABLE = 'payment_daily_rollups'
+ROLLUP_STATE_TABLE = 'payment_rollup_state'
+
+
+class RevenueRollupService:
+    """
+    Maintains per-day, per-status payment totals (see sql/payment_daily_rollups.sql)
+
+    A trigger on payments moves each payment between its day's status
+    buckets on every insert, update and delete (including refunds marked
+    directly in Supabase), so the admin dashboard can read O(days) rollup
+    rows instead of scanning every payment.
+
+    Until rebuild() has run once the table only holds changes made since
+    the trigger was installed, so reads return None (callers fall back to the payments
+    table) until payment_rollup_state records the backfill.
+    """
+
+    _backfilled = False  # cached once seen; a backfill is never undone
+
+    @staticmethod
+    def is_backfilled():
+        """
+        Whether rebuild() has completed at least once
+
+        Returns:
+            bool: True once payment_rollup_state has a backfilled_at
+        """
+        if RevenueRollupService._backfilled:
+            return True
+
+        response = SupabaseClient.select(ROLLUP_STATE_TABLE, 'select=backfilled_at')
+        if response.status_code != 200:
+            return False
+        rows = response.json()
+        if rows and rows[0].get('backfilled_at'):
+            RevenueRollupService._backfilled = True
+        return RevenueRollupService._backfilled
+
+    @staticmethod
+    def get_rollups():
+        """
+        Fetch every rollup row (one per day and status), paging past max-rows
+
+        Returns:
+            list or None: Rollup rows, or None if the table is unavailable or
+            has not been backfilled yet
+        """
+        if not RevenueRollupService.is_backfilled():
+            return None
+        try:
+            return list(SupabaseClient.iter_rows(
+                ROLLUP_TABLE,
+                'select=day,status,payment_count,amount,refund_amount',
+                descending=False,
+                cursor=('day', 'status')
+            ))
+        except SupabaseError as e:
+            log.warning(f"⚠️ Revenue rollups unavailable: {e}")
+            return None
+
+    @staticmethod
+    def get_completed_total():
+        """
+        Sum of completed payment amounts across all days
+
+        Returns:
+            int or None: Total in cents, or None if the rollups are unavailable
+        """
+        rollups = RevenueRollupService.get_rollups()
+        if rollups is None:
+            return None
+        return sum(row.get('amount') or 0 for row in rollups if row['status'] == 'completed')
+
+    @staticmethod
+    def get_summary(now, start_dt=None, end_dt=None, top_n=20):
+        """
+        Build the admin revenue summary from the rollup table
+
+        The rolling 7-day figure is day-granular here: it covers today and
+        the six previous UTC days, i.e. the same days as the daily breakdown.
+
+        Returns:
+            dict or None: Same shape as the admin_revenue_summary() RPC, or
+            None if the rollups are missing or have not been backfilled yet
+        """
+        rollups = RevenueRollupService.get_rollups()
+        if rollups is None:
+            return None
+
+        today = now.date()
+        window_days = {(today - timedelta(days=i)).isoformat(): i for i in range(7)}
+        start_day = start_dt.date().isoformat() if start_dt and end_dt else None
+        end_day = end_dt.date().isoformat() if start_dt and end_dt else None
+
+        summary = {
+            'completed_count': 0, 'completed_amount': 0,
+            'failed_count': 0, 'failed_amount': 0,
+            'refunded_count': 0, 'refunded_amount': 0,
+            'today_count': 0, 'today_amount': 0,
+            'last_7_days_amount': 0,
+            'daily': [{'day': day, 'count': 0, 'amount': 0} for day in window_days]
+        }
+
+        for row in rollups:
+            day = row['day']
+            status = row['status']
+            if status not in ('completed', 'failed', 'refunded'):
+                continue
+
+            count = row.get('payment_count') or 0
+            amount = row.get('refund_amount' if status == 'refunded' else 'amount') or 0
+
+            if start_day is None or start_day <= day < end_day:
+                summary[f'{status}_count'] += count
+                summary[f'{status}_amount'] += amount
+
+            if status == 'completed' and day in window_days:
+                bucket = summary['daily'][window_days[day]]
+                bucket['count'] += count
+                bucket['amount'] += amount
+                summary['last_7_days_amount'] += amount
+                if day == today.isoformat():
+                    summary['today_count'] += count
+                    summary['today_amount'] += amount
+
+        # Only the newest failed/refunded rows are read from payments itself
+        range_filter = ''
+        if start_dt and end_dt:
+            range_filter = (
+                f"&created_at=gte.{start_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+                f"&created_at=lt.{end_dt.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+            )
+        for status in ('failed', 'refunded'):
+            response = SupabaseClient.select(
+                'payments',
+                f"select=*&status=eq.{status}&order=created_at.desc&limit={top_n}{range_filter}"
+            )
+            summary[f'{status}_payments'] = response.json() if response.status_code == 200 else []
+
+        return summary
+
+    @staticmethod
+    def rebuild():
+        """
+        Recompute every rollup row from payment history
+
+        Returns:
+            int or None: Number of rollup rows written, or None on failure
+        """
+        log.info("🔄 Rebuilding payment rollups from payment history...")
+        response = SupabaseClient.rpc('rebuild_payment_rollups', timeout=300)
+
+        if response.status_code == 200:
+            RevenueRollupService._backfilled = True
+            log.info(f"✅ Payment rollups rebuilt: {response.json()} rows")
+            return response.json()
+
+        log.error(f"❌ Rollup rebuild failed: {response.status_code} - {response.text}")
+        return None
+
+
+if __name__ == '__main__':
+    # Usage (from the backend folder): python -m services.revenue_rollup_service rebuild
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if sys.argv[1:] != ['rebuild']:
+        print("Usage: python -m services.revenue_rollup_service rebuild")
+        sys.exit(2)
+
+    sys.exit(0 if RevenueRollupService.rebuild() is not None else 1)
@@ -0,0 +1,405 @@
+# backend/services/spool.py
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from services.supabase_client import SupabaseClient
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no segment locking
+    fcntl = None
+
+SPOOL_DIR = os.getenv(
+    'SPOOL_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spool')
+)
+# Segment size before a new file is started
+SPOOL_SEGMENT_BYTES = int(os.getenv('SPOOL_SEGMENT_BYTES', str(4 * 1024 * 1024)))
+# Appends are fsynced together at most this often
+SPOOL_FSYNC_INTERVAL = float(os.getenv('SPOOL_FSYNC_INTERVAL', '0.2'))
+# Seconds between replay attempts
+SPOOL_REPLAY_INTERVAL = float(os.getenv('SPOOL_REPLAY_INTERVAL', '15'))
+# Rows per bulk insert during replay
+SPOOL_REPLAY_BATCH = int(os.getenv('SPOOL_REPLAY_BATCH', '500'))
+# Timeout for the direct write before falling back to the spool
+SPOOL_WRITE_TIMEOUT = float(os.getenv('SPOOL_WRITE_TIMEOUT', '3'))
+
+# Replay responses that mean the rows themselves are bad, not the upstream
+REJECTED_STATUSES = (400, 404, 409, 413, 422)
+# Of those, the ones that can come from a single row (bisected to find it);
+# anything else (401/403/429/5xx) is temporary and retried
+ROW_REJECTED_STATUSES = (400, 409, 413, 422)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class Spool:
+    """
+    Append-only on-disk spool for inserts that could not reach Supabase
+
+    Each record is one JSON line {"table": ..., "row": ...}. A process appends
+    to its own active segment (spool-<pid>-<seq>.jsonl.open), holding an
+    exclusive lock on it while it is open; fsyncs are batched every
+    fsync_interval seconds. An active segment nobody holds the lock on was
+    left by a process that is gone (even if its pid has been reused, e.g.
+    after a container restart) and is sealed by the replayer. Full segments are sealed (renamed to
+    .jsonl). The replayer seals the active segment, then bulk-inserts sealed
+    segments in order, recording its record offset in a .offset file after
+    each batch so a crash mid-segment resumes without re-sending acknowledged
+    rows. When Supabase rejects a batch as invalid it is bisected, so only
+    the offending rows go to rejected.jsonl.
+
+    While replay is failing the upstream is treated as down and insert()
+    spools straight away instead of waiting on a timeout.
+    """
+
+    def __init__(self, directory=SPOOL_DIR, segment_bytes=SPOOL_SEGMENT_BYTES,
+                 fsync_interval=SPOOL_FSYNC_INTERVAL, replay_interval=SPOOL_REPLAY_INTERVAL,
+                 replay_batch=SPOOL_REPLAY_BATCH):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.replay_interval = replay_interval
+        self.replay_batch = replay_batch
+        self._file = None
+        self._path = None
+        self._seq = 0
+        self._dirty = False
+        self._pid = None
+        self._healthy = True
+        self._hooks = {}
+        self._lock = threading.Lock()
+        self._replay_lock = threading.Lock()
+        atexit.register(self.close)
+
+    @property
+    def healthy(self):
+        return self._healthy
+
+    def on_replay(self, table, hook):
+        """Call hook(rows) after spooled rows for table have been inserted"""
+        self._hooks[table] = hook
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start background fsync and replay (drains segments left by earlier runs)"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        """Start the fsync/replay thread for this process (again after a fork)"""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._pid = pid
+                    self._file = None
+                    self._path = None
+                    os.makedirs(self.directory, exist_ok=True)
+                    threading.Thread(target=self._run, daemon=True).start()
+
+    def _open_segment(self):
+        self._seq += 1
+        name = f"spool-{os.getpid()}-{int(time.time() * 1000)}-{self._seq:06d}.jsonl.open"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, 'a', encoding='utf-8')
+        if fcntl is not None:
+            # Held until the segment is sealed; marks it as owned by a live process
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def _seal_segment(self):
+        """Fsync and close the active segment so the replayer can take it (lock held)"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if os.path.getsize(self._path) > 0:
+            os.replace(self._path, self._path[:-len('.open')])
+        else:
+            os.remove(self._path)
+        self._file = None
+        self._path = None
+        self._dirty = False
+
+    def append(self, table, rows):
+        """
+        Spool rows for table
+
+        The lines reach the OS before this returns; they are fsynced by the
+        background thread within fsync_interval seconds.
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        self._ensure_started()
+        data = ''.join(
+            json.dumps({'table': table, 'row': row}, default=str) + '\n' for row in rows
+        )
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(data)
+            self._file.flush()
+            self._dirty = True
+            if self._file.tell() >= self.segment_bytes:
+                self._seal_segment()
+        log.info(f"💾 Spooled {len(rows)} {table} rows to disk")
+
+    def sync(self):
+        with self._lock:
+            if self._file is not None and self._dirty:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._seal_segment()
+
+    def insert(self, table, rows, prefer=None, timeout=SPOOL_WRITE_TIMEOUT):
+        """
+        Insert rows, spooling them if Supabase is down, slow or erroring
+
+        Client errors (4xx) are returned as-is; replaying them would fail forever.
+
+        Returns:
+            tuple: (response or None, spooled bool)
+        """
+        if not self._healthy:
+            self.append(table, rows)
+            return None, True
+
+        try:
+            response = SupabaseClient.insert(table, rows, prefer=prefer, timeout=timeout)
+        except Exception as e:
+            log.warning(f"⚠️ {table} insert failed ({e}); spooling")
+            self._healthy = False
+            self.append(table, rows)
+            return None, True
+
+        if response.status_code >= 500:
+            log.warning(f"⚠️ {table} insert failed ({response.status_code}); spooling")
+            self._healthy = False
+            self.append(table, rows)
+            return response, True
+        return response, False
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+
+    def _seal_orphans(self):
+        """Seal active segments left behind by processes that have exited"""
+        for path in glob.glob(os.path.join(self.directory, 'spool-*.jsonl.open')):
+            try:
+                if fcntl is None:
+                    pid = int(os.path.basename(path).split('-')[1])
+                    if pid == os.getpid() or _pid_alive(pid):
+                        continue
+                    self._seal_orphan(path)
+                    continue
+                with open(path, 'a', encoding='utf-8') as segment:
+                    try:
+                        fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # its writer is still alive (possibly this process)
+                    self._seal_orphan(path)
+            except FileNotFoundError:
+                continue  # sealed by another worker meanwhile
+
+    @staticmethod
+    def _seal_orphan(path):
+        if os.path.getsize(path) > 0:
+            os.replace(path, path[:-len('.open')])
+        elif time.time() - os.path.getmtime(path) > 60:
+            # Empty and old; a brand-new segment may not be locked by its writer yet
+            os.remove(path)
+
+    @staticmethod
+    def _batches(records, start, size):
+        """Yield (end_line, table, rows) for consecutive records with the same table and keys"""
+        group_key = None
+        rows = []
+        line = start
+        for line, record in enumerate(records[start:], start + 1):
+            key = (record['table'], tuple(sorted(record['row'])))
+            if rows and (key != group_key or len(rows) >= size):
+                yield line - 1, group_key[0], rows
+                rows = []
+            group_key = key
+            rows.append(record['row'])
+        if rows:
+            yield line, group_key[0], rows
+
+    def insert_valid(self, table, rows, insert):
+        """
+        Write rows with insert(rows), isolating rows Supabase rejects as invalid
+
+        A batch answered with a ROW_REJECTED_STATUSES status is split in half
+        and each half retried, down to single rows, which are set aside with
+        reject(); the other rows are still written. Temporary failures
+        (401/403/429/5xx) stop the write and hand back the rows not written.
+
+        Args:
+            table: Table name (for reject())
+            rows: Rows to write
+            insert: Callable(rows) -> response, or None when the rows were
+                    taken care of another way (e.g. spooled)
+
+        Returns:
+            list: Rows not written yet because of a temporary failure
+        """
+        response = insert(rows)
+        if response is None or response.status_code in [200, 201, 204]:
+            return []
+        if response.status_code not in REJECTED_STATUSES:
+            log.warning(f"⚠️ {table} write failed ({response.status_code}); will retry {len(rows)} rows")
+            return rows
+        if len(rows) == 1 or response.status_code not in ROW_REJECTED_STATUSES:
+            self.reject(table, rows, response)
+            return []
+
+        middle = len(rows) // 2
+        remaining = self.insert_valid(table, rows[:middle], insert)
+        if remaining:
+            return remaining + rows[middle:]
+        return self.insert_valid(table, rows[middle:], insert)
+
+    def reject(self, table, rows, response):
+        """Set aside rows that can never be inserted so they do not block replay"""
+        log.error(f"❌ Spooled {table} rows rejected ({response.status_code}): {response.text}")
+        with open(os.path.join(self.directory, 'rejected.jsonl'), 'a', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps({'table': table, 'row': row, 'status': response.status_code}, default=str) + '\n')
+
+    def _replay_segment(self, path):
+        """
+        Insert one sealed segment, resuming from its offset file
+
+        Returns:
+            bool: True if the segment was fully replayed and removed
+        """
+        offset_path = path + '.offset'
+        try:
+            segment = open(path, 'r+', encoding='utf-8')
+        except FileNotFoundError:
+            return False  # already replayed and removed by another worker
+        with segment:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return False  # another worker is replaying it
+            if not os.path.exists(path):
+                return True  # replayed and removed while we waited
+
+            records = []
+            for raw in segment:
+                try:
+                    records.append(json.loads(raw))
+                except ValueError:
+                    log.warning(f"⚠️ Skipping torn spool line in {os.path.basename(path)}")
+
+            start = 0
+            if os.path.exists(offset_path):
+                with open(offset_path, encoding='utf-8') as f:
+                    start = int(f.read().strip() or 0)
+
+            for end, table, rows in self._batches(records, start, self.replay_batch):
+                written = []
+
+                def insert(batch, table=table):
+                    response = SupabaseClient.insert(table, batch, prefer='return=minimal')
+                    if response.status_code in [200, 201, 204]:
+                        written.extend(batch)
+                    return response
+
+                if self.insert_valid(table, rows, insert):
+                    raise RuntimeError(f"{table} replay failed; retrying later")
+
+                tmp_path = offset_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(str(end))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, offset_path)
+
+                if not written:
+                    continue
+                hook = self._hooks.get(table)
+                if hook:
+                    try:
+                        hook(written)
+                    except Exception as e:
+                        log.warning(f"⚠️ Spool replay hook for {table} failed: {e}")
+                log.info(f"✅ Replayed {len(written)} spooled {table} rows")
+
+            os.remove(path)
+            if os.path.exists(offset_path):
+                os.remove(offset_path)
+        return True
+
+    def replay(self):
+        """
+        Drain sealed segments, oldest first
+
+        Returns:
+            int: Segments fully replayed
+        """
+        replayed = 0
+        with self._replay_lock:
+            with self._lock:
+                self._seal_segment()
+            self._seal_orphans()
+            segments = []
+            for path in glob.glob(os.path.join(self.directory, 'spool-*.jsonl')):
+                try:
+                    segments.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    pass  # replayed by another worker since the glob
+            segments = [path for _, path in sorted(segments)]
+            try:
+                for path in segments:
+                    if self._replay_segment(path):
+                        replayed += 1
+                self._healthy = True
+            except Exception as e:
+                log.warning(f"⚠️ Spool replay stopped: {e}")
+                self._healthy = False
+        return replayed
+
+    def pending_segments(self):
+        return len(glob.glob(os.path.join(self.directory, 'spool-*.jsonl*')))
+
+    def _run(self):
+        last_replay = 0.0
+        while True:
+            time.sleep(self.fsync_interval)
+            try:
+                self.sync()
+                if time.monotonic() - last_replay >= self.replay_interval:
+                    last_replay = time.monotonic()
+                    if self.pending_segments():
+                        self.replay()
+            except Exception as e:
+                log.warning(f"⚠️ Spool maintenance failed: {e}")
+
+
+# Shared spool (per worker process; segments are shared through SPOOL_DIR)
+spool = Spool()
@@ -0,0 +1,135 @@
+# backend/services/stripe_objects.py
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+import stripe
+from services.response_cache import TTLCache
+from services.logger import get_logger
+
+log = get_logger(__name__)
+
+# Expanded Stripe objects are reused for this long (per worker process)
+STRIPE_CACHE_TTL = float(os.getenv('STRIPE_CACHE_TTL', '120'))
+STRIPE_CACHE_MAX_ENTRIES = int(os.getenv('STRIPE_CACHE_MAX_ENTRIES', '512'))
+# Seconds verify_payment waits for card/receipt lookups the expand did not cover
+STRIPE_ENRICH_BUDGET = float(os.getenv('STRIPE_ENRICH_BUDGET', '2'))
+STRIPE_ENRICH_WORKERS = int(os.getenv('STRIPE_ENRICH_WORKERS', '8'))
+
+# One expand list for every checkout session lookup, so the checkout redirect
+# (verify_payment) and the webhook share the same cached object
+CHECKOUT_SESSION_EXPAND = [
+    'payment_intent',
+    'payment_intent.payment_method',
+    'payment_intent.latest_charge'
+]
+
+stripe_cache = TTLCache(ttl=STRIPE_CACHE_TTL, max_entries=STRIPE_CACHE_MAX_ENTRIES)
+
+# Fallback PaymentMethod/Charge lookups (per worker process)
+_enrich_executor = ThreadPoolExecutor(max_workers=STRIPE_ENRICH_WORKERS, thread_name_prefix='stripe-enrich')
+
+
+class StripeObjectService:
+    """
+    Cached Stripe retrievals for checkout sessions, payment methods and charges
+
+    verify_payment and the checkout.session.completed webhook usually look
+    up the same session seconds apart. Objects are cached by id for
+    STRIPE_CACHE_TTL and concurrent lookups of one id share a single Stripe
+    request. Sessions that are not paid yet are not kept, so a later lookup
+    sees the payment once it lands.
+    """
+
+    @staticmethod
+    def checkout_session(session_id):
+        """
+        Checkout session with CHECKOUT_SESSION_EXPAND expanded
+
+        Raises:
+            stripe.error.StripeError: If Stripe rejects or cannot be reached
+        """
+        key = ('checkout_session', session_id)
+
+        def load():
+            log.debug("Stripe checkout session retrieve", session_id=session_id)
+            return stripe.checkout.Session.retrieve(session_id, expand=CHECKOUT_SESSION_EXPAND)
+
+        session = stripe_cache.get_or_load(key, load)
+        if session.payment_status != 'paid':
+            stripe_cache.discard(key)
+        return session
+
+    @staticmethod
+    def payment_method(payment_method):
+        """Return the PaymentMethod, retrieving it if only its id is given"""
+        if not isinstance(payment_method, str):
+            return payment_method
+        return stripe_cache.get_or_load(
+            ('payment_method', payment_method),
+            lambda: stripe.PaymentMethod.retrieve(payment_method)
+        )
+
+    @staticmethod
+    def charge(charge):
+        """Return the Charge, retrieving it if only its id is given"""
+        if not isinstance(charge, str):
+            return charge
+        return stripe_cache.get_or_load(
+            ('charge', charge),
+            lambda: stripe.Charge.retrieve(charge)
+        )
+
+    @staticmethod
+    def payment_details(payment_intent, budget=None):
+        """
+        Card brand/last4 and receipt URL for a PaymentIntent
+
+        With CHECKOUT_SESSION_EXPAND both objects arrive expanded and nothing
+        is fetched. Any that are still bare ids are retrieved concurrently;
+        lookups not finished within budget seconds, or failed, are left out
+        and listed in 'skipped' (slow ones keep running and land in the cache
+        for the next caller).
+
+        Args:
+            payment_intent: PaymentIntent (expanded or not)
+            budget: Seconds to wait for fallback lookups (None waits for them)
+
+        Returns:
+            dict: card_brand, card_last4, receipt_url (None when unknown) and
+                  skipped (names of the lookups left out)
+        """
+        details = {'card_brand': None, 'card_last4': None, 'receipt_url': None, 'skipped': []}
+
+        lookups = {}
+        if payment_intent.payment_method:
+            lookups['payment_method'] = (StripeObjectService.payment_method, payment_intent.payment_method)
+        if payment_intent.latest_charge:
+            lookups['charge'] = (StripeObjectService.charge, payment_intent.latest_charge)
+
+        objects = {}
+        pending = {}
+        for name, (fetch, value) in lookups.items():
+            if isinstance(value, str):
+                pending[name] = _enrich_executor.submit(fetch, value)
+            else:
+                objects[name] = value
+
+        if pending:
+            done, not_done = wait(pending.values(), timeout=budget)
+            for name, future in pending.items():
+                if future not in done:
+                    log.warning("⏱️ Stripe lookup exceeded budget, skipping", lookup=name, budget=budget)
+                    details['skipped'].append(name)
+                elif future.exception() is not None:
+                    log.warning("⚠️ Stripe lookup failed, skipping", lookup=name, error=str(future.exception()))
+                    details['skipped'].append(name)
+                else:
+                    objects[name] = future.result()
+
+        payment_method = objects.get('payment_method')
+        if payment_method is not None and getattr(payment_method, 'card', None):
+            details['card_brand'] = payment_method.card.brand
+            details['card_last4'] = payment_method.card.last4
+        if objects.get('charge') is not None:
+            details['receipt_url'] = objects['charge'].receipt_url
+
+        return details
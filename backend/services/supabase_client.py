@@ -0,0 +1,246 @@
+# backend/services/supabase_client.py
+import os
+import threading
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool tuning (per worker process)
+SUPABASE_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '10'))
+SUPABASE_TIMEOUT = float(os.getenv('SUPABASE_TIMEOUT', '10'))
+
+# Rows per page for iter_rows(); keep at or below PostgREST's max-rows (1000 on Supabase)
+SUPABASE_PAGE_SIZE = int(os.getenv('SUPABASE_PAGE_SIZE', '1000'))
+
+
+class SupabaseError(Exception):
+    """Raised when Supabase answers a request with an error status"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.text = response.text
+        super().__init__(f"Supabase error {response.status_code}: {response.text}")
+
+
+class SupabaseClient:
+    """
+    Shared Supabase REST client backed by a keep-alive requests.Session.
+
+    One Session (and urllib3 connection pool) is created lazily per worker
+    process, so every call after the first reuses an open TCP+TLS connection
+    instead of paying a fresh handshake.
+    """
+
+    _session = None
+    _session_pid = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _get_session():
+        """Return the process-wide Session, rebuilding it after a fork"""
+        pid = os.getpid()
+        if SupabaseClient._session is None or SupabaseClient._session_pid != pid:
+            with SupabaseClient._lock:
+                if SupabaseClient._session is None or SupabaseClient._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=SUPABASE_POOL_SIZE,
+                        pool_maxsize=SUPABASE_POOL_SIZE
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    SupabaseClient._session = session
+                    SupabaseClient._session_pid = pid
+        return SupabaseClient._session
+
+    @staticmethod
+    def _get_base_url():
+        """Get base URL for the Supabase project"""
+        return os.getenv('SUPABASE_URL')
+
+    @staticmethod
+    def get_headers(prefer=None):
+        """Get headers for Supabase requests using the service role key"""
+        api_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+        headers = {
+            'apikey': api_key,
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        }
+        if prefer:
+            headers['Prefer'] = prefer
+        return headers
+
+    @staticmethod
+    def request(method, path, params=None, json=None, prefer=None, headers=None, timeout=None):
+        """
+        Send a request to the Supabase project through the pooled Session
+
+        Args:
+            method: HTTP method (GET, POST, PATCH, DELETE, HEAD)
+            path: Path relative to the project URL (e.g. 'rest/v1/users')
+            params: Query string or dict of query parameters
+            json: JSON body
+            prefer: Value for the PostgREST 'Prefer' header
+            headers: Extra headers merged over the defaults
+            timeout: Seconds before giving up (defaults to SUPABASE_TIMEOUT)
+
+        Returns:
+            requests.Response
+        """
+        request_headers = SupabaseClient.get_headers(prefer)
+        if headers:
+            request_headers.update(headers)
+
+        return SupabaseClient._get_session().request(
+            method,
+            f"{SupabaseClient._get_base_url()}/{path}",
+            params=params,
+            json=json,
+            headers=request_headers,
+            timeout=timeout or SUPABASE_TIMEOUT
+        )
+
+    @staticmethod
+    def select(table, query='', prefer=None, headers=None, timeout=None):
+        """GET rows from a table, e.g. select('users', 'select=id&limit=1')"""
+        return SupabaseClient.request(
+            'GET', f"rest/v1/{table}", params=query,
+            prefer=prefer, headers=headers, timeout=timeout
+        )
+
+    @staticmethod
+    def insert(table, rows, prefer=None, headers=None, timeout=None):
+        """POST one row (dict) or many rows (list of dicts) into a table"""
+        return SupabaseClient.request(
+            'POST', f"rest/v1/{table}", json=rows,
+            prefer=prefer, headers=headers, timeout=timeout
+        )
+
+    @staticmethod
+    def patch(table, filters, data, prefer=None, headers=None, timeout=None):
+        """PATCH rows matching filters, e.g. patch('users', 'id=eq.123', {...})"""
+        return SupabaseClient.request(
+            'PATCH', f"rest/v1/{table}", params=filters, json=data,
+            prefer=prefer, headers=headers, timeout=timeout
+        )
+
+    @staticmethod
+    def delete(table, filters, prefer=None, headers=None, timeout=None):
+        """DELETE rows matching filters, e.g. delete('resumes', 'user_id=eq.123')"""
+        return SupabaseClient.request(
+            'DELETE', f"rest/v1/{table}", params=filters,
+            prefer=prefer, headers=headers, timeout=timeout
+        )
+
+    @staticmethod
+    def rpc(function, args=None, timeout=None):
+        """Call a Postgres function exposed by PostgREST, e.g. rpc('fn', {'p_x': 1})"""
+        return SupabaseClient.request(
+            'POST', f"rest/v1/rpc/{function}", json=args or {}, timeout=timeout
+        )
+
+    @staticmethod
+    def count(table, filters='', timeout=None):
+        """
+        Count rows matching filters without downloading them
+
+        Sends a HEAD request with 'Prefer: count=exact' and reads the total
+        from the Content-Range header (e.g. '*/42').
+
+        Returns:
+            int: Number of matching rows, or None if the total is unavailable
+
+        Raises:
+            SupabaseError: If the request fails
+        """
+        response = SupabaseClient.request(
+            'HEAD', f"rest/v1/{table}", params=filters,
+            prefer='count=exact', timeout=timeout
+        )
+        if response.status_code not in [200, 206]:
+            raise SupabaseError(response)
+
+        content_range = response.headers.get('Content-Range', '')
+        total = content_range.rsplit('/', 1)[-1]
+        return int(total) if total.isdigit() else None
+
+    @staticmethod
+    def in_filter(column, values):
+        """
+        Build a PostgREST 'in' filter with each value quoted and URL-encoded
+
+        Returns:
+            str: Query fragment, e.g. 'email=in.("a@x.com","b@y.com")'
+        """
+        quoted = ','.join(f'"{value}"' for value in values)
+        return f"{column}=in.{quote(f'({quoted})', safe='(),')}"
+
+    @staticmethod
+    def keyset_filter(sort_value, row_id, descending=True, cursor=('created_at', 'id')):
+        """
+        Build the PostgREST filter that resumes after a (sort column, id column) cursor
+
+        Returns:
+            str: Query fragment, e.g. 'or=(created_at.lt."...",and(created_at.eq."...",id.lt."..."))'
+        """
+        sort_column, id_column = cursor
+        op = 'lt' if descending else 'gt'
+        value = f'"{sort_value}"'
+        condition = (
+            f'({sort_column}.{op}.{value},'
+            f'and({sort_column}.eq.{value},{id_column}.{op}."{row_id}"))'
+        )
+        return f"or={quote(condition, safe='(),._')}"
+
+    @staticmethod
+    def iter_rows(table, query='', page_size=None, descending=True, timeout=None,
+                  cursor=('created_at', 'id')):
+        """
+        Lazily yield every matching row using keyset pagination on (created_at, id)
+
+        Each page is requested with a Range header and resumes strictly after
+        the last row of the previous page, so results are complete (not cut off
+        by PostgREST's max-rows) and memory stays bounded by one page.
+
+        Args:
+            table: Table name (must have the cursor columns)
+            query: Select/filters without order, e.g. 'select=*&status=eq.unread'
+                   (a column list in select must include the cursor columns)
+            page_size: Rows per request (defaults to SUPABASE_PAGE_SIZE)
+            descending: Newest first when True
+            timeout: Seconds per page request
+            cursor: (sort column, unique tie-breaker column) to page on
+
+        Yields:
+            dict: One row at a time
+
+        Raises:
+            SupabaseError: If any page request fails
+        """
+        sort_column, id_column = cursor
+        page_size = page_size or SUPABASE_PAGE_SIZE
+        direction = 'desc' if descending else 'asc'
+        order = f'order={sort_column}.{direction},{id_column}.{direction}'
+        base_query = '&'.join(part for part in [query, order] if part)
+        range_headers = {'Range-Unit': 'items', 'Range': f'0-{page_size - 1}'}
+
+        cursor_filter = ''
+        while True:
+            page_query = f'{base_query}&{cursor_filter}' if cursor_filter else base_query
+            response = SupabaseClient.select(
+                table, page_query, headers=range_headers, timeout=timeout
+            )
+            if response.status_code not in [200, 206]:
+                raise SupabaseError(response)
+
+            rows = response.json()
+            yield from rows
+
+            if len(rows) < page_size:
+                return
+
+            last = rows[-1]
+            cursor_filter = SupabaseClient.keyset_filter(
+                last[sort_column], last[id_column], descending, cursor
+            )
@@ -1,24 +1,45 @@
 # backend/services/user_service.py - ENHANCED VERSION
 import os
-import requests
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from services.supabase_client import SupabaseClient
+from services.blacklist_index import blacklist_index
+from services.response_cache import admin_cache, USER_NAMESPACES
+from services.logger import get_logger
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+log = get_logger(__name__)
 
-class UserService:
-    @staticmethod
-    def _get_headers():
-        """Get Supabase headers with service role key"""
-        return {
-            'apikey': SUPABASE_SERVICE_KEY,
-            'Authorization': f'Bearer {SUPABASE_SERVICE_KEY}',
-            'Content-Type': 'application/json',
-            'Prefer': 'return=representation'
-        }
+# Parallel per-table deletes during user cleanup
+USER_DELETE_CONCURRENCY = int(os.getenv('USER_DELETE_CONCURRENCY', '8'))
+USER_DELETE_TABLE_TIMEOUT = float(os.getenv('USER_DELETE_TABLE_TIMEOUT', '10'))
+# Ids/emails per in.() filter in bulk operations (keeps URLs short)
+BULK_DELETE_CHUNK_SIZE = int(os.getenv('BULK_DELETE_CHUNK_SIZE', '100'))
+
+# Tables holding per-user rows (keyed by user_id), cleared before the users row
+USER_DATA_TABLES = [
+    'resume_uploads',
+    'blast_history', 
+    'payment_history',
+    'user_activity',
+    'recruiter_activity',
+    'support_tickets',
+    'payments',
+    'resumes',
+    'blast_campaigns',
+    'resume_analysis',
+    'blast_recipients',
+    'blast_responses',
+    'contact_submissions'
+]
 
+
+def _chunks(items, size=BULK_DELETE_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class UserService:
     @staticmethod
-    def delete_user_data(email, user_id=None, reason="Admin deletion"):
+    def delete_user_data(email, user_id=None, reason="Admin deletion", progress=None, on_step=None):
         """
         Complete user data deletion orchestration:
         1. Resolve user_id if not provided
@@ -31,71 +52,325 @@ class UserService:
             email: User email address
             user_id: Optional user UUID
             reason: Reason for deletion (e.g., "Stripe Refund", "Admin Ban")
+            progress: Summary saved by an earlier, interrupted run; steps
+                      already in steps_completed are skipped
+            on_step: Optional callback(summary) after each completed step
         
         Returns:
             dict: Deletion summary
         """
-        print(f"\n{'='*70}")
-        print(f"🗑️  STARTING USER DELETION")
-        print(f"{'='*70}")
-        print(f"📧 Email: {email}")
-        print(f"📝 Reason: {reason}")
+        log.info(f"🗑️  STARTING USER DELETION", email=email, reason=reason)
         
-        deletion_summary = {
+        deletion_summary = progress or {
             'email': email,
             'reason': reason,
             'timestamp': datetime.utcnow().isoformat(),
             'steps_completed': []
         }
+        done = set(deletion_summary['steps_completed'])
+        
+        def complete(step):
+            deletion_summary['steps_completed'].append(step)
+            if on_step:
+                on_step(deletion_summary)
         
         # STEP 1: Resolve User ID
-        if not user_id:
-            print(f"\n🔍 Step 1: Resolving user ID...")
+        if 'user_id' in deletion_summary:
+            user_id = deletion_summary['user_id']
+            log.info(f"✅ Resuming after: {', '.join(done) or 'start'}")
+        elif not user_id:
+            log.info(f"🔍 Step 1: Resolving user ID...")
             user_id = UserService.get_user_id_by_email(email)
             if user_id:
-                print(f"✅ User ID found: {user_id}")
+                log.info(f"✅ User ID found: {user_id}")
                 deletion_summary['user_id'] = user_id
             else:
-                print(f"⚠️  User ID not found for {email}")
+                log.warning(f"⚠️  User ID not found for {email}")
                 deletion_summary['user_id'] = None
         else:
             deletion_summary['user_id'] = user_id
-            print(f"✅ User ID provided: {user_id}")
+            log.info(f"✅ User ID provided: {user_id}")
         
         # STEP 2: Add to Blacklist (CRITICAL - Do this first!)
-        print(f"\n🚫 Step 2: Adding to blacklist...")
-        blacklist_result = UserService.add_to_blacklist(email, user_id, reason)
-        deletion_summary['steps_completed'].append('blacklist')
+        if 'blacklist' not in done:
+            log.info(f"🚫 Step 2: Adding to blacklist...")
+            UserService.add_to_blacklist(email, user_id, reason)
+            complete('blacklist')
         
         if user_id:
             # STEP 3: Ban user in users table (before deletion)
-            print(f"\n⛔ Step 3: Banning user account...")
-            UserService.ban_user(user_id, reason)
-            deletion_summary['steps_completed'].append('ban_user')
+            if 'ban_user' not in done:
+                log.info(f"⛔ Step 3: Banning user account...")
+                UserService.ban_user(user_id, reason)
+                complete('ban_user')
             
             # STEP 4: Delete from all database tables
-            print(f"\n🗂️  Step 4: Deleting from database tables...")
-            tables_deleted = UserService.delete_from_all_tables(user_id)
-            deletion_summary['steps_completed'].append('database_cleanup')
-            deletion_summary['tables_deleted'] = tables_deleted
+            if 'database_cleanup' not in done:
+                log.info(f"🗂️  Step 4: Deleting from database tables...")
+                tables_deleted = UserService.delete_from_all_tables(user_id)
+                deletion_summary['tables_deleted'] = tables_deleted
+                complete('database_cleanup')
             
             # STEP 5: Delete from Supabase Auth
-            print(f"\n🔐 Step 5: Deleting from authentication...")
-            UserService.delete_from_auth(user_id)
-            deletion_summary['steps_completed'].append('auth_deletion')
-        
-        print(f"\n{'='*70}")
-        print(f"✅ USER DELETION COMPLETED")
-        print(f"{'='*70}")
-        print(f"📊 Summary:")
-        print(f"   Email: {email}")
-        print(f"   User ID: {user_id or 'N/A'}")
-        print(f"   Blacklisted: Yes")
-        print(f"   Steps Completed: {len(deletion_summary['steps_completed'])}")
-        print(f"{'='*70}\n")
+            if 'auth_deletion' not in done:
+                log.info(f"🔐 Step 5: Deleting from authentication...")
+                UserService.delete_from_auth(user_id)
+                complete('auth_deletion')
+        
+        log.info(f"✅ USER DELETION COMPLETED", email=email, user_id=user_id,
+                 steps_completed=deletion_summary['steps_completed'])
         
         return deletion_summary
 
+    @staticmethod
+    def run_deletion_job(job):
+        """
+        Job handler for 'user_deletion' (see services/job_runner.py)
+        Saves the summary after every step so a crashed job resumes where it stopped
+        """
+        payload = job.payload
+        summary = UserService.delete_user_data(
+            payload.get('email'),
+            payload.get('user_id'),
+            payload.get('reason', 'Admin deletion'),
+            progress=job.progress or None,
+            on_step=job.save_progress
+        )
+        admin_cache.invalidate(*USER_NAMESPACES)
+        return summary
+
+    @staticmethod
+    def run_bulk_deletion_job(job):
+        """
+        Job handler for 'bulk_user_deletion'
+        Saves the resolved users and finished steps before and after every
+        destructive step, so a crashed job resumes where it stopped
+        """
+        payload = job.payload
+        result = UserService.bulk_delete_users(
+            payload.get('emails'),
+            payload.get('user_ids'),
+            payload.get('reason', 'Admin bulk deletion'),
+            progress=job.progress or None,
+            on_step=job.save_progress
+        )
+        admin_cache.invalidate(*USER_NAMESPACES)
+        return result
+
+    @staticmethod
+    def bulk_delete_users(emails=None, user_ids=None, reason="Admin bulk deletion",
+                          progress=None, on_step=None):
+        """
+        Delete and blacklist many users with batched in.() requests
+        
+        Same steps as delete_user_data(), but each step is one request per
+        chunk of BULK_DELETE_CHUNK_SIZE users (per table for the cleanup),
+        so upstream requests scale with tables rather than users x tables.
+        Only Supabase Auth deletion remains one call per user.
+        
+        Args:
+            emails: List of user emails
+            user_ids: List of user UUIDs
+            reason: Reason for deletion
+            progress: State saved by an earlier, interrupted run; users are
+                      not resolved again (their rows may already be gone) and
+                      steps already in steps_completed are skipped
+            on_step: Optional callback(state) after each completed step
+        
+        Returns:
+            dict: {'count': int, 'users': [per-user summary]}
+        """
+        log.info(f"🗑️  STARTING BULK USER DELETION")
+        
+        state = progress or {
+            'reason': reason,
+            'timestamp': datetime.utcnow().isoformat(),
+            'steps_completed': []
+        }
+        done = set(state['steps_completed'])
+        
+        def complete(step):
+            state['steps_completed'].append(step)
+            if on_step:
+                on_step(state)
+        
+        timestamp = state['timestamp']
+        
+        # STEP 1: Resolve ids and emails in batched lookups (saved before
+        # anything is deleted, since a rerun could no longer find them)
+        if 'resolve' in done:
+            summaries = state['users']
+            log.info(f"✅ Resuming after: {', '.join(state['steps_completed'])}")
+        else:
+            summaries = {
+                key: {
+                    'email': u['email'],
+                    'user_id': u['user_id'],
+                    'blacklisted': False,
+                    'banned': False,
+                    'tables_deleted': [],
+                    'auth_deleted': False
+                }
+                for key, u in UserService._resolve_bulk_users(emails, user_ids).items()
+            }
+            state['users'] = summaries
+            complete('resolve')
+        
+        ids = [u['user_id'] for u in summaries.values() if u['user_id']]
+        log.info(f"🔍 Resolved {len(ids)} user IDs for {len(summaries)} requested users")
+        
+        # STEP 2: Blacklist everyone with an email in one array upsert per chunk
+        if 'blacklist' not in done:
+            blacklist_rows = [
+                {
+                    'email': u['email'],
+                    'original_user_id': u['user_id'],
+                    'reason': reason,
+                    'deleted_at': timestamp,
+                    'deleted_by': 'system',
+                    'metadata': {
+                        'deletion_timestamp': timestamp,
+                        'reason_category': 'refund' if 'refund' in reason.lower() else 'admin'
+                    }
+                }
+                for u in summaries.values() if u['email']
+            ]
+            for chunk in _chunks(blacklist_rows):
+                try:
+                    response = SupabaseClient.insert(
+                        'deleted_users', chunk, prefer='resolution=merge-duplicates'
+                    )
+                    if response.status_code in [200, 201]:
+                        for row in chunk:
+                            blacklist_index.add(row)
+                            key = row['original_user_id'] or row['email']
+                            summaries[key]['blacklisted'] = True
+                    else:
+                        log.warning(f"⚠️  Blacklist response: {response.status_code} - {response.text}")
+                except Exception as e:
+                    log.error(f"❌ Error adding to blacklist: {e}")
+            complete('blacklist')
+        
+        # STEP 3: Ban in the users table
+        if 'ban_user' not in done:
+            ban_data = {
+                'is_banned': True,
+                'ban_reason': reason,
+                'banned_at': timestamp,
+                'account_status': 'banned',
+                'updated_at': timestamp
+            }
+            for chunk in _chunks(ids):
+                try:
+                    response = SupabaseClient.patch('users', SupabaseClient.in_filter('id', chunk), ban_data)
+                    if response.status_code in [200, 204]:
+                        for user_id in chunk:
+                            summaries[user_id]['banned'] = True
+                except Exception as e:
+                    log.warning(f"⚠️  Error banning users: {e}")
+            complete('ban_user')
+        
+        # STEP 4: Clear every data table, one request per table and chunk
+        def clear(table, column, chunk):
+            try:
+                response = SupabaseClient.delete(
+                    table, SupabaseClient.in_filter(column, chunk), timeout=USER_DELETE_TABLE_TIMEOUT
+                )
+                if response.status_code in [200, 204]:
+                    return True
+                log.warning(f"   ⚠ Skipped: {table} ({response.status_code})")
+            except Exception as e:
+                log.warning(f"   ⚠ Error clearing {table}: {e}")
+            return False
+        
+        chunks = list(_chunks(ids))
+        with ThreadPoolExecutor(max_workers=USER_DELETE_CONCURRENCY) as executor:
+            tables = [table for table in USER_DATA_TABLES if f"clear:{table}" not in done]
+            futures = {
+                table: [(chunk, executor.submit(clear, table, 'user_id', chunk)) for chunk in chunks]
+                for table in tables
+            }
+            for table in tables:
+                for chunk, future in futures[table]:
+                    if future.result():
+                        for user_id in chunk:
+                            summaries[user_id]['tables_deleted'].append(table)
+                complete(f"clear:{table}")
+            
+            # users rows go last, after their dependents
+            if 'clear:users' not in done:
+                for chunk in chunks:
+                    if clear('users', 'id', chunk):
+                        for user_id in chunk:
+                            summaries[user_id]['tables_deleted'].append('users')
+                complete('clear:users')
+            
+            # STEP 5: Supabase Auth has no bulk delete, so fan out per user;
+            # progress is saved per chunk and a resumed job skips users done
+            def delete_auth(user_id):
+                try:
+                    response = SupabaseClient.request('DELETE', f"auth/v1/admin/users/{user_id}")
+                    return response.status_code in [200, 204]
+                except Exception as e:
+                    log.warning(f"⚠️  Auth deletion error for {user_id}: {e}")
+                    return False
+            
+            if 'auth_deletion' not in done:
+                for index, chunk in enumerate(chunks):
+                    if f"auth:{index}" in done:
+                        continue
+                    for user_id, deleted in zip(chunk, executor.map(delete_auth, chunk)):
+                        summaries[user_id]['auth_deleted'] = deleted
+                    complete(f"auth:{index}")
+                complete('auth_deletion')
+        
+        log.info(f"✅ BULK USER DELETION COMPLETED: {len(summaries)} users")
+        
+        return {'count': len(summaries), 'users': list(summaries.values())}
+
+    @staticmethod
+    def _resolve_bulk_users(emails, user_ids):
+        """
+        Map requested emails/ids to users (batched users, then payments lookups)
+
+        Returns:
+            dict: user_id (or the email/id when unresolved) -> {'email', 'user_id'}
+        """
+        users = {}
+        emails = sorted({e.strip().lower() for e in emails or [] if e and e.strip()})
+        user_ids = sorted({str(u) for u in user_ids or [] if u})
+        
+        for chunk in _chunks(emails):
+            resp = SupabaseClient.select('users', f"select=id,email&{SupabaseClient.in_filter('email', chunk)}")
+            for row in resp.json() if resp.status_code == 200 else []:
+                users[row['id']] = {'email': row['email'].lower(), 'user_id': row['id']}
+        
+        for chunk in _chunks(user_ids):
+            resp = SupabaseClient.select('users', f"select=id,email&{SupabaseClient.in_filter('id', chunk)}")
+            for row in resp.json() if resp.status_code == 200 else []:
+                users[row['id']] = {'email': (row.get('email') or '').lower(), 'user_id': row['id']}
+        
+        found_emails = {u['email'] for u in users.values()}
+        missing_emails = [e for e in emails if e not in found_emails]
+        for chunk in _chunks(missing_emails):
+            # Fallback for users that only exist in payments
+            resp = SupabaseClient.select(
+                'payments', f"select=user_id,user_email&{SupabaseClient.in_filter('user_email', chunk)}"
+            )
+            for row in resp.json() if resp.status_code == 200 else []:
+                if row.get('user_id') and row['user_id'] not in users:
+                    users[row['user_id']] = {'email': row['user_email'].lower(), 'user_id': row['user_id']}
+        
+        found_emails = {u['email'] for u in users.values()}
+        found_ids = set(users)
+        for email in emails:
+            if email not in found_emails:
+                users[email] = {'email': email, 'user_id': None}
+        for user_id in user_ids:
+            if user_id not in found_ids:
+                users[user_id] = {'email': None, 'user_id': user_id}
+        return users
+
     @staticmethod
     def get_user_id_by_email(email):
         """
@@ -104,30 +379,28 @@ class UserService:
         """
         try:
             # Try public.users first (faster)
-            url = f"{SUPABASE_URL}/rest/v1/users?email=eq.{email}&select=id"
-            resp = requests.get(url, headers=UserService._get_headers())
+            resp = SupabaseClient.select('users', f"email=eq.{email}&select=id")
             
             if resp.status_code == 200:
                 data = resp.json()
                 if data and len(data) > 0:
-                    print(f"   Found in users table")
+                    log.info(f"   Found in users table")
                     return data[0]['id']
             
             # Try payments table as fallback
-            url = f"{SUPABASE_URL}/rest/v1/payments?user_email=eq.{email}&select=user_id&limit=1"
-            resp = requests.get(url, headers=UserService._get_headers())
+            resp = SupabaseClient.select('payments', f"user_email=eq.{email}&select=user_id&limit=1")
             
             if resp.status_code == 200:
                 data = resp.json()
                 if data and len(data) > 0:
-                    print(f"   Found in payments table")
+                    log.info(f"   Found in payments table")
                     return data[0]['user_id']
             
-            print(f"   User ID not found in database")
+            log.info(f"   User ID not found in database")
             return None
             
         except Exception as e:
-            print(f"❌ Error finding user ID: {e}")
+            log.error(f"❌ Error finding user ID: {e}")
             return None
 
     @staticmethod
@@ -137,8 +410,6 @@ class UserService:
         Uses upsert to handle duplicates
         """
         try:
-            url = f"{SUPABASE_URL}/rest/v1/deleted_users"
-            
             data = {
                 'email': email.lower(),
                 'original_user_id': original_user_id,
@@ -152,20 +423,20 @@ class UserService:
             }
             
             # Use upsert to avoid duplicate errors
-            headers = UserService._get_headers()
-            headers['Prefer'] = 'resolution=merge-duplicates'
-            
-            response = requests.post(url, json=data, headers=headers)
+            response = SupabaseClient.insert(
+                'deleted_users', data, prefer='resolution=merge-duplicates'
+            )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Added {email} to blacklist")
+                blacklist_index.add(data)
+                log.info(f"✅ Added {email} to blacklist")
                 return True
             else:
-                print(f"⚠️  Blacklist response: {response.status_code} - {response.text}")
+                log.warning(f"⚠️  Blacklist response: {response.status_code} - {response.text}")
                 return False
                 
         except Exception as e:
-            print(f"❌ Error adding to blacklist: {e}")
+            log.error(f"❌ Error adding to blacklist: {e}")
             return False
 
     @staticmethod
@@ -174,8 +445,6 @@ class UserService:
         Ban user in users table (mark as banned before deletion)
         """
         try:
-            url = f"{SUPABASE_URL}/rest/v1/users?id=eq.{user_id}"
-            
             data = {
                 'is_banned': True,
                 'ban_reason': reason,
@@ -184,15 +453,15 @@ class UserService:
                 'updated_at': datetime.utcnow().isoformat()
             }
             
-            response = requests.patch(url, json=data, headers=UserService._get_headers())
+            response = SupabaseClient.patch('users', f"id=eq.{user_id}", data)
             
             if response.status_code in [200, 204]:
-                print(f"✅ User banned in users table")
+                log.info(f"✅ User banned in users table")
             else:
-                print(f"⚠️  Could not ban user: {response.status_code}")
+                log.warning(f"⚠️  Could not ban user: {response.status_code}")
                 
         except Exception as e:
-            print(f"⚠️  Error banning user: {e}")
+            log.warning(f"⚠️  Error banning user: {e}")
 
     @staticmethod
     def delete_from_all_tables(user_id):
@@ -200,49 +469,42 @@ class UserService:
         Delete user data from all tables
         Returns list of tables that were successfully cleaned
         """
-        tables = [
-            'resume_uploads',
-            'blast_history', 
-            'payment_history',
-            'user_activity',
-            'recruiter_activity',
-            'support_tickets',
-            'payments',
-            'resumes',
-            'blast_campaigns',
-            'resume_analysis',
-            'blast_recipients',
-            'blast_responses',
-            'contact_submissions'
-        ]
-        
-        deleted_tables = []
-        
-        for table in tables:
+        tables = USER_DATA_TABLES
+        
+        # Tables are independent, so clear them concurrently; results keep table order
+        def clear_table(table):
             try:
-                url = f"{SUPABASE_URL}/rest/v1/{table}?user_id=eq.{user_id}"
-                response = requests.delete(url, headers=UserService._get_headers())
+                response = SupabaseClient.delete(
+                    table, f"user_id=eq.{user_id}", timeout=USER_DELETE_TABLE_TIMEOUT
+                )
                 
                 if response.status_code in [200, 204]:
-                    print(f"   ✓ Cleared: {table}")
-                    deleted_tables.append(table)
+                    log.info(f"   ✓ Cleared: {table}")
+                    return True
                 else:
-                    print(f"   ⚠ Skipped: {table} ({response.status_code})")
+                    log.warning(f"   ⚠ Skipped: {table} ({response.status_code})")
                     
             except Exception as e:
-                print(f"   ⚠ Error clearing {table}: {e}")
+                log.warning(f"   ⚠ Error clearing {table}: {e}")
+            return False
+        
+        with ThreadPoolExecutor(max_workers=USER_DELETE_CONCURRENCY) as executor:
+            cleared = list(executor.map(clear_table, tables))
+        
+        deleted_tables = [table for table, ok in zip(tables, cleared) if ok]
         
-        # Also delete from users table
+        # Also delete from users table (last, after its dependents are gone)
         try:
-            url = f"{SUPABASE_URL}/rest/v1/users?id=eq.{user_id}"
-            response = requests.delete(url, headers=UserService._get_headers())
+            response = SupabaseClient.delete(
+                'users', f"id=eq.{user_id}", timeout=USER_DELETE_TABLE_TIMEOUT
+            )
             
             if response.status_code in [200, 204]:
-                print(f"   ✓ Cleared: users")
+                log.info(f"   ✓ Cleared: users")
                 deleted_tables.append('users')
                 
         except Exception as e:
-            print(f"   ⚠ Error clearing users: {e}")
+            log.warning(f"   ⚠ Error clearing users: {e}")
         
         return deleted_tables
 
@@ -253,54 +515,55 @@ class UserService:
         This prevents them from logging in
         """
         try:
-            url = f"{SUPABASE_URL}/auth/v1/admin/users/{user_id}"
-            response = requests.delete(url, headers=UserService._get_headers())
+            response = SupabaseClient.request('DELETE', f"auth/v1/admin/users/{user_id}")
             
             if response.status_code in [200, 204]:
-                print(f"✅ Deleted from Supabase Auth")
+                log.info(f"✅ Deleted from Supabase Auth")
             else:
-                print(f"⚠️  Auth deletion response: {response.status_code}")
+                log.warning(f"⚠️  Auth deletion response: {response.status_code}")
                 
         except Exception as e:
-            print(f"⚠️  Auth deletion error: {e}")
+            log.warning(f"⚠️  Auth deletion error: {e}")
 
     @staticmethod
-    def is_user_blacklisted(email):
+    def get_blacklist_entry(email):
         """
-        Check if user is in blacklist
-        Returns: (is_blacklisted: bool, reason: str)
+        Get the deleted_users record for an email, or None if not blacklisted
+        Answers from the in-memory blacklist index; queries Supabase only
+        until the index has loaded
         """
+        if blacklist_index.loaded:
+            return blacklist_index.lookup(email)
+
+        blacklist_index.schedule_refresh()
         try:
-            url = f"{SUPABASE_URL}/rest/v1/deleted_users?email=eq.{email.lower()}"
-            response = requests.get(url, headers=UserService._get_headers())
+            response = SupabaseClient.select('deleted_users', f"email=eq.{email.lower()}")
             
             if response.status_code == 200:
                 data = response.json()
                 if data and len(data) > 0:
-                    return True, data[0].get('reason', 'Account suspended')
+                    return data[0]
             
-            return False, None
+            return None
             
         except Exception as e:
-            print(f"❌ Error checking blacklist: {e}")
-            return False, None
+            log.error(f"❌ Error checking blacklist: {e}")
+            return None
+
+    @staticmethod
+    def is_user_blacklisted(email):
+        """
+        Check if user is in blacklist
+        Returns: (is_blacklisted: bool, reason: str)
+        """
+        entry = UserService.get_blacklist_entry(email)
+        if entry:
+            return True, entry.get('reason', 'Account suspended')
+        return False, None
 
     @staticmethod
     def get_blacklist_info(email):
         """
         Get detailed blacklist information for an email
         """
-        try:
-            url = f"{SUPABASE_URL}/rest/v1/deleted_users?email=eq.{email.lower()}"
-            response = requests.get(url, headers=UserService._get_headers())
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    return data[0]
-            
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error getting blacklist info: {e}")
-            return None
\ No newline at end of file
+        return UserService.get_blacklist_entry(email)
@@ -0,0 +1,96 @@
+-- backend/sql/admin_revenue_summary.sql
+-- Revenue aggregates for /api/admin/revenue, computed inside Postgres.
+-- Run in the Supabase SQL editor. Amounts are returned in cents.
+
+create index if not exists payments_status_created_at_idx
+    on public.payments (status, created_at desc);
+
+create or replace function public.admin_revenue_summary(
+    p_start timestamptz default null,
+    p_end timestamptz default null,
+    p_now timestamptz default now()
+)
+returns json
+language sql
+stable
+as $$
+    with bounds as (
+        select
+            date_trunc('day', p_now at time zone 'UTC') at time zone 'UTC' as today_start,
+            p_now - interval '7 days' as seven_days_ago
+    ),
+    totals as (
+        select
+            count(*) filter (where status = 'completed') as completed_count,
+            coalesce(sum(amount) filter (where status = 'completed'), 0) as completed_amount,
+            count(*) filter (where status = 'failed') as failed_count,
+            coalesce(sum(amount) filter (where status = 'failed'), 0) as failed_amount,
+            count(*) filter (where status = 'refunded') as refunded_count,
+            coalesce(sum(refund_amount) filter (where status = 'refunded'), 0) as refunded_amount
+        from public.payments
+        where status in ('completed', 'failed', 'refunded')
+          and (p_start is null or created_at >= p_start)
+          and (p_end is null or created_at < p_end)
+    ),
+    recent as (
+        select p.amount, p.created_at
+        from public.payments p, bounds b
+        where p.status = 'completed'
+          and p.created_at >= least(b.seven_days_ago, b.today_start - interval '6 days')
+    ),
+    recent_totals as (
+        select
+            count(*) filter (where r.created_at >= b.today_start) as today_count,
+            coalesce(sum(r.amount) filter (where r.created_at >= b.today_start), 0) as today_amount,
+            coalesce(sum(r.amount) filter (where r.created_at >= b.seven_days_ago), 0) as last_7_days_amount
+        from recent r, bounds b
+    ),
+    days as (
+        select (b.today_start - make_interval(days => i)) as day_start
+        from bounds b, generate_series(0, 6) as i
+    )
+    select json_build_object(
+        'completed_count', t.completed_count,
+        'completed_amount', t.completed_amount,
+        'failed_count', t.failed_count,
+        'failed_amount', t.failed_amount,
+        'refunded_count', t.refunded_count,
+        'refunded_amount', t.refunded_amount,
+        'today_count', rt.today_count,
+        'today_amount', rt.today_amount,
+        'last_7_days_amount', rt.last_7_days_amount,
+        'daily', (
+            select json_agg(json_build_object(
+                'day', to_char(d.day_start at time zone 'UTC', 'YYYY-MM-DD'),
+                'count', (select count(*) from recent r
+                          where r.created_at >= d.day_start and r.created_at < d.day_start + interval '1 day'),
+                'amount', (select coalesce(sum(r.amount), 0) from recent r
+                           where r.created_at >= d.day_start and r.created_at < d.day_start + interval '1 day')
+            ) order by d.day_start desc)
+            from days d
+        ),
+        'failed_payments', (
+            select coalesce(json_agg(f order by f.created_at desc), '[]'::json)
+            from (
+                select * from public.payments
+                where status = 'failed'
+                  and (p_start is null or created_at >= p_start)
+                  and (p_end is null or created_at < p_end)
+                order by created_at desc
+                limit 20
+            ) f
+        ),
+        'refunded_payments', (
+            select coalesce(json_agg(r order by r.created_at desc), '[]'::json)
+            from (
+                select * from public.payments
+                where status = 'refunded'
+                  and (p_start is null or created_at >= p_start)
+                  and (p_end is null or created_at < p_end)
+                order by created_at desc
+                limit 20
+            ) r
+        )
+    )
+    from totals t, recent_totals rt;
+$$;
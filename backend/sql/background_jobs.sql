@@ -0,0 +1,27 @@
+-- backend/sql/background_jobs.sql
+-- Durable state for services/job_runner.py (user deletions, ...).
+-- Run in the Supabase SQL editor.
+
+create table if not exists public.background_jobs (
+    id uuid primary key default gen_random_uuid(),
+    job_type text not null,
+    payload jsonb not null default '{}'::jsonb,
+    status text not null default 'queued',   -- queued | running | completed | failed | dead_letter
+    progress jsonb not null default '{}'::jsonb,
+    result jsonb,
+    error text,
+    attempts integer not null default 0,
+    worker text,
+    locked_until timestamptz,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+
+-- Recovery scan: unfinished jobs whose lease has expired
+create index if not exists background_jobs_recovery_idx
+    on public.background_jobs (status, locked_until)
+    where status in ('queued', 'running');
+
+-- Queue depth / lag per job type (JobRunner.stats)
+create index if not exists background_jobs_type_status_idx
+    on public.background_jobs (job_type, status, created_at);
@@ -0,0 +1,23 @@
+-- backend/sql/cache_versions.sql
+-- Shared invalidation for the per-worker admin cache (services/response_cache.py).
+-- Each write path bumps the versions of the namespaces it changes; every
+-- worker compares them before serving a cached read. Run in the Supabase SQL editor.
+-- Changes made directly in Supabase don't bump versions; those show up when
+-- the entry's TTL (ADMIN_CACHE_TTL) expires.
+
+create table if not exists public.cache_versions (
+    namespace text primary key,              -- e.g. 'contact_submissions', 'stats'
+    version bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+create or replace function public.bump_cache_versions(p_namespaces text[])
+returns void
+language sql
+as $$
+    insert into public.cache_versions (namespace, version)
+    select unnest(p_namespaces), 1
+    on conflict (namespace) do update set
+        version = cache_versions.version + 1,
+        updated_at = now();
+$$;
@@ -0,0 +1,27 @@
+-- backend/sql/deleted_users_updated_at.sql
+-- Server-assigned change timestamp on the deleted_users blacklist, used as
+-- the refresh watermark by services/blacklist_index.py. App-supplied
+-- deleted_at values are shared by whole bulk deletes and come from several
+-- workers' clocks, so they can't order changes. Run in the Supabase SQL editor.
+
+alter table public.deleted_users
+    add column if not exists updated_at timestamptz not null default clock_timestamp();
+
+create or replace function public.deleted_users_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+drop trigger if exists deleted_users_touch_updated_at on public.deleted_users;
+create trigger deleted_users_touch_updated_at
+    before insert or update on public.deleted_users
+    for each row execute function public.deleted_users_touch_updated_at();
+
+-- Incremental refresh: keyset scan on (updated_at, email)
+create index if not exists deleted_users_updated_at_idx
+    on public.deleted_users (updated_at, email);
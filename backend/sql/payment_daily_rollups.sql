@@ -0,0 +1,116 @@
+-- backend/sql/payment_daily_rollups.sql
+-- Per-day, per-status payment totals for /api/admin/revenue.
+-- Run in the Supabase SQL editor, then backfill once with:
+--     python -m services.revenue_rollup_service rebuild
+-- (also after re-running this file on a database that lacked the trigger).
+-- Days are UTC calendar days of payments.created_at. Amounts are in cents.
+-- The trigger below keeps the buckets current for every payments write,
+-- including statuses changed directly in Supabase (failed, refunded).
+
+create table if not exists public.payment_daily_rollups (
+    day date not null,
+    status text not null,
+    payment_count bigint not null default 0,
+    amount bigint not null default 0,
+    refund_amount bigint not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (day, status)
+);
+
+-- Single row set by rebuild_payment_rollups(). Until it exists the rollups
+-- only hold completions recorded since deploy, so the backend ignores them.
+create table if not exists public.payment_rollup_state (
+    id boolean primary key default true check (id),
+    backfilled_at timestamptz
+);
+
+-- Atomic increment (negative values move a payment out of a bucket)
+create or replace function public.increment_payment_rollup(
+    p_day date,
+    p_status text,
+    p_count bigint default 1,
+    p_amount bigint default 0,
+    p_refund_amount bigint default 0
+)
+returns void
+language sql
+as $$
+    insert into public.payment_daily_rollups (day, status, payment_count, amount, refund_amount)
+    values (p_day, p_status, p_count, p_amount, p_refund_amount)
+    on conflict (day, status) do update set
+        payment_count = payment_daily_rollups.payment_count + excluded.payment_count,
+        amount = payment_daily_rollups.amount + excluded.amount,
+        refund_amount = payment_daily_rollups.refund_amount + excluded.refund_amount,
+        updated_at = now();
+$$;
+
+-- Moves a payment between (day, status) buckets on insert, update and delete
+create or replace function public.payments_update_rollups()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'UPDATE'
+        and new.status is not distinct from old.status
+        and new.created_at is not distinct from old.created_at
+        and new.amount is not distinct from old.amount
+        and new.refund_amount is not distinct from old.refund_amount then
+        return null;
+    end if;
+
+    if tg_op in ('UPDATE', 'DELETE') and old.status in ('completed', 'failed', 'refunded') then
+        perform public.increment_payment_rollup(
+            (old.created_at at time zone 'UTC')::date, old.status,
+            -1, -coalesce(old.amount, 0), -coalesce(old.refund_amount, 0)
+        );
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') and new.status in ('completed', 'failed', 'refunded') then
+        perform public.increment_payment_rollup(
+            (new.created_at at time zone 'UTC')::date, new.status,
+            1, coalesce(new.amount, 0), coalesce(new.refund_amount, 0)
+        );
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists payments_update_rollups on public.payments;
+create trigger payments_update_rollups
+    after insert or update or delete on public.payments
+    for each row execute function public.payments_update_rollups();
+
+-- Full backfill from payment history (single transaction; payments writes
+-- wait for it, so none of their trigger updates are lost or counted twice)
+create or replace function public.rebuild_payment_rollups()
+returns integer
+language plpgsql
+as $$
+declare
+    row_count integer;
+begin
+    lock table public.payments in share mode;
+
+    delete from public.payment_daily_rollups where true;
+
+    insert into public.payment_daily_rollups (day, status, payment_count, amount, refund_amount)
+    select
+        (created_at at time zone 'UTC')::date,
+        status,
+        count(*),
+        coalesce(sum(amount), 0),
+        coalesce(sum(refund_amount), 0)
+    from public.payments
+    where status in ('completed', 'failed', 'refunded')
+    group by 1, 2;
+
+    get diagnostics row_count = row_count;
+
+    insert into public.payment_rollup_state (id, backfilled_at)
+    values (true, now())
+    on conflict (id) do update set backfilled_at = excluded.backfilled_at;
+
+    return row_count;
+end;
+$$;
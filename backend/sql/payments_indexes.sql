@@ -0,0 +1,7 @@
+-- backend/sql/payments_indexes.sql
+-- Lookups by checkout session: the guarded completion PATCH issued by
+-- /api/payment/verify and the Stripe webhook (services/payment_service.py).
+-- Run in the Supabase SQL editor.
+
+create index if not exists payments_stripe_session_id_idx
+    on public.payments (stripe_session_id);
@@ -0,0 +1,15 @@
+-- backend/sql/processed_stripe_events.sql
+-- Stripe events and checkout sessions that were fully processed, so webhook
+-- redeliveries and repeated /api/payment/verify calls are skipped
+-- (services/processed_events.py). Run in the Supabase SQL editor.
+
+create table if not exists public.processed_stripe_events (
+    key text primary key,                    -- 'event:<evt id>' | 'session:<cs id>'
+    kind text not null,                      -- 'event' | 'session'
+    processed_at timestamptz not null default now()
+);
+
+-- Stripe stops redelivering after a few days; old keys can be pruned, e.g.
+--     delete from public.processed_stripe_events where processed_at < now() - interval '30 days';
+create index if not exists processed_stripe_events_processed_at_idx
+    on public.processed_stripe_events (processed_at);
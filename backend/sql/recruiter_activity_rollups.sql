@@ -0,0 +1,126 @@
+-- backend/sql/recruiter_activity_rollups.sql
+-- Hourly and daily recruiter activity counts, plus batched retention deletes.
+-- Run in the Supabase SQL editor, then backfill once with:
+--     python -m services.activity_rollup_service rollup --since 2024-01-01
+-- Buckets are UTC hours/days of recruiter_activity.created_at.
+
+create table if not exists public.recruiter_activity_rollups (
+    granularity text not null,              -- 'hour' | 'day'
+    bucket timestamptz not null,            -- start of the hour/day
+    recruiter_id uuid not null,
+    activity_type text not null,
+    event_count bigint not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (granularity, bucket, recruiter_id, activity_type)
+);
+
+create index if not exists recruiter_activity_rollups_recruiter_idx
+    on public.recruiter_activity_rollups (recruiter_id, granularity, bucket);
+
+-- Single row: every raw event before rolled_up_until has been counted.
+-- rollup() resumes from it and purge() never deletes past it.
+create table if not exists public.recruiter_activity_rollup_state (
+    id boolean primary key default true check (id),
+    rolled_up_until timestamptz
+);
+
+-- Range scans for rollup windows and retention deletes
+create index if not exists recruiter_activity_created_at_idx
+    on public.recruiter_activity (created_at);
+
+-- Recompute every hour and day bucket that overlaps [p_start, p_end).
+-- Buckets are overwritten, so re-running a window is safe. Day buckets are
+-- widened to whole days; p_end should be the start of the current hour.
+-- The high-water mark only advances when the window starts at or before it
+-- (or on the first run), so a later --since run can't skip over a gap.
+create or replace function public.rollup_recruiter_activity(
+    p_start timestamptz,
+    p_end timestamptz
+)
+returns integer
+language plpgsql
+as $$
+declare
+    hour_start timestamptz := date_trunc('hour', p_start at time zone 'UTC') at time zone 'UTC';
+    day_start timestamptz := date_trunc('day', p_start at time zone 'UTC') at time zone 'UTC';
+    hour_rows integer;
+    day_rows integer;
+begin
+    delete from public.recruiter_activity_rollups
+    where granularity = 'hour' and bucket >= hour_start and bucket < p_end;
+
+    insert into public.recruiter_activity_rollups (granularity, bucket, recruiter_id, activity_type, event_count)
+    select 'hour', date_trunc('hour', created_at at time zone 'UTC') at time zone 'UTC',
+           recruiter_id, activity_type, count(*)
+    from public.recruiter_activity
+    where created_at >= hour_start and created_at < p_end
+    group by 2, 3, 4;
+    get diagnostics hour_rows = row_count;
+
+    delete from public.recruiter_activity_rollups
+    where granularity = 'day' and bucket >= day_start and bucket < p_end;
+
+    insert into public.recruiter_activity_rollups (granularity, bucket, recruiter_id, activity_type, event_count)
+    select 'day', date_trunc('day', created_at at time zone 'UTC') at time zone 'UTC',
+           recruiter_id, activity_type, count(*)
+    from public.recruiter_activity
+    where created_at >= day_start and created_at < p_end
+    group by 2, 3, 4;
+    get diagnostics day_rows = row_count;
+
+    insert into public.recruiter_activity_rollup_state as s (id, rolled_up_until)
+    values (true, p_end)
+    on conflict (id) do update set rolled_up_until = greatest(s.rolled_up_until, excluded.rolled_up_until)
+    where s.rolled_up_until is null or s.rolled_up_until >= hour_start;
+
+    return hour_rows + day_rows;
+end;
+$$;
+
+-- Delete up to p_batch raw events older than p_before; returns rows deleted.
+-- Called in a loop so no single statement holds locks for long.
+create or replace function public.purge_recruiter_activity(
+    p_before timestamptz,
+    p_batch integer default 5000
+)
+returns integer
+language plpgsql
+as $$
+declare
+    deleted integer;
+begin
+    delete from public.recruiter_activity
+    where id in (
+        select id from public.recruiter_activity
+        where created_at < p_before
+        order by created_at
+        limit p_batch
+    );
+    get diagnostics deleted = row_count;
+    return deleted;
+end;
+$$;
+
+-- Counts per bucket and activity type for the admin summary endpoint
+create or replace function public.recruiter_activity_summary(
+    p_granularity text,
+    p_start timestamptz,
+    p_end timestamptz,
+    p_recruiter_id uuid default null
+)
+returns json
+language sql
+stable
+as $$
+    select coalesce(json_agg(row_to_json(s) order by s.bucket, s.activity_type), '[]'::json)
+    from (
+        select bucket, activity_type,
+               sum(event_count)::bigint as count,
+               count(distinct recruiter_id)::bigint as recruiters
+        from public.recruiter_activity_rollups
+        where granularity = p_granularity
+          and bucket >= p_start and bucket < p_end
+          and (p_recruiter_id is null or recruiter_id = p_recruiter_id)
+        group by bucket, activity_type
+    ) s;
+$$;
@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+# Run from the backend folder: python -m pytest tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
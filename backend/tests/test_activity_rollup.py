@@ -0,0 +1,122 @@
+# backend/tests/test_activity_rollup.py
+from datetime import datetime, timezone
+
+import pytest
+
+import services.activity_rollup_service as rollup_module
+from services.activity_rollup_service import ActivityRollupService
+from services.supabase_client import SupabaseClient
+
+NOW = datetime(2024, 6, 15, 14, 37, 12, tzinfo=timezone.utc)
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW if tz else NOW.replace(tzinfo=None)
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = ''
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def state(monkeypatch):
+    """Rollup state row returned by the select (rolled_up_until or None)"""
+    row = {'rolled_up_until': '2024-06-15T14:00:00+00:00'}
+
+    def select(table, query, timeout=None):
+        assert table == rollup_module.ROLLUP_STATE_TABLE
+        return FakeResponse([row])
+
+    monkeypatch.setattr(SupabaseClient, 'select', staticmethod(select))
+    return row
+
+
+@pytest.fixture
+def rpc_calls(monkeypatch, state):
+    monkeypatch.setattr(rollup_module, 'datetime', FixedDatetime)
+    monkeypatch.setattr(rollup_module, 'ACTIVITY_ROLLUP_LOOKBACK_HOURS', 48)
+    calls = []
+    results = []
+
+    def rpc(function, args=None, timeout=None):
+        calls.append((function, args))
+        return FakeResponse(results.pop(0) if results else 0)
+
+    monkeypatch.setattr(SupabaseClient, 'rpc', staticmethod(rpc))
+    return calls, results
+
+
+def test_rollup_defaults_to_lookback_ending_at_current_hour(rpc_calls):
+    calls, results = rpc_calls
+    results.append(12)
+
+    assert ActivityRollupService.rollup() == 12
+    assert calls == [('rollup_recruiter_activity', {
+        'p_start': '2024-06-13T14:00:00Z',
+        'p_end': '2024-06-15T14:00:00Z'
+    })]
+
+
+def test_rollup_catches_up_from_an_old_high_water_mark(rpc_calls, state):
+    calls, _ = rpc_calls
+    state['rolled_up_until'] = '2024-06-01T09:00:00Z'
+
+    ActivityRollupService.rollup()
+
+    assert calls[0][1]['p_start'] == '2024-06-01T09:00:00Z'
+
+
+def test_purge_never_reaches_into_rollup_window(rpc_calls):
+    calls, _ = rpc_calls
+
+    ActivityRollupService.purge(retention_days=0)
+
+    # Lookback starts 2024-06-13T14:37; clamped to the start of that day
+    assert calls[0][1]['p_before'] == '2024-06-13T00:00:00Z'
+
+
+def test_purge_uses_retention_when_older_than_window(rpc_calls):
+    calls, _ = rpc_calls
+
+    ActivityRollupService.purge(retention_days=90)
+
+    assert calls[0][1]['p_before'] == '2024-03-17T14:37:12Z'
+
+
+def test_purge_never_passes_the_high_water_mark(rpc_calls, state):
+    calls, _ = rpc_calls
+    state['rolled_up_until'] = '2024-02-01T00:00:00Z'
+
+    ActivityRollupService.purge(retention_days=90)
+
+    assert calls[0][1]['p_before'] == '2024-02-01T00:00:00Z'
+
+
+def test_purge_skips_before_the_first_rollup(rpc_calls, state):
+    calls, _ = rpc_calls
+    state['rolled_up_until'] = None
+
+    assert ActivityRollupService.purge(retention_days=0) == 0
+    assert calls == []
+
+
+def test_purge_repeats_until_a_short_batch(rpc_calls):
+    calls, results = rpc_calls
+    results.extend([100, 100, 37])
+
+    assert ActivityRollupService.purge(retention_days=90, batch_size=100) == 237
+    assert len(calls) == 3
+    assert all(args['p_batch'] == 100 for _, args in calls)
+
+
+def test_summary_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        ActivityRollupService.get_summary(granularity='week')
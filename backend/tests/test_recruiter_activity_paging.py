@@ -0,0 +1,107 @@
+# backend/tests/test_recruiter_activity_paging.py
+import re
+from urllib.parse import unquote
+
+import pytest
+
+from services.recruiter_activity_service import RecruiterActivityService
+from services.supabase_client import SupabaseClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, rows):
+        self.status_code = status_code
+        self._rows = rows
+        self.text = ''
+
+    def json(self):
+        return self._rows
+
+
+def make_rows():
+    # Several rows share a created_at so the id tie-breaker matters
+    stamps = ['2024-05-01T10:00:00', '2024-05-01T10:00:00', '2024-05-01T10:00:00',
+              '2024-05-01T09:00:00', '2024-05-01T09:00:00', '2024-05-01T08:00:00',
+              '2024-04-30T23:00:00', '2024-04-30T23:00:00', '2024-04-30T22:00:00',
+              '2024-04-30T21:00:00']
+    return [
+        {'id': f'{i:04d}', 'recruiter_id': 'r1', 'activity_type': 'login', 'created_at': stamp}
+        for i, stamp in enumerate(stamps)
+    ]
+
+
+@pytest.fixture
+def activity_table(monkeypatch):
+    """recruiter_activity served from memory, honouring the keyset filter, order and limit"""
+    rows = make_rows()
+    queries = []
+
+    def select(table, query='', **kwargs):
+        assert table == 'recruiter_activity'
+        query = unquote(query)
+        queries.append(query)
+        matched = [row for row in rows if row['recruiter_id'] == 'r1' or 'recruiter_id=' not in query]
+
+        keyset = re.search(r'or=\(created_at\.lt\."([^"]+)",and\(created_at\.eq\."([^"]+)",id\.lt\."([^"]+)"\)\)', query)
+        if keyset:
+            created_at, _, row_id = keyset.groups()
+            matched = [row for row in matched if (row['created_at'], row['id']) < (created_at, row_id)]
+
+        assert 'order=created_at.desc,id.desc' in query
+        matched.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+        limit = int(re.search(r'limit=(\d+)', query).group(1))
+        return FakeResponse(200, matched[:limit])
+
+    monkeypatch.setattr(SupabaseClient, 'select', staticmethod(select))
+    return rows, queries
+
+
+def test_cursor_pages_cover_every_row_once_in_order(activity_table):
+    rows, queries = activity_table
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = RecruiterActivityService.get_recruiter_activities('r1', limit=3, cursor=cursor)
+        assert page['success']
+        assert len(page['data']) <= 3
+        seen.extend(row['id'] for row in page['data'])
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    expected = [row['id'] for row in sorted(rows, key=lambda r: (r['created_at'], r['id']), reverse=True)]
+    assert seen == expected
+    assert pages == 4
+    # Each page asks for one extra row to know whether another page exists
+    assert all('limit=4' in query for query in queries)
+
+
+def test_last_full_page_has_no_cursor(activity_table):
+    page = RecruiterActivityService.get_recruiter_activities('r1', limit=10)
+    assert len(page['data']) == 10
+    assert page['next_cursor'] is None
+
+
+def test_cursor_round_trips():
+    cursor = RecruiterActivityService.encode_cursor({'created_at': '2024-05-01T10:00:00', 'id': 'abc'})
+    assert RecruiterActivityService.decode_cursor(cursor) == ('2024-05-01T10:00:00', 'abc')
+
+
+def test_invalid_cursor_raises_value_error(activity_table):
+    with pytest.raises(ValueError):
+        RecruiterActivityService.get_recruiter_activities('r1', cursor='not-a-cursor')
+
+
+def test_page_size_is_capped(activity_table, monkeypatch):
+    monkeypatch.setattr('services.recruiter_activity_service.ACTIVITY_MAX_PAGE_SIZE', 5)
+    _, queries = activity_table
+    page = RecruiterActivityService.get_all_recruiter_activities(limit=1000)
+    assert len(page['data']) == 5
+    assert 'limit=6' in queries[-1]
+
+
+def test_unknown_field_is_rejected(activity_table):
+    with pytest.raises(ValueError):
+        RecruiterActivityService.get_recruiter_activities('r1', fields=['password'])
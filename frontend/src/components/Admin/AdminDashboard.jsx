@@ -161,11 +161,26 @@ function AdminDashboard({ user, onExit }) {
       
       const result = await response.json()
       
-      if (result.success || response.status === 207) {
-        alert(`✅ User "${userEmail}" has been successfully deleted!\n\nDetails:\n` +
-              `• Auth: ${result.details.auth_deleted ? 'Deleted' : 'Failed'}\n` +
-              `• Blacklisted: ${result.details.blacklisted ? 'Yes' : 'No'}\n` +
-              `• Data cleaned: ${Object.values(result.details.data_cleanup).filter(Boolean).length} tables`)
+      if (result.success && result.status_url) {
+        // Deletion runs as a background job; poll until it finishes
+        let job = null
+        for (let attempt = 0; attempt < 60; attempt++) {
+          await new Promise(resolve => setTimeout(resolve, 1000))
+          const statusResponse = await fetch(`${API_URL}${result.status_url}`)
+          const statusResult = await statusResponse.json()
+          job = statusResult.job
+          if (job && (job.status === 'completed' || job.status === 'failed')) break
+        }
+        
+        if (job && job.status === 'completed') {
+          const steps = (job.result && job.result.steps_completed) || []
+          alert(`✅ User "${userEmail}" has been successfully deleted!\n\nDetails:\n` +
+                `• Steps completed: ${steps.join(', ') || 'none'}`)
+        } else if (job && job.status === 'failed') {
+          alert(`❌ Error deleting user:\n${job.error || 'Unknown error'}`)
+        } else {
+          alert(`⏳ Deletion of "${userEmail}" is still running. Refresh later to see the result.`)
+        }
         
         fetchData('users')
       } else {
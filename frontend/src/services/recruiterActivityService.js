@@ -41,21 +41,36 @@ export const logRecruiterActivity = async (recruiterId, activityType, activityDe
   }
 }
 
+/**
+ * Build cursor / fields / since / until query parameters
+ */
+const pageParams = ({ cursor, fields, since, until } = {}) => {
+  const params = new URLSearchParams()
+  if (cursor) params.set('cursor', cursor)
+  if (fields && fields.length) params.set('fields', fields.join(','))
+  if (since) params.set('since', since)
+  if (until) params.set('until', until)
+  const query = params.toString()
+  return query ? `&${query}` : ''
+}
+
 /**
  * Get recruiter activities
+ * Pass options.cursor = previous nextCursor to fetch the next page
  */
-export const getRecruiterActivities = async (recruiterId, limit = 50, activityType = null) => {
+export const getRecruiterActivities = async (recruiterId, limit = 50, activityType = null, options = {}) => {
   try {
     let url = `${API_URL}/api/recruiter-activity/${recruiterId}?limit=${limit}`
     if (activityType) {
       url += `&activity_type=${activityType}`
     }
+    url += pageParams(options)
 
     const response = await fetch(url)
     const data = await response.json()
     
     if (data.success) {
-      return { success: true, data: data.data }
+      return { success: true, data: data.data, nextCursor: data.next_cursor }
     } else {
       return { success: false, error: data.error }
     }
@@ -67,14 +82,15 @@ export const getRecruiterActivities = async (recruiterId, limit = 50, activityTy
 
 /**
  * Get all recruiter activities (admin only)
+ * Pass options.cursor = previous nextCursor to fetch the next page
  */
-export const getAllRecruiterActivities = async (limit = 100) => {
+export const getAllRecruiterActivities = async (limit = 100, options = {}) => {
   try {
-    const response = await fetch(`${API_URL}/api/recruiter-activity/admin/all?limit=${limit}`)
+    const response = await fetch(`${API_URL}/api/recruiter-activity/admin/all?limit=${limit}${pageParams(options)}`)
     const data = await response.json()
     
     if (data.success) {
-      return { success: true, data: data.data }
+      return { success: true, data: data.data, nextCursor: data.next_cursor }
     } else {
       return { success: false, error: data.error }
     }